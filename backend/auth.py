@@ -1,30 +1,28 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import HTTPException, Depends, status
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from models import User, TokenData
+from services.principal_cache import principal_cache
+from services.passwords import pwd_context, password_service
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Token bearer
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against its hash."""
+    """Verify a plain password against its hash. Blocking: use password_service in request handlers."""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password."""
+    """Hash a password. Blocking: use password_service in request handlers."""
     return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -57,8 +55,16 @@ async def authenticate_user(db, email: str, password: str) -> Optional[User]:
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_service.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        # Stored hash uses an outdated bcrypt cost factor
+        await db.users.update_one(
+            {"id": user.id},
+            {"$set": {"hashed_password": new_hash, "updated_at": datetime.utcnow()}}
+        )
+        user.hashed_password = new_hash
     return user
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -79,11 +85,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except JWTError:
         raise credentials_exception
     
+    # Serve the principal from the cache, falling back to the database
+    user = principal_cache.get(token_data.email)
+    if user is not None:
+        return user
+    
     # Get database connection
     from database import db
     user = await get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
+    principal_cache.set(token_data.email, user)
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: débit des uploads d'avatar simultanés et retard de la boucle asyncio,
+avec l'ancien traitement (lecture/copie bloquantes dans la boucle) puis avec
+store_avatar_stream exécuté dans un thread.
+
+Usage: python benchmarks/avatar_upload.py [uploads] [taille_px]
+"""
+
+import asyncio
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Write avatars to a throwaway directory
+os.environ.setdefault("UPLOAD_ROOT", tempfile.mkdtemp(prefix="avatar-bench-"))
+
+# Add backend directory to path to import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from PIL import Image
+from services.avatars import AVATAR_DIR, store_avatar_stream
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def make_image(size: int, seed: int) -> bytes:
+    image = Image.effect_noise((size, size), 64 + seed % 64).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+def legacy_upload(source) -> str:
+    """Previous handler body: count bytes in 1KB chunks, seek back, copy again."""
+    file_size = 0
+    for chunk in iter(lambda: source.read(1024), b""):
+        file_size += len(chunk)
+    source.seek(0)
+    os.makedirs(AVATAR_DIR, exist_ok=True)
+    path = os.path.join(AVATAR_DIR, f"legacy_{uuid.uuid4().hex[:8]}.png")
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+    return path
+
+async def measure_loop_lag(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+async def run_scenario(name, upload, payloads):
+    lags = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(measure_loop_lag(stop, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(upload(io.BytesIO(payload)) for payload in payloads))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+
+    total_mb = sum(len(payload) for payload in payloads) / (1024 * 1024)
+    print(f"📊 {name}")
+    print(f"   {len(payloads)} uploads ({total_mb:.1f} Mo) en {elapsed:.2f}s -> {len(payloads) / elapsed:.1f} uploads/s")
+    print(f"   retard boucle p50={statistics.median(lags):.1f}ms p99={percentile(lags, 99):.1f}ms max={max(lags):.0f}ms")
+
+async def main(uploads: int, size: int):
+    payloads = [make_image(size, seed) for seed in range(uploads)]
+
+    async def inline(source):
+        legacy_upload(source)
+
+    async def threaded(source):
+        await asyncio.to_thread(store_avatar_stream, source)
+
+    await run_scenario("Avant: lecture + copie bloquantes dans la boucle (sans redimensionnement)", inline, payloads)
+    await run_scenario("Après: store_avatar_stream dans un thread (validation + variantes WebP)", threaded, payloads)
+
+if __name__ == "__main__":
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    asyncio.run(main(uploads, size))
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Benchmark: temps de génération des brackets double élimination (8 à 1024
+participants). La structure des brackets (liens, byes, repêchages) est
+vérifiée par tests/test_bracket_engine.py.
+
+Usage: python benchmarks/bracket_generation.py [participants_max]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path to import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.bracket_engine import generate_double_elimination
+
+TIMED_SIZES = (8, 16, 32, 64, 100, 128, 256, 500, 512, 1000, 1024)
+
+def main(max_count: int):
+    print("📊 Génération double élimination (médiane de 5)")
+    for count in TIMED_SIZES:
+        if count > max_count:
+            break
+        participants = [f"p{i}" for i in range(count)]
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            matches = generate_double_elimination("bench", participants)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f"   {count:5d} participants: {len(matches):5d} matchs en {timings[2]:.1f}ms "
+              f"({timings[2] * 1000 / len(matches):.1f}µs/match)")
+
+if __name__ == "__main__":
+    max_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    main(max_count)
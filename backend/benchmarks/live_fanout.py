@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test de charge: diffusion des mises à jour en direct d'un tournoi à un grand
+nombre de spectateurs (1000 par défaut) via services.live. Mesure la latence
+entre la publication et la réception (p50/p99) et le temps de diffusion
+complet, puis vérifie qu'un spectateur trop lent reçoit un "resync" au lieu
+de bloquer les autres.
+
+Usage: python benchmarks/live_fanout.py [spectateurs] [événements]
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add backend directory to path to import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.live import TournamentBroker, match_event
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def viewer(queue: asyncio.Queue, events: int, published_at: dict, latencies: list):
+    """A connected client: reads events until it has seen all of them."""
+    for _ in range(events):
+        payload = await queue.get()
+        event = json.loads(payload)
+        latencies.append((time.perf_counter() - published_at[event["match"]["match_number"]]) * 1000)
+
+async def main(viewers: int, events: int):
+    broker = TournamentBroker(queue_size=256)
+    tournament_id = str(uuid.uuid4())
+    queues = [broker.subscribe(tournament_id) for _ in range(viewers)]
+    published_at = {}
+    latencies = []
+    tasks = [asyncio.create_task(viewer(queue, events, published_at, latencies)) for queue in queues]
+
+    start = time.perf_counter()
+    for number in range(events):
+        published_at[number] = time.perf_counter()
+        await broker.publish(tournament_id, match_event(tournament_id, {
+            "id": str(uuid.uuid4()), "match_number": number, "status": "completed",
+            "winner_id": str(uuid.uuid4()), "player1_score": 13, "player2_score": 7
+        }))
+        # Let viewers drain their queues, as the event loop would between requests
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    assert len(latencies) == viewers * events, f"{len(latencies)} réceptions, {viewers * events} attendues"
+    stats = broker.stats()
+    assert stats["resyncs"] == 0, "aucun spectateur ne devrait être en retard"
+    print(f"📊 {viewers} spectateurs, {events} événements: {len(latencies)} réceptions en {elapsed:.2f}s")
+    print(f"   latence p50={statistics.median(latencies):.2f}ms p99={percentile(latencies, 99):.2f}ms")
+
+    # A viewer that never reads: its backlog is dropped for a single resync event
+    slow = broker.subscribe(tournament_id)
+    for queue in queues:
+        broker.unsubscribe(tournament_id, queue)
+    for number in range(broker.queue_size + 10):
+        await broker.publish(tournament_id, match_event(tournament_id, {"id": str(number), "match_number": number}))
+    assert slow.qsize() < broker.queue_size, "la file d'un spectateur lent ne doit pas rester pleine"
+    assert broker.stats()["resyncs"] >= 1, "le spectateur lent doit recevoir un resync"
+    print(f"✅ Spectateur lent: {broker.stats()['resyncs']} resync, file ramenée à {slow.qsize()} événements")
+
+if __name__ == "__main__":
+    viewers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    asyncio.run(main(viewers, events))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latence des connexions (p50/p99) et retard de la boucle asyncio
+pendant un afflux de connexions simultanées, avec bcrypt exécuté dans la boucle
+(comportement historique) puis dans le pool de PasswordService.
+
+Usage: python benchmarks/login_p99.py [connexions] [concurrence]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path to import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.passwords import PasswordService, pwd_context
+
+PASSWORD = "Oupafamilly2024!"
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def measure_loop_lag(stop: asyncio.Event, lags: list, interval: float = 0.01):
+    """Heartbeat: how late the event loop wakes us up, i.e. how long other requests wait."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+async def run_scenario(name, verify, logins: int, concurrency: int):
+    hashed = pwd_context.hash(PASSWORD)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], []
+    stop = asyncio.Event()
+
+    # Every login of the burst arrives at once: latency runs from the burst start,
+    # so time spent waiting for a blocked event loop counts too
+    async def login():
+        async with semaphore:
+            await verify(PASSWORD, hashed)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    heartbeat = asyncio.create_task(measure_loop_lag(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+
+    print(f"📊 {name}")
+    print(f"   connexions: {logins} en {elapsed:.2f}s ({logins / elapsed:.1f}/s)")
+    print(f"   latence connexion p50={statistics.median(latencies):.0f}ms p99={percentile(latencies, 99):.0f}ms")
+    print(f"   retard boucle p50={statistics.median(lags):.1f}ms p99={percentile(lags, 99):.1f}ms max={max(lags):.0f}ms")
+
+async def main(logins: int, concurrency: int):
+    async def inline_verify(plain, hashed):
+        return pwd_context.verify(plain, hashed)
+
+    service = PasswordService(executor_kind="thread", workers=4, max_concurrency=4)
+
+    await run_scenario("Avant: bcrypt dans la boucle asyncio", inline_verify, logins, concurrency)
+    await run_scenario("Après: PasswordService (pool de threads)", service.verify_and_update, logins, concurrency)
+    service.shutdown()
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    asyncio.run(main(logins, concurrency))
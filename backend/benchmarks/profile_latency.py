@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latence de GET /profiles/{user_id} sur un jeu de données généré
+(utilisateurs, profils, équipes, tournois, matchs), avec l'ancien plan de
+requêtes séquentiel puis le plan concurrent de routes.profiles.
+
+Utilise MONGO_URL et une base dédiée (BENCH_DB_NAME, par défaut
+oupafamilly_profile_bench) qui est supprimée à la fin.
+
+Usage: python benchmarks/profile_latency.py [utilisateurs] [requêtes]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path to import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The routes use the database named by DB_NAME: point it at the benchmark database
+os.environ["DB_NAME"] = os.getenv("BENCH_DB_NAME", "oupafamilly_profile_bench")
+
+from database import client, db
+from routes.profiles import get_user_profile
+from services.indexes import ensure_indexes
+
+MATCHES_PER_USER = 60
+TOURNAMENTS = 200
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def seed(user_count: int):
+    now = datetime.utcnow()
+    user_ids = [str(uuid.uuid4()) for _ in range(user_count)]
+    await db.users.insert_many([
+        {"id": user_id, "username": f"joueur{i}", "email": f"joueur{i}@bench.local", "role": "member",
+         "status": "active", "is_verified": True, "created_at": now - timedelta(days=i % 365)}
+        for i, user_id in enumerate(user_ids)
+    ])
+    await db.user_profiles.insert_many([
+        {"user_id": user_id, "display_name": f"Joueur {i}", "bio": "x" * 300, "favorite_games": ["cs2"]}
+        for i, user_id in enumerate(user_ids)
+    ])
+    await db.teams.insert_many([
+        {"id": str(uuid.uuid4()), "name": f"Équipe {i}", "game": "cs2", "captain_id": members[0], "members": members}
+        for i, members in enumerate(user_ids[start:start + 5] for start in range(0, user_count, 5))
+    ])
+
+    tournament_ids = [str(uuid.uuid4()) for _ in range(TOURNAMENTS)]
+    await db.tournaments.insert_many([
+        {"id": tournament_id, "title": f"CS2 1v1 Cup {i}", "game": "cs2", "max_participants": 16,
+         "status": "completed", "participants": random.sample(user_ids, min(16, user_count)),
+         "winner_id": random.choice(user_ids), "description": "d" * 500, "created_at": now}
+        for i, tournament_id in enumerate(tournament_ids)
+    ])
+
+    matches = []
+    for _ in range(user_count * MATCHES_PER_USER // 2):
+        player1, player2 = random.sample(user_ids, 2)
+        matches.append({
+            "id": str(uuid.uuid4()), "tournament_id": random.choice(tournament_ids), "round_number": 1,
+            "match_number": 1, "player1_id": player1, "player2_id": player2,
+            "winner_id": random.choice((player1, player2)), "player1_score": 13, "player2_score": 7,
+            "status": "completed", "completed_at": now - timedelta(minutes=random.randint(0, 100000)),
+            "notes": "n" * 200
+        })
+    await db.matches.insert_many(matches)
+    await ensure_indexes(db)
+    return user_ids
+
+async def sequential_profile(user_id: str):
+    """Query plan of the endpoint before it was parallelized: full documents, one query after another."""
+    user = await db.users.find_one({"id": user_id})
+    profile = await db.user_profiles.find_one({"user_id": user_id})
+    participated = await db.tournaments.find({"participants": {"$in": [user_id]}}).to_list(100)
+    won = await db.tournaments.find({"winner_id": user_id, "status": "completed"}).to_list(100)
+    played = await db.matches.find({
+        "$or": [{"player1_id": user_id}, {"player2_id": user_id}], "status": "completed"
+    }).to_list(200)
+    teams = await db.teams.find({"members": {"$in": [user_id]}}).to_list(10)
+    recent = await db.matches.find({
+        "$or": [{"player1_id": user_id}, {"player2_id": user_id}], "status": "completed"
+    }).sort("completed_at", -1).limit(10).to_list(10)
+    return user, profile, participated, won, played, teams, recent
+
+async def run_scenario(name, fetch, user_ids, requests: int):
+    latencies = []
+    for _ in range(requests):
+        user_id = random.choice(user_ids)
+        start = time.perf_counter()
+        await fetch(user_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(f"📊 {name}")
+    print(f"   requêtes: {requests} p50={statistics.median(latencies):.1f}ms p99={percentile(latencies, 99):.1f}ms")
+
+async def main(user_count: int, requests: int):
+    await client.drop_database(db.name)
+    try:
+        user_ids = await seed(user_count)
+        print(f"✅ Jeu de données: {user_count} utilisateurs, {TOURNAMENTS} tournois, {user_count * MATCHES_PER_USER // 2} matchs")
+
+        # Same numbers from both plans
+        user_id = user_ids[0]
+        _, _, participated, won, played, _, _ = await sequential_profile(user_id)
+        statistics_after = (await get_user_profile(user_id))["statistics"]
+        assert statistics_after["tournaments"]["total"] == len(participated)
+        assert statistics_after["tournaments"]["victories"] == len(won)
+        assert statistics_after["matches"]["total"] == len(played)
+
+        await run_scenario("Avant: requêtes séquentielles, documents complets", sequential_profile, user_ids, requests)
+        await run_scenario("Après: asyncio.gather, projections et $group", get_user_profile, user_ids, requests)
+    finally:
+        await client.drop_database(db.name)
+
+if __name__ == "__main__":
+    user_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    asyncio.run(main(user_count, requests))
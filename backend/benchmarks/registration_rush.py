@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test de charge: des milliers d'inscriptions simultanées à un tournoi (chaque
+joueur envoie sa demande deux fois) contre un mongod local. Vérifie que la
+capacité est respectée exactement, sans double inscription, et que le surplus
+part en liste d'attente. Mesure aussi le dépassement de l'ancienne méthode
+(lecture, vérification en Python, puis $push).
+
+Utilise MONGO_URL et une base dédiée (BENCH_DB_NAME, par défaut
+oupafamilly_registration_bench) qui est supprimée à la fin.
+
+Usage: python benchmarks/registration_rush.py [joueurs] [capacité]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path to import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Point DB_NAME at the benchmark database before the database module reads it
+os.environ["DB_NAME"] = os.getenv("BENCH_DB_NAME", "oupafamilly_registration_bench")
+
+from database import client, db
+from models import ParticipantInfo, ParticipantType
+from services.indexes import ensure_indexes
+from services.registrations import AlreadyRegisteredError, AlreadyWaitlistedError, register_participant
+
+async def create_tournament(capacity: int) -> str:
+    now = datetime.utcnow()
+    tournament_id = str(uuid.uuid4())
+    await db.tournaments.insert_one({
+        "id": tournament_id, "title": "CS2 1v1 Rush", "game": "cs2", "tournament_type": "elimination",
+        "max_participants": capacity, "status": "open", "participants": [], "participant_summaries": [],
+        "registration_start": now, "registration_end": now + timedelta(hours=1), "created_at": now
+    })
+    return tournament_id
+
+async def legacy_register(tournament_id: str, participant_id: str):
+    """Former check-then-write registration."""
+    tournament = await db.tournaments.find_one({"id": tournament_id})
+    if participant_id in tournament["participants"] or len(tournament["participants"]) >= tournament["max_participants"]:
+        return
+    await db.tournaments.update_one({"id": tournament_id}, {"$push": {"participants": participant_id}})
+
+async def main(players: int, capacity: int):
+    await client.drop_database(db.name)
+    try:
+        await ensure_indexes(db)
+        participants = [
+            ParticipantInfo(id=str(uuid.uuid4()), type=ParticipantType.USER, name=f"joueur{i}", display_name=f"joueur{i}")
+            for i in range(players)
+        ]
+
+        # Former method: overshoot and double registrations
+        legacy_id = await create_tournament(capacity)
+        await asyncio.gather(*(legacy_register(legacy_id, p.id) for p in participants + participants))
+        legacy = await db.tournaments.find_one({"id": legacy_id})
+        print(f"📊 Avant: {len(legacy['participants'])} inscrits pour {capacity} places, "
+              f"{len(legacy['participants']) - len(set(legacy['participants']))} doublons")
+
+        # Conditional update
+        tournament_id = await create_tournament(capacity)
+        outcomes = {"registered": 0, "waitlisted": 0, "duplicates": 0}
+
+        async def register(participant):
+            try:
+                position = await register_participant(db, tournament_id, participant)
+                outcomes["registered" if position is None else "waitlisted"] += 1
+            except (AlreadyRegisteredError, AlreadyWaitlistedError):
+                outcomes["duplicates"] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(register(p) for p in participants + participants))
+        elapsed = time.perf_counter() - start
+
+        tournament = await db.tournaments.find_one({"id": tournament_id})
+        registered = tournament["participants"]
+        waitlist = await db.tournament_waitlist.find({"tournament_id": tournament_id}).to_list(None)
+        expected_waitlist = max(0, players - capacity)
+
+        assert len(registered) == min(capacity, players), f"{len(registered)} inscrits pour {capacity} places"
+        assert len(set(registered)) == len(registered), "double inscription"
+        assert len(tournament["participant_summaries"]) == len(registered), "résumés désynchronisés"
+        assert len(waitlist) == expected_waitlist, f"{len(waitlist)} en attente, {expected_waitlist} attendus"
+        assert not set(registered) & {entry["participant_id"] for entry in waitlist}, "inscrit et en attente"
+        assert outcomes["duplicates"] == players, "chaque seconde demande doit être refusée"
+
+        print(f"✅ Après: {len(registered)}/{capacity} inscrits, {len(waitlist)} en liste d'attente, "
+              f"{outcomes['duplicates']} doublons refusés")
+        print(f"   {players * 2} demandes simultanées en {elapsed:.2f}s ({players * 2 / elapsed:.0f}/s)")
+    finally:
+        await client.drop_database(db.name)
+
+if __name__ == "__main__":
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    asyncio.run(main(players, capacity))
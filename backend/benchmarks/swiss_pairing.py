@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: calcul du classement (points, Buchholz, confrontations directes) et
+appariement d'une ronde suisse, sur un tournoi simulé avec résultats aléatoires.
+Vérifie aussi qu'aucune revanche n'est programmée et que le round robin fait
+se rencontrer chaque paire une seule fois.
+
+Usage: python benchmarks/swiss_pairing.py [participants]
+"""
+
+import random
+import statistics
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+
+# Add backend directory to path to import our modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models import MatchStatus
+from services.schedules import generate_round_robin, generate_swiss_round, swiss_round_count
+
+def play(matches):
+    for match in matches:
+        if match.status != MatchStatus.COMPLETED:
+            match.winner_id = random.choice((match.player1_id, match.player2_id))
+            match.status = MatchStatus.COMPLETED
+    return [match.dict() for match in matches]
+
+def check_round_robin(count: int):
+    participants = [f"p{i}" for i in range(count)]
+    matches = generate_round_robin("bench", participants)
+    pairs = {frozenset((m.player1_id, m.player2_id)) for m in matches}
+    assert len(matches) == len(pairs) == count * (count - 1) // 2, f"round robin {count}: paires manquantes"
+    assert pairs == {frozenset(pair) for pair in combinations(participants, 2)}
+
+def main(count: int):
+    for size in range(2, 33):
+        check_round_robin(size)
+    print("✅ Round robin: chaque paire se rencontre une fois (2 à 32 participants)")
+
+    participants = [f"p{i}" for i in range(count)]
+    start = time.perf_counter()
+    generate_round_robin("bench", participants)
+    print(f"📊 Round robin {count} participants généré en {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    rounds = swiss_round_count(count)
+    history = []
+    timings = []
+    met = set()
+    for round_number in range(1, rounds + 1):
+        start = time.perf_counter()
+        round_matches = generate_swiss_round("bench", participants, history, round_number, len(history) + 1)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        for match in round_matches:
+            if match.player2_id == "BYE":
+                continue
+            pair = frozenset((match.player1_id, match.player2_id))
+            assert pair not in met, f"ronde {round_number}: revanche {sorted(pair)}"
+            met.add(pair)
+        history += play(round_matches)
+
+    print(f"📊 Suisse {count} participants, {rounds} rondes sans revanche")
+    print(f"   classement + appariement par ronde: médiane {statistics.median(timings):.1f}ms max {max(timings):.1f}ms")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    main(count)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script de diagnostic des index MongoDB : exécute explain() sur les requêtes
+des routes et signale celles qui font encore un parcours complet de collection.
+
+Usage: python check_indexes.py [--create]
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+# Add parent directory to path to import our modules
+sys.path.append(str(Path(__file__).parent))
+
+from services.indexes import ensure_indexes, find_unindexed_queries
+
+async def check_indexes(create: bool = False) -> int:
+    """Afficher le rapport d'index et retourner le nombre de requêtes non indexées."""
+
+    # Load environment variables
+    ROOT_DIR = Path(__file__).parent
+    load_dotenv(ROOT_DIR / '.env')
+
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    try:
+        if create:
+            print("🔧 Création des index du registre...")
+            created = await ensure_indexes(db)
+            for collection_name, names in created.items():
+                print(f"   {collection_name}: {', '.join(names) if names else 'aucun'}")
+
+        print("🔍 Analyse des requêtes des routes (explain)...")
+        report = await find_unindexed_queries(db)
+
+        unindexed = [entry for entry in report if not entry["indexed"]]
+        for entry in report:
+            marker = "✅" if entry["indexed"] else "❌"
+            print(f"{marker} {entry['route']} -> {entry['collection']} {entry['query']}")
+            print(f"      plan: {' > '.join(entry['stages'])}")
+
+        if unindexed:
+            print(f"\n⚠️  {len(unindexed)} requête(s) sans index sur {len(report)}")
+        else:
+            print(f"\n🎯 Toutes les requêtes ({len(report)}) utilisent un index")
+
+        return len(unindexed)
+
+    except Exception as e:
+        print(f"❌ Erreur lors de l'analyse des index: {str(e)}")
+        raise
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    missing = asyncio.run(check_indexes(create="--create" in sys.argv))
+    sys.exit(1 if missing else 0)
@@ -2,11 +2,13 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from services.metrics import command_metrics
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Mongo commands are counted per request for the /api/metrics endpoint
+client = AsyncIOMotorClient(mongo_url, event_listeners=[command_metrics])
 db = client[os.environ['DB_NAME']]
\ No newline at end of file
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script de migration des avatars stockés en base64 dans `user_profiles.avatar_url`
+vers le stockage fichier (variantes WebP 32/64/256 adressées par contenu).
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+# Add parent directory to path to import our modules
+sys.path.append(str(Path(__file__).parent))
+
+from services.avatars import InvalidAvatarError, decode_data_url, store_avatar
+
+async def migrate_avatars():
+    """Convertir tous les avatars base64 en fichiers et ne garder que l'URL courte."""
+
+    # Load environment variables
+    ROOT_DIR = Path(__file__).parent
+    load_dotenv(ROOT_DIR / '.env')
+
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    migrated = 0
+    failed = 0
+
+    try:
+        query = {"avatar_url": {"$regex": "^data:image"}}
+        total = await db.user_profiles.count_documents(query)
+        print(f"🖼️  Avatars base64 à migrer: {total}")
+
+        cursor = db.user_profiles.find(query, {"_id": 0, "user_id": 1, "avatar_url": 1})
+        async for profile in cursor:
+            try:
+                image_data = decode_data_url(profile["avatar_url"])
+                avatar_url = await asyncio.to_thread(store_avatar, image_data)
+            except InvalidAvatarError as e:
+                failed += 1
+                print(f"   ⚠️  {profile['user_id']}: {str(e)} (avatar conservé)")
+                continue
+
+            await db.user_profiles.update_one(
+                {"user_id": profile["user_id"], "avatar_url": profile["avatar_url"]},
+                {"$set": {"avatar_url": avatar_url, "updated_at": datetime.utcnow()}}
+            )
+            migrated += 1
+
+        print(f"✅ Avatars migrés: {migrated}")
+        if failed:
+            print(f"❌ Avatars invalides non migrés: {failed}")
+
+    except Exception as e:
+        print(f"❌ Erreur lors de la migration des avatars: {str(e)}")
+        raise
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_avatars())
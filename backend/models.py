@@ -26,6 +26,7 @@ class TournamentType(str, Enum):
     ELIMINATION = "elimination"
     BRACKET = "bracket"
     ROUND_ROBIN = "round_robin"
+    SWISS = "swiss"
 
 class MatchStatus(str, Enum):
     SCHEDULED = "scheduled"
@@ -40,6 +41,11 @@ class Game(str, Enum):
     SC2 = "sc2"
     MINECRAFT = "minecraft"
 
+class ParticipantType(str, Enum):
+    USER = "user"
+    TEAM = "team"
+    UNKNOWN = "unknown"
+
 # User Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -58,7 +64,7 @@ class UserProfile(BaseModel):
     user_id: str
     display_name: str
     bio: Optional[str] = None
-    avatar_url: Optional[str] = None  # Support for base64 encoded images
+    avatar_url: Optional[str] = None  # URL of the stored 256px avatar (32/64 variants alongside)
     banner_url: Optional[str] = None
     location: Optional[str] = None
     favorite_games: List[Game] = []
@@ -114,6 +120,15 @@ class TeamCreate(BaseModel):
     game: Game
     max_members: int = 6  # Maximum 6 members as requested
 
+# Participant Models (a tournament participant is either a user or a team)
+class ParticipantInfo(BaseModel):
+    id: str
+    type: ParticipantType
+    name: str
+    display_name: str
+    members_count: Optional[int] = None  # teams only
+    max_members: Optional[int] = None  # teams only
+
 # Tournament Models
 class Tournament(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -132,7 +147,9 @@ class Tournament(BaseModel):
     rules: str
     organizer_id: str
     participants: List[str] = []  # user_ids or team_ids
+    participant_summaries: List[ParticipantInfo] = []  # Embedded copies, maintained by registration
     matches: List[str] = []  # match_ids
+    remaining_matches: Optional[int] = None  # Matches left to play, maintained by bracket results
     winner_id: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -156,9 +173,14 @@ class Match(BaseModel):
     tournament_id: str
     round_number: int
     match_number: int
+    bracket: Optional[str] = None  # winners, losers or grand_final in double elimination
     player1_id: Optional[str] = None
     player2_id: Optional[str] = None
     winner_id: Optional[str] = None
+    next_match_id: Optional[str] = None  # Match the winner advances to
+    next_match_slot: Optional[int] = None  # 1 -> player1_id, 2 -> player2_id in next_match_id
+    loser_next_match_id: Optional[str] = None  # Losers bracket match the loser drops to
+    loser_next_match_slot: Optional[int] = None
     player1_score: int = 0
     player2_score: int = 0
     status: MatchStatus = MatchStatus.SCHEDULED
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Script de reconstruction complète de la collection `standings` (points, trophées,
+victoires et matchs de chaque joueur et équipe) à partir des tournois et matchs.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+# Add parent directory to path to import our modules
+sys.path.append(str(Path(__file__).parent))
+
+from services.standings import rebuild_standings
+
+async def rebuild():
+    """Recalculer le classement de tous les joueurs et équipes."""
+
+    # Load environment variables
+    ROOT_DIR = Path(__file__).parent
+    load_dotenv(ROOT_DIR / '.env')
+
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    try:
+        print("🏆 Reconstruction du classement...")
+        count = await rebuild_standings(db)
+        print(f"✅ {count} classements recalculés")
+
+    except Exception as e:
+        print(f"❌ Erreur lors de la reconstruction du classement: {str(e)}")
+        raise
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild())
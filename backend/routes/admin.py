@@ -1,8 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 from models import User, UserResponse, CommunityStats, UserRole, UserStatus
 from auth import get_current_active_user, get_admin_user, is_admin
+from services.directories import member_entry, member_pipeline
+from services.pagination import NEWEST_FIRST, NEXT_CURSOR_HEADER, InvalidCursorError, paginate
+from services.standings import delete_standing
+from services.stats import collection_stats, gather_stats
+from services.principal_cache import principal_cache
+from services.response_cache import response_cache
+from services.events import UserRoleChanged, change_stream, event_bus
+from services.jobs import job_runner, queue_stats
+from services.live import live_broker
+from services.participants import summary_reconciler
+from services.passwords import password_service
 from datetime import datetime, timedelta
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,34 +29,44 @@ from database import db
 async def get_admin_dashboard(current_user: User = Depends(get_admin_user)):
     """Get comprehensive admin dashboard data for community management."""
     try:
-        # User statistics
-        total_users = await db.users.count_documents({})
-        active_users = await db.users.count_documents({"status": "active"})
-        pending_users = await db.users.count_documents({"status": "pending"})
-        
-        # Recent activity (last 7 days)
         week_ago = datetime.utcnow() - timedelta(days=7)
-        new_users_week = await db.users.count_documents({"created_at": {"$gte": week_ago}})
+
+        # One aggregation per collection, all in parallel
+        stats = await gather_stats(
+            users=collection_stats(
+                db.users,
+                {
+                    "active": {"status": "active"},
+                    "pending": {"status": "pending"},
+                    "new_this_week": {"created_at": {"$gte": week_ago}}
+                },
+                # Recent user registrations (last 5)
+                {"recent": [
+                    {"$sort": {"created_at": -1}},
+                    {"$limit": 5},
+                    {"$project": {"_id": 0, "id": 1, "username": 1, "email": 1, "status": 1, "created_at": 1}}
+                ]}
+            ),
+            tournaments=collection_stats(db.tournaments, {"active": {"status": "in_progress"}, "upcoming": {"status": "open"}}),
+            news=collection_stats(db.news, {"published": {"is_published": True}}, total=False),
+            tutorials=collection_stats(db.tutorials, {"published": {"is_published": True}}, total=False)
+        )
+        
+        # User statistics
+        total_users = stats["users"]["total"]
+        active_users = stats["users"]["active"]
+        pending_users = stats["users"]["pending"]
+        new_users_week = stats["users"]["new_this_week"]
+        recent_users = stats["users"]["recent"]
         
         # Tournament statistics
-        total_tournaments = await db.tournaments.count_documents({})
-        active_tournaments = await db.tournaments.count_documents({"status": "in_progress"})
-        upcoming_tournaments = await db.tournaments.count_documents({"status": "open"})
+        total_tournaments = stats["tournaments"]["total"]
+        active_tournaments = stats["tournaments"]["active"]
+        upcoming_tournaments = stats["tournaments"]["upcoming"]
         
         # Content statistics
-        total_news = await db.news.count_documents({"is_published": True})
-        total_tutorials = await db.tutorials.count_documents({"is_published": True})
-        
-        # Recent user registrations (last 5)
-        recent_users = await db.users.find({}).sort("created_at", -1).limit(5).to_list(5)
-        
-        # Most active users (by tournament participation)
-        pipeline = [
-            {"$group": {"_id": "$user_id", "tournament_count": {"$sum": "$total_tournaments"}}},
-            {"$sort": {"tournament_count": -1}},
-            {"$limit": 5}
-        ]
-        active_users_data = await db.user_profiles.aggregate(pipeline).to_list(5)
+        total_news = stats["news"]["published"]
+        total_tutorials = stats["tutorials"]["published"]
         
         return {
             "community_overview": {
@@ -84,23 +107,43 @@ async def get_admin_dashboard(current_user: User = Depends(get_admin_user)):
             detail="Error fetching dashboard data"
         )
 
+@router.get("/users/export")
+async def export_members(current_user: User = Depends(get_admin_user)):
+    """Stream the full membership as NDJSON, one member per line, newest first."""
+
+    async def member_lines():
+        cursor = db.users.aggregate(member_pipeline({}, "newest", private=True), batchSize=500)
+        async for member in cursor:
+            yield json.dumps(member_entry(member), default=str) + "\n"
+
+    filename = f"members-{datetime.utcnow().strftime('%Y%m%d')}.ndjson"
+    return StreamingResponse(
+        member_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
+    response: Response,
     current_user: User = Depends(get_admin_user),
-    status: Optional[UserStatus] = None,
+    user_status: Optional[UserStatus] = Query(None, alias="status"),
     role: Optional[UserRole] = None,
-    limit: int = Query(50, le=200),
-    skip: int = Query(0, ge=0)
+    limit: int = Query(50, ge=1, le=200),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None
 ):
-    """Get all users with filtering options."""
+    """Get all users with filtering options, newest first (cursor in X-Next-Cursor)."""
     try:
         filter_dict = {}
-        if status:
-            filter_dict["status"] = status
+        if user_status:
+            filter_dict["status"] = user_status
         if role:
             filter_dict["role"] = role
         
-        users = await db.users.find(filter_dict).skip(skip).limit(limit).to_list(limit)
+        users, next_cursor = await paginate(db.users, filter_dict, NEWEST_FIRST, limit, cursor=cursor, skip=skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
         return [
             UserResponse(
@@ -114,6 +157,11 @@ async def get_all_users(
             ) for user in users
         ]
         
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         logger.error(f"Error getting users: {str(e)}")
         raise HTTPException(
@@ -140,6 +188,9 @@ async def update_user_status(
                 detail="User not found"
             )
         
+        principal_cache.invalidate_user(user_id)
+        
+        await response_cache.invalidate("users")
         logger.info(f"User {user_id} status updated to {new_status} by admin {current_user.username}")
         
         return {"message": f"User status updated to {new_status}"}
@@ -179,6 +230,10 @@ async def update_user_role(
                 detail="User not found"
             )
         
+        principal_cache.invalidate_user(user_id)
+        await event_bus.publish(UserRoleChanged(user_id=user_id, role=new_role.value))
+        
+        await response_cache.invalidate("users")
         logger.info(f"User {user_id} role updated to {new_role} by admin {current_user.username}")
         
         return {"message": f"User role updated to {new_role}"}
@@ -206,11 +261,14 @@ async def delete_user(
                 detail="Cannot delete your own account"
             )
         
-        # Delete user profile first
+        # Delete user profile and standing first
         await db.user_profiles.delete_one({"user_id": user_id})
+        await delete_standing(db, user_id)
         
         # Delete user
         result = await db.users.delete_one({"id": user_id})
+        principal_cache.invalidate_user(user_id)
+        summary_reconciler.mark_changed(user_id)
         
         if result.deleted_count == 0:
             raise HTTPException(
@@ -218,6 +276,7 @@ async def delete_user(
                 detail="User not found"
             )
         
+        await response_cache.invalidate("users")
         logger.info(f"User {user_id} deleted by admin {current_user.username}")
         
         return {"message": "User deleted successfully"}
@@ -231,6 +290,43 @@ async def delete_user(
             detail="Error deleting user"
         )
 
+@router.get("/monitoring/principal-cache")
+async def get_principal_cache_stats(current_user: User = Depends(get_admin_user)):
+    """Get hit/miss counters of the authenticated user cache."""
+    return principal_cache.stats()
+
+@router.get("/monitoring/response-cache")
+async def get_response_cache_stats(current_user: User = Depends(get_admin_user)):
+    """Get hit/miss and invalidation counters of the public response cache."""
+    return response_cache.stats()
+
+@router.get("/monitoring/live-events")
+async def get_live_events_stats(current_user: User = Depends(get_admin_user)):
+    """Get channel, subscriber and delivery counters of the live tournament events."""
+    return live_broker.stats()
+
+@router.get("/monitoring/event-bus")
+async def get_event_bus_stats(current_user: User = Depends(get_admin_user)):
+    """Get queue depth and processing counters of the event bus subscribers."""
+    return {**event_bus.stats(), "change_stream": change_stream.stats()}
+
+@router.get("/monitoring/jobs")
+async def get_job_queue_stats(current_user: User = Depends(get_admin_user)):
+    """Get depth, wait and run times of the background job queue."""
+    try:
+        return {**await queue_stats(db), "worker": job_runner.stats()}
+    except Exception as e:
+        logger.error(f"Error getting job queue stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error fetching job queue statistics"
+        )
+
+@router.get("/monitoring/password-hashing")
+async def get_password_hashing_stats(current_user: User = Depends(get_admin_user)):
+    """Get queue depth and counters of the password hashing pool."""
+    return password_service.stats()
+
 @router.get("/community-growth")
 async def get_community_growth_stats(
     current_user: User = Depends(get_admin_user),
@@ -336,6 +432,7 @@ async def broadcast_announcement(
         
         await db.news.insert_one(announcement.dict())
         
+        await response_cache.invalidate("news")
         logger.info(f"Announcement broadcasted: {title} by admin {current_user.username}")
         
         return {
@@ -5,10 +5,14 @@ from models import (
     UserProfileResponse, UserUpdate, Token, UserRole, UserStatus
 )
 from auth import (
-    authenticate_user, create_access_token, get_password_hash,
+    authenticate_user, create_access_token,
     get_current_active_user, get_user_by_email, ACCESS_TOKEN_EXPIRE_MINUTES,
-    pwd_context
+    password_service
 )
+from services.standings import ensure_standing, delete_standing
+from services.participants import SUMMARIES_FIELD, summary_reconciler
+from services.principal_cache import principal_cache
+from services.response_cache import response_cache
 from motor.motor_asyncio import AsyncIOMotorClient
 import logging
 
@@ -40,7 +44,7 @@ async def register_user(user_data: UserCreate):
             )
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_service.hash(user_data.password)
         new_user = User(
             username=user_data.username,
             email=user_data.email,
@@ -58,7 +62,9 @@ async def register_user(user_data: UserCreate):
             display_name=user_data.display_name
         )
         await db.user_profiles.insert_one(user_profile.dict())
+        await ensure_standing(db, new_user.id, "user")
         
+        await response_cache.invalidate("users")
         logger.info(f"New user registered: {user_data.email}")
         
         return UserResponse(
@@ -246,6 +252,7 @@ async def delete_user_account(
         # Clean up user data from various collections
         
         # Remove user from all teams
+        member_teams = await db.teams.find({"members": {"$in": [user_id]}}, {"_id": 0, "id": 1}).to_list(None)
         await db.teams.update_many(
             {"members": {"$in": [user_id]}},
             {"$pull": {"members": user_id}}
@@ -269,15 +276,19 @@ async def delete_user_account(
             else:
                 # Delete team if user is the only member
                 await db.teams.delete_one({"id": team.id})
+                await delete_standing(db, team.id)
         
         # Remove user from tournament participants
         await db.tournaments.update_many(
             {"participants": {"$in": [user_id]}},
-            {"$pull": {"participants": user_id}}
+            {"$pull": {"participants": user_id, SUMMARIES_FIELD: {"id": user_id}}}
         )
+        # Member counts of their teams changed
+        summary_reconciler.mark_changed(*(team["id"] for team in member_teams))
         
-        # Delete user profile
+        # Delete user profile and standing
         await db.user_profiles.delete_one({"user_id": user_id})
+        await delete_standing(db, user_id)
         
         # Delete user's content (news, tutorials where they are author)
         await db.news.delete_many({"author_id": user_id})
@@ -285,6 +296,7 @@ async def delete_user_account(
         
         # Finally, delete the user account
         result = await db.users.delete_one({"id": user_id})
+        principal_cache.invalidate_user(user_id)
         
         if result.deleted_count == 0:
             raise HTTPException(
@@ -292,6 +304,7 @@ async def delete_user_account(
                 detail="User account not found"
             )
         
+        await response_cache.invalidate("users", "teams", "tournaments", "news", "tutorials")
         logger.info(f"User account {username} ({user_id}) deleted successfully with all associated data")
         
         return {
@@ -389,7 +402,7 @@ async def reset_password(
             )
         
         # Hash new password
-        hashed_password = pwd_context.hash(new_password)
+        hashed_password = await password_service.hash(new_password)
         
         # Update user password
         result = await db.users.update_one(
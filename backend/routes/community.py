@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
 from typing import List, Optional
-from models import User, News, NewsCreate, Team
+from models import User, News, NewsCreate
 from auth import get_current_active_user, is_admin, is_moderator_or_admin
-from datetime import datetime
+from services.directories import (
+    MEMBER_SORTS, TEAM_SORTS, member_entry, member_page, team_entry, team_page
+)
+from services.pagination import NEWEST_FIRST, NEXT_CURSOR_HEADER, InvalidCursorError, paginate
+from services.response_cache import cached_response, response_cache
+from services.standings import victories_by_type
+from services.stats import collection_stats, gather_stats
+from datetime import datetime, timedelta
 import logging
 import uuid
 
@@ -14,46 +21,37 @@ router = APIRouter(prefix="/community", tags=["Community"])
 from database import db
 
 @router.get("/stats")
+@cached_response(ttl=60, tags=("users", "teams", "tournaments", "matches"))
 async def get_community_stats():
     """Get overall community statistics."""
     try:
-        # Count total users
-        total_users = await db.users.count_documents({})
-        
-        # Count active users (logged in recently)
-        from datetime import timedelta
         last_week = datetime.utcnow() - timedelta(days=7)
-        active_users = await db.users.count_documents({
-            "last_active": {"$gte": last_week}
-        })
-        
-        # Count total teams
-        total_teams = await db.teams.count_documents({})
-        
-        # Count total tournaments
-        total_tournaments = await db.tournaments.count_documents({})
-        completed_tournaments = await db.tournaments.count_documents({"status": "completed"})
-        
-        # Count matches played
-        total_matches = await db.matches.count_documents({})
-        completed_matches = await db.matches.count_documents({"status": "completed"})
+
+        # One aggregation per collection, all in parallel
+        stats = await gather_stats(
+            users=collection_stats(db.users, {"active_last_week": {"last_active": {"$gte": last_week}}}),
+            teams=collection_stats(db.teams),
+            tournaments=collection_stats(db.tournaments, {"completed": {"status": "completed"}}),
+            matches=collection_stats(db.matches, {"completed": {"status": "completed"}})
+        )
+        tournaments = stats["tournaments"]
         
         return {
             "users": {
-                "total": total_users,
-                "active_last_week": active_users
+                "total": stats["users"]["total"],
+                "active_last_week": stats["users"]["active_last_week"]
             },
             "teams": {
-                "total": total_teams
+                "total": stats["teams"]["total"]
             },
             "tournaments": {
-                "total": total_tournaments,
-                "completed": completed_tournaments,
-                "ongoing": total_tournaments - completed_tournaments
+                "total": tournaments["total"],
+                "completed": tournaments["completed"],
+                "ongoing": tournaments["total"] - tournaments["completed"]
             },
             "matches": {
-                "total": total_matches,
-                "completed": completed_matches
+                "total": stats["matches"]["total"],
+                "completed": stats["matches"]["completed"]
             }
         }
         
@@ -66,17 +64,21 @@ async def get_community_stats():
 
 @router.get("/posts", response_model=List[News])
 async def get_community_posts(
+    response: Response,
     published_only: bool = True,
-    limit: int = 20,
-    skip: int = 0
+    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None
 ):
-    """Get community posts/news."""
+    """Get community posts/news, newest first (cursor in X-Next-Cursor)."""
     try:
         filter_dict = {}
         if published_only:
             filter_dict["is_published"] = True
         
-        posts = await db.news.find(filter_dict).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+        posts, next_cursor = await paginate(db.news, filter_dict, NEWEST_FIRST, limit, cursor=cursor, skip=skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
         # Enrich with author information
         enriched_posts = []
@@ -95,6 +97,11 @@ async def get_community_posts(
         
         return enriched_posts
         
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         logger.error(f"Error getting community posts: {str(e)}")
         raise HTTPException(
@@ -122,6 +129,7 @@ async def create_community_post(
         
         await db.news.insert_one(new_post.dict())
         
+        await response_cache.invalidate("news")
         logger.info(f"Community post created: {post_data.title} by {current_user.username}")
         
         return new_post
@@ -169,6 +177,7 @@ async def update_community_post(
             }
         )
         
+        await response_cache.invalidate("news")
         logger.info(f"Community post updated: {post_id} by {current_user.username}")
         
         return {"message": "Post updated successfully"}
@@ -207,6 +216,7 @@ async def delete_community_post(
         # Delete post
         await db.news.delete_one({"id": post_id})
         
+        await response_cache.invalidate("news")
         logger.info(f"Community post deleted: {post_id} by {current_user.username}")
         
         return {"message": "Post deleted successfully"}
@@ -221,43 +231,41 @@ async def delete_community_post(
         )
 
 @router.get("/leaderboard")
+@cached_response(ttl=300, tags=("leaderboard", "users"))
 async def get_community_leaderboard():
     """Get community leaderboard with trophies and rankings."""
     try:
-        # Get all users with their tournament victories
-        users = await db.users.find({}).to_list(100)
+        # Top players from the materialized standings, already sorted by points
+        standings = await db.standings.find(
+            {"participant_type": "user"}
+        ).sort([("total_points", -1), ("participant_id", 1)]).limit(50).to_list(50)
+        
+        users = await db.users.find(
+            {"id": {"$in": [standing["participant_id"] for standing in standings]}},
+            {"_id": 0, "id": 1, "username": 1, "role": 1, "created_at": 1}
+        ).to_list(None)
+        users_by_id = {user["id"]: user for user in users}
         
         leaderboard = []
-        for user_data in users:
-            user = User(**user_data)
-            
-            # Count tournament victories by type
-            victories = await get_user_tournament_victories(user.id)
-            
-            # Calculate total points based on victories
-            total_points = (
-                victories["1v1"] * 100 +      # 100 points per 1v1 victory
-                victories["2v2"] * 150 +      # 150 points per 2v2 victory  
-                victories["5v5"] * 200        # 200 points per 5v5 victory
-            )
+        for standing in standings:
+            user = users_by_id.get(standing["participant_id"])
+            if not user:
+                continue
             
-            total_trophies = sum(victories.values())
+            victories = victories_by_type(standing)
             
             leaderboard.append({
-                "user_id": user.id,
-                "username": user.username,
-                "total_points": total_points,
-                "total_trophies": total_trophies,
+                "user_id": user["id"],
+                "username": user["username"],
+                "total_points": standing["total_points"],
+                "total_trophies": sum(victories.values()),
                 "victories_1v1": victories["1v1"],
                 "victories_2v2": victories["2v2"],
                 "victories_5v5": victories["5v5"],
-                "role": user.role,
-                "created_at": user.created_at
+                "role": user.get("role", "member"),
+                "created_at": user["created_at"]
             })
         
-        # Sort by total points descending
-        leaderboard.sort(key=lambda x: x["total_points"], reverse=True)
-        
         # Add ranks
         for i, player in enumerate(leaderboard):
             player["rank"] = i + 1
@@ -276,7 +284,7 @@ async def get_community_leaderboard():
             else:
                 player["badge"] = "Rising"
         
-        return {"leaderboard": leaderboard[:50]}  # Top 50
+        return {"leaderboard": leaderboard}  # Top 50
         
     except Exception as e:
         logger.error(f"Error getting community leaderboard: {str(e)}")
@@ -323,49 +331,37 @@ async def get_user_tournament_victories(user_id: str) -> dict:
         return {"1v1": 0, "2v2": 0, "5v5": 0}
 
 @router.get("/members")
-async def get_community_members():
-    """Get community members with enhanced profiles."""
+async def get_community_members(
+    sort: str = "trophies",
+    role: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
+    skip: int = Query(0, ge=0)
+):
+    """Get community members with enhanced profiles.
+
+    sort: trophies (default), points, username or newest. One aggregation
+    joins users, standings and user_profiles for the page; trophies and
+    points are sorted on the standings indexes.
+    """
     try:
-        users = await db.users.find({}).to_list(100)
-        
-        enriched_members = []
-        for user_data in users:
-            user = User(**user_data)
-            
-            # Get victory statistics
-            victories = await get_user_tournament_victories(user.id)
-            total_trophies = sum(victories.values())
-            
-            # Get user profile data if exists
-            profile = await db.user_profiles.find_one({"user_id": user.id})
-            
-            member_info = {
-                "id": user.id,
-                "username": user.username,
-                "role": user.role,
-                "status": user.status,
-                "created_at": user.created_at,
-                "trophies": {
-                    "total": total_trophies,
-                    "1v1": victories["1v1"],
-                    "2v2": victories["2v2"], 
-                    "5v5": victories["5v5"]
-                },
-                "profile": {
-                    "display_name": profile.get("display_name", user.username) if profile else user.username,
-                    "bio": profile.get("bio", "") if profile else "",
-                    "favorite_games": profile.get("favorite_games", []) if profile else [],
-                    "avatar_url": profile.get("avatar_url", "") if profile else ""
-                }
-            }
-            
-            enriched_members.append(member_info)
-        
-        # Sort by total trophies descending
-        enriched_members.sort(key=lambda x: x["trophies"]["total"], reverse=True)
+        if sort not in MEMBER_SORTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Sort must be one of: {', '.join(MEMBER_SORTS)}"
+            )
+
+        filter_dict = {"role": role} if role else {}
+        members, total = await member_page(db, filter_dict, sort, skip, limit)
         
-        return {"members": enriched_members}
+        return {
+            "members": [member_entry(member) for member in members],
+            "total": total,
+            "skip": skip,
+            "limit": limit
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting community members: {str(e)}")
         raise HTTPException(
@@ -374,52 +370,41 @@ async def get_community_members():
         )
 
 @router.get("/teams")
-async def get_community_teams():
-    """Get community teams with rankings."""
+async def get_community_teams(
+    sort: str = "points",
+    game: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
+    skip: int = Query(0, ge=0)
+):
+    """Get community teams with rankings.
+
+    sort: points (default), name, members or newest. One aggregation joins
+    teams, standings and member usernames for the page. Every team has a
+    `rank`: its position in the requested order.
+    """
     try:
-        teams = await db.teams.find({}).to_list(100)
-        
-        enriched_teams = []
-        for team_data in teams:
-            team = Team(**team_data)
-            
-            # Calculate team statistics
-            from routes.teams import calculate_team_statistics
-            team_stats = await calculate_team_statistics(team.id)
-            
-            # Get team member names
-            member_names = []
-            for member_id in team.members:
-                member = await db.users.find_one({"id": member_id})
-                if member:
-                    member_names.append(member["username"])
-            
-            # Get captain name
-            captain = await db.users.find_one({"id": team.captain_id})
-            captain_name = captain["username"] if captain else "Unknown"
-            
-            enriched_teams.append({
-                "id": team.id,
-                "name": team.name,
-                "game": team.game,
-                "captain": captain_name,
-                "members": member_names,
-                "member_count": len(team.members),
-                "max_members": team.max_members,
-                "is_open": team.is_open,
-                "statistics": team_stats,
-                "created_at": team.created_at
-            })
-        
-        # Sort by total points descending
-        enriched_teams.sort(key=lambda x: x["statistics"]["total_points"], reverse=True)
+        if sort not in TEAM_SORTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Sort must be one of: {', '.join(TEAM_SORTS)}"
+            )
+
+        filter_dict = {"game": game} if game else {}
+        teams, total = await team_page(db, filter_dict, sort, skip, limit)
         
-        # Add ranks
+        enriched_teams = [team_entry(team) for team in teams]
         for i, team in enumerate(enriched_teams):
-            team["rank"] = i + 1
+            team["rank"] = skip + i + 1
         
-        return {"teams": enriched_teams}
+        return {
+            "teams": enriched_teams,
+            "total": total,
+            "skip": skip,
+            "limit": limit
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting community teams: {str(e)}")
         raise HTTPException(
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 from models import News, NewsCreate, User, Tutorial, TutorialCreate, Game, Tournament
 from auth import get_current_active_user, is_moderator_or_admin
+from services.pagination import NEWEST_FIRST, PINNED_THEN_NEWEST, NEXT_CURSOR_HEADER, InvalidCursorError, paginate
+from services.response_cache import cached_response, response_cache
 from datetime import datetime, timedelta
 import logging
 
@@ -34,6 +36,7 @@ async def create_news(
         
         await db.news.insert_one(new_news.dict())
         
+        await response_cache.invalidate("news")
         logger.info(f"News created: {news_data.title} by {current_user.username}")
         
         return new_news
@@ -49,22 +52,31 @@ async def create_news(
 
 @router.get("/news", response_model=List[News])
 async def get_news(
-    limit: int = Query(10, le=50),
+    response: Response,
+    limit: int = Query(10, ge=1, le=50),
     skip: int = Query(0, ge=0),
-    pinned_only: bool = False
+    pinned_only: bool = False,
+    cursor: Optional[str] = None
 ):
-    """Get news articles."""
+    """Get news articles (cursor of the next page in X-Next-Cursor)."""
     try:
         filter_dict = {"is_published": True}
         if pinned_only:
             filter_dict["is_pinned"] = True
         
         # Sort by pinned first, then by creation date
-        sort_criteria = [("is_pinned", -1), ("created_at", -1)]
-        
-        news_list = await db.news.find(filter_dict).sort(sort_criteria).skip(skip).limit(limit).to_list(limit)
+        news_list, next_cursor = await paginate(
+            db.news, filter_dict, PINNED_THEN_NEWEST, limit, cursor=cursor, skip=skip
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return [News(**news_item) for news_item in news_list]
         
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         logger.error(f"Error getting news: {str(e)}")
         raise HTTPException(
@@ -116,6 +128,7 @@ async def create_tutorial(
         
         await db.tutorials.insert_one(new_tutorial.dict())
         
+        await response_cache.invalidate("tutorials")
         logger.info(f"Tutorial created: {tutorial_data.title} by {current_user.username}")
         
         return new_tutorial
@@ -129,12 +142,14 @@ async def create_tutorial(
 
 @router.get("/tutorials", response_model=List[Tutorial])
 async def get_tutorials(
+    response: Response,
     game: Optional[Game] = None,
     level: Optional[str] = None,
-    limit: int = Query(20, le=100),
-    skip: int = Query(0, ge=0)
+    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None
 ):
-    """Get tutorials with optional filtering."""
+    """Get tutorials with optional filtering, newest first (cursor in X-Next-Cursor)."""
     try:
         filter_dict = {"is_published": True}
         if game:
@@ -142,9 +157,18 @@ async def get_tutorials(
         if level:
             filter_dict["level"] = level
         
-        tutorials = await db.tutorials.find(filter_dict).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+        tutorials, next_cursor = await paginate(
+            db.tutorials, filter_dict, NEWEST_FIRST, limit, cursor=cursor, skip=skip
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return [Tutorial(**tutorial) for tutorial in tutorials]
         
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         logger.error(f"Error getting tutorials: {str(e)}")
         raise HTTPException(
@@ -202,6 +226,7 @@ async def like_tutorial(
             {"$inc": {"likes": 1}}
         )
         
+        await response_cache.invalidate("tutorials")
         return {"message": "Tutorial liked successfully"}
         
     except HTTPException:
@@ -308,6 +333,7 @@ async def get_content_stats(current_user: User = Depends(get_current_active_user
         )
 
 @router.get("/welcome/new-member")
+@cached_response(ttl=300, tags=("news", "tutorials", "tournaments"))
 async def get_welcome_content():
     """Get welcome content for new community members."""
     try:
@@ -383,6 +409,7 @@ async def delete_news(
                 detail="News article not found"
             )
         
+        await response_cache.invalidate("news")
         logger.info(f"News article '{news.title}' deleted by {current_user.username}")
         
         return {"message": f"News article '{news.title}' has been successfully deleted"}
@@ -430,6 +457,7 @@ async def delete_tutorial(
                 detail="Tutorial not found"
             )
         
+        await response_cache.invalidate("tutorials")
         logger.info(f"Tutorial '{tutorial.title}' deleted by {current_user.username}")
         
         return {"message": f"Tutorial '{tutorial.title}' has been successfully deleted"}
@@ -1,8 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from models import Match, MatchCreate, User, MatchStatus
 from auth import get_current_active_user, is_admin, is_moderator_or_admin
+from services.bracket_engine import BRACKET_ORDER, generate_double_elimination, generate_single_elimination
+from services.brackets import BracketConflictError, persist_bracket
+from services.events import MatchCompleted, TournamentCompleted, event_bus
+from services.live import bracket_event, live_broker, match_event, tournament_event
+from services.participants import SUMMARIES_FIELD, embedded_participants
+from services.response_cache import cached_response, response_cache
+from services.schedules import (
+    generate_round_robin, generate_swiss_round, standings_leader, standings_table, swiss_round_count
+)
+from services.standings import record_match_result, record_tournament_victory, seed_by_points
 from datetime import datetime
+from pymongo import ReturnDocument
+import asyncio
 import logging
 import random
 
@@ -13,11 +26,17 @@ router = APIRouter(prefix="/matches", tags=["Matches"])
 # Get database from database module
 from database import db
 
+async def publish_live(tournament_id: str, event: dict):
+    """Push a live event once cached reads of the tournament are dropped, so
+    clients refetching on it never get the state from before the change."""
+    await response_cache.invalidate("tournaments", "matches", f"tournament:{tournament_id}")
+    await live_broker.publish(tournament_id, event)
+
 @router.get("/tournament/{tournament_id}", response_model=List[Match])
 async def get_tournament_matches(tournament_id: str):
     """Get all matches for a tournament."""
     try:
-        matches = await db.matches.find({"tournament_id": tournament_id}).to_list(100)
+        matches = await db.matches.find({"tournament_id": tournament_id}).to_list(None)
         return [Match(**match) for match in matches]
         
     except Exception as e:
@@ -30,9 +49,14 @@ async def get_tournament_matches(tournament_id: str):
 @router.post("/tournament/{tournament_id}/generate-bracket")
 async def generate_tournament_bracket(
     tournament_id: str,
+    seeding: str = "random",
     current_user: User = Depends(get_current_active_user)
 ):
-    """Generate bracket for a tournament (admin only)."""
+    """Generate bracket for a tournament (admin only).
+
+    seeding: "random" draws the bracket, "standings" seeds participants by
+    their standings points (1 vs N, byes to the top seeds).
+    """
     try:
         if not is_admin(current_user):
             raise HTTPException(
@@ -40,6 +64,12 @@ async def generate_tournament_bracket(
                 detail="Only admins can generate brackets"
             )
 
+        if seeding not in ("random", "standings"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Seeding must be 'random' or 'standings'"
+            )
+
         # Get tournament
         tournament_data = await db.tournaments.find_one({"id": tournament_id})
         if not tournament_data:
@@ -58,9 +88,11 @@ async def generate_tournament_bracket(
                 detail="Tournament needs at least 2 participants to generate bracket"
             )
 
-        # Randomize participants for bracket
+        # Randomize participants for bracket (ties between equal seeds stay random)
         participants = tournament.participants.copy()
         random.shuffle(participants)
+        if seeding == "standings":
+            participants = await seed_by_points(db, participants)
 
         # Generate bracket matches based on tournament type
         matches = []
@@ -69,28 +101,27 @@ async def generate_tournament_bracket(
             matches = generate_elimination_bracket(tournament_id, participants)
         elif tournament.tournament_type == "bracket":
             matches = generate_bracket_tournament(tournament_id, participants)
+        elif tournament.tournament_type == "round_robin":
+            matches = generate_round_robin(tournament_id, participants)
+        elif tournament.tournament_type == "swiss":
+            # Later rounds are paired from the standings as each round ends
+            matches = generate_swiss_round(tournament_id, participants, [], 1)
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Bracket generation not supported for {tournament.tournament_type}"
             )
 
-        # Save matches to database
-        for match in matches:
-            await db.matches.insert_one(match.dict())
-
-        # Update tournament status to in_progress
-        await db.tournaments.update_one(
-            {"id": tournament_id},
-            {
-                "$set": {
-                    "status": "in_progress",
-                    "matches": [match.id for match in matches],
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
+        # Save matches and start the tournament in one operation
+        try:
+            await persist_bracket(db, tournament_id, [match.dict() for match in matches])
+        except BracketConflictError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Bracket already generated or being generated for this tournament"
+            )
 
+        await publish_live(tournament_id, bracket_event(tournament_id))
         logger.info(f"Generated {len(matches)} matches for tournament {tournament.title}")
         
         return {
@@ -109,64 +140,12 @@ async def generate_tournament_bracket(
         )
 
 def generate_elimination_bracket(tournament_id: str, participants: List[str]) -> List[Match]:
-    """Generate single elimination bracket."""
-    matches = []
-    round_number = 1
-    current_participants = participants.copy()
-    
-    # Ensure even number of participants (add bye if needed)
-    if len(current_participants) % 2 != 0:
-        current_participants.append("BYE")
-    
-    match_number = 1
-    
-    while len(current_participants) > 1:
-        round_matches = []
-        next_round_participants = []
-        
-        # Create matches for current round
-        for i in range(0, len(current_participants), 2):
-            player1 = current_participants[i]
-            player2 = current_participants[i + 1] if i + 1 < len(current_participants) else "BYE"
-            
-            # Handle bye
-            if player2 == "BYE":
-                next_round_participants.append(player1)
-                continue
-            if player1 == "BYE":
-                next_round_participants.append(player2)
-                continue
-            
-            match = Match(
-                tournament_id=tournament_id,
-                round_number=round_number,
-                match_number=match_number,
-                player1_id=player1,
-                player2_id=player2,
-                status=MatchStatus.SCHEDULED,
-                scheduled_time=datetime.utcnow()
-            )
-            
-            matches.append(match)
-            round_matches.append(match)
-            match_number += 1
-        
-        # Add placeholder for winners
-        for match in round_matches:
-            next_round_participants.append(f"Winner of Match {match.match_number}")
-        
-        current_participants = next_round_participants
-        round_number += 1
-        
-        # Safety check to prevent infinite loop
-        if round_number > 10:
-            break
-    
-    return matches
+    """Generate single elimination bracket (participants ordered best seed first)."""
+    return generate_single_elimination(tournament_id, participants)
 
 def generate_bracket_tournament(tournament_id: str, participants: List[str]) -> List[Match]:
-    """Generate bracket tournament (similar to elimination but with better structure)."""
-    return generate_elimination_bracket(tournament_id, participants)
+    """Generate bracket tournament (double elimination with a grand final)."""
+    return generate_double_elimination(tournament_id, participants)
 
 @router.put("/{match_id}/result")
 async def update_match_result(
@@ -211,8 +190,8 @@ async def update_match_result(
                 detail="Winner must be one of the match participants"
             )
 
-        # Update match
-        await db.matches.update_one(
+        # Update match, keeping the previous state to tell a new result from a correction
+        previous = await db.matches.find_one_and_update(
             {"id": match_id},
             {
                 "$set": {
@@ -227,9 +206,33 @@ async def update_match_result(
             }
         )
 
-        # Update next round match if exists
-        await update_next_round_match(match.tournament_id, match.round_number, match.match_number, winner_id)
+        await event_bus.publish(MatchCompleted(
+            tournament_id=match.tournament_id,
+            match_id=match_id,
+            winner_id=winner_id,
+            player1_id=match.player1_id,
+            player2_id=match.player2_id
+        ))
+
+        await publish_live(match.tournament_id, match_event(match.tournament_id, {
+            "id": match_id,
+            "status": MatchStatus.COMPLETED,
+            "winner_id": winner_id,
+            "player1_score": int(player1_score),
+            "player2_score": int(player2_score)
+        }))
+
+        # Update match counters in standings
+        await record_match_result(db, previous, winner_id)
+
+        # Linked brackets store next_match_id on every match (None on the final)
+        if "next_match_id" in previous:
+            await advance_winner(match, winner_id, previous["status"] == MatchStatus.COMPLETED)
+        else:
+            # Bracket generated before matches were linked
+            await update_next_round_match(match.tournament_id, match.round_number, match.match_number, winner_id)
 
+        await response_cache.invalidate("tournaments", "matches", f"tournament:{match.tournament_id}")
         logger.info(f"Match {match_id} result updated - Winner: {winner_id}")
         
         return {"message": "Match result updated successfully"}
@@ -243,8 +246,118 @@ async def update_match_result(
             detail="Error updating match result"
         )
 
+ADVANCE_PROJECTION = {"_id": 0, "remaining_matches": 1, "tournament_type": 1, "participants": 1}
+SCHEDULE_MATCH_PROJECTION = {"_id": 0, "round_number": 1, "player1_id": 1, "player2_id": 1, "winner_id": 1, "status": 1}
+
+async def advance_winner(match: Match, winner_id: str, was_completed: bool):
+    """Move the winner (and in double elimination the loser) into their linked slots
+    and count the match as played."""
+    try:
+        if match.next_match_id:
+            await db.matches.update_one(
+                {"id": match.next_match_id},
+                {"$set": {f"player{match.next_match_slot}_id": winner_id, "updated_at": datetime.utcnow()}}
+            )
+            await publish_live(match.tournament_id, match_event(
+                match.tournament_id, {"id": match.next_match_id, f"player{match.next_match_slot}_id": winner_id}
+            ))
+
+        if match.loser_next_match_id:
+            loser_id = match.player2_id if winner_id == match.player1_id else match.player1_id
+            await db.matches.update_one(
+                {"id": match.loser_next_match_id},
+                {"$set": {f"player{match.loser_next_match_slot}_id": loser_id, "updated_at": datetime.utcnow()}}
+            )
+            await publish_live(match.tournament_id, match_event(
+                match.tournament_id, {"id": match.loser_next_match_id, f"player{match.loser_next_match_slot}_id": loser_id}
+            ))
+
+        if was_completed:
+            # Corrected result: the match was already counted and its round
+            # already finished. Only a corrected final, or any corrected match
+            # of a finished schedule, moves the title.
+            if not match.next_match_id:
+                tournament = await db.tournaments.find_one(
+                    {"id": match.tournament_id}, {"_id": 0, "status": 1, "tournament_type": 1, "participants": 1, "winner_id": 1}
+                )
+                if not tournament or tournament.get("status") != "completed":
+                    return
+                if tournament.get("tournament_type") in ("round_robin", "swiss"):
+                    matches = await db.matches.find(
+                        {"tournament_id": match.tournament_id}, SCHEDULE_MATCH_PROJECTION
+                    ).to_list(None)
+                    winner_id = standings_leader(tournament.get("participants", []), matches)
+                if winner_id != tournament.get("winner_id"):
+                    await complete_tournament(match.tournament_id, winner_id)
+            return
+
+        tournament = await db.tournaments.find_one_and_update(
+            {"id": match.tournament_id},
+            {"$inc": {"remaining_matches": -1}},
+            projection=ADVANCE_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+
+        # Only the request taking the count to 0 finishes the round
+        if not match.next_match_id and tournament and tournament.get("remaining_matches") == 0:
+            if tournament.get("tournament_type") in ("round_robin", "swiss"):
+                await finish_schedule_round(match.tournament_id, tournament)
+            else:
+                # The final is the only match without a next match
+                await complete_tournament(match.tournament_id, winner_id)
+
+    except Exception as e:
+        logger.error(f"Error advancing winner of match {match.id}: {str(e)}")
+
+async def finish_schedule_round(tournament_id: str, tournament: dict):
+    """All scheduled matches are played: pair the next Swiss round, or crown the standings leader."""
+    participants = tournament.get("participants", [])
+    matches = await db.matches.find({"tournament_id": tournament_id}, SCHEDULE_MATCH_PROJECTION).to_list(None)
+
+    if tournament.get("tournament_type") == "swiss":
+        played_rounds = max(m["round_number"] for m in matches)
+        if played_rounds < swiss_round_count(len(participants)):
+            next_round = generate_swiss_round(
+                tournament_id, participants, matches, played_rounds + 1, first_match_number=len(matches) + 1
+            )
+            # Claim the pairing before inserting the round: the matches count as
+            # remaining at once, and a concurrent finisher fails the round check
+            claimed = await db.tournaments.update_one(
+                {
+                    "id": tournament_id,
+                    "remaining_matches": 0,
+                    "paired_rounds": {"$in": [played_rounds, None]}
+                },
+                {
+                    "$inc": {"remaining_matches": sum(1 for m in next_round if m.status != MatchStatus.COMPLETED)},
+                    "$push": {"matches": {"$each": [m.id for m in next_round]}},
+                    "$set": {"paired_rounds": played_rounds + 1, "updated_at": datetime.utcnow()}
+                }
+            )
+            if not claimed.modified_count:
+                logger.info(f"Swiss round {played_rounds + 1} of tournament {tournament_id} already paired")
+                return
+            try:
+                await db.matches.insert_many([m.dict() for m in next_round], ordered=False)
+            except Exception:
+                # Release the claim so that the round can be paired again
+                await db.tournaments.update_one(
+                    {"id": tournament_id, "paired_rounds": played_rounds + 1},
+                    {
+                        "$set": {"remaining_matches": 0, "paired_rounds": played_rounds},
+                        "$pull": {"matches": {"$in": [m.id for m in next_round]}}
+                    }
+                )
+                await db.matches.delete_many({"id": {"$in": [m.id for m in next_round]}})
+                raise
+            await publish_live(tournament_id, bracket_event(tournament_id))
+            logger.info(f"Paired Swiss round {played_rounds + 1} for tournament {tournament_id}")
+            return
+
+    await complete_tournament(tournament_id, standings_leader(participants, matches))
+
 async def update_next_round_match(tournament_id: str, current_round: int, current_match: int, winner_id: str):
-    """Update next round match with winner."""
+    """Update next round match with winner (brackets without next match links)."""
     try:
         # Find next round match that should receive this winner
         next_round = current_round + 1
@@ -259,15 +372,14 @@ async def update_next_round_match(tournament_id: str, current_round: int, curren
         if next_match:
             # Determine if winner should be player1 or player2 in next match
             if current_match % 2 == 1:  # Odd match number -> player1
-                await db.matches.update_one(
-                    {"id": next_match["id"]},
-                    {"$set": {"player1_id": winner_id, "updated_at": datetime.utcnow()}}
-                )
+                slot_field = "player1_id"
             else:  # Even match number -> player2
-                await db.matches.update_one(
-                    {"id": next_match["id"]},
-                    {"$set": {"player2_id": winner_id, "updated_at": datetime.utcnow()}}
-                )
+                slot_field = "player2_id"
+            await db.matches.update_one(
+                {"id": next_match["id"]},
+                {"$set": {slot_field: winner_id, "updated_at": datetime.utcnow()}}
+            )
+            await publish_live(tournament_id, match_event(tournament_id, {"id": next_match["id"], slot_field: winner_id}))
         
         # Check if tournament is complete
         await check_tournament_completion(tournament_id)
@@ -276,10 +388,10 @@ async def update_next_round_match(tournament_id: str, current_round: int, curren
         logger.error(f"Error updating next round match: {str(e)}")
 
 async def check_tournament_completion(tournament_id: str):
-    """Check if tournament is complete and update winner."""
+    """Check if tournament is complete and update winner (brackets without next match links)."""
     try:
         # Get all matches for the tournament
-        all_matches = await db.matches.find({"tournament_id": tournament_id}).to_list(100)
+        all_matches = await db.matches.find({"tournament_id": tournament_id}).to_list(None)
         
         if not all_matches:
             return
@@ -293,31 +405,131 @@ async def check_tournament_completion(tournament_id: str):
         final_match = max(all_matches, key=lambda x: x["round_number"])
         
         if final_match and final_match["status"] == MatchStatus.COMPLETED and final_match["winner_id"]:
-            # Tournament is complete - update with winner
-            await db.tournaments.update_one(
-                {"id": tournament_id},
-                {
-                    "$set": {
-                        "status": "completed",
-                        "winner_id": final_match["winner_id"],
-                        "tournament_end": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-            logger.info(f"Tournament {tournament_id} completed - Winner: {final_match['winner_id']}")
+            await complete_tournament(tournament_id, final_match["winner_id"])
         
     except Exception as e:
         logger.error(f"Error checking tournament completion: {str(e)}")
 
+async def complete_tournament(tournament_id: str, winner_id: str):
+    """Mark the tournament completed with its winner and award the trophy."""
+    tournament = await db.tournaments.find_one_and_update(
+        {"id": tournament_id},
+        {
+            "$set": {
+                "status": "completed",
+                "winner_id": winner_id,
+                "tournament_end": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            }
+        }
+    )
+    
+    # Award the trophy in standings, moving it if the final result was corrected
+    previous_winner = tournament.get("winner_id") if tournament and tournament.get("status") == "completed" else None
+    if tournament and previous_winner != winner_id:
+        if previous_winner:
+            await record_tournament_victory(db, tournament, previous_winner, delta=-1)
+        await record_tournament_victory(db, tournament, winner_id)
+    
+    await event_bus.publish(TournamentCompleted(tournament_id=tournament_id, winner_id=winner_id))
+    await publish_live(tournament_id, tournament_event(tournament_id, status="completed", winner_id=winner_id))
+    logger.info(f"Tournament {tournament_id} completed - Winner: {winner_id}")
+
+@router.get("/tournament/{tournament_id}/standings")
+async def get_tournament_standings(tournament_id: str):
+    """Get round robin / Swiss standings with Buchholz and head-to-head tiebreakers."""
+    try:
+        tournament = await db.tournaments.find_one({"id": tournament_id}, {"_id": 0, "participants": 1, SUMMARIES_FIELD: 1})
+        if not tournament:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tournament not found"
+            )
+
+        participants = tournament.get("participants", [])
+        matches = await db.matches.find(
+            {"tournament_id": tournament_id},
+            {"_id": 0, "player1_id": 1, "player2_id": 1, "winner_id": 1, "status": 1}
+        ).to_list(None)
+
+        standings = standings_table(participants, matches)
+        participants_map = await embedded_participants(db, tournament)
+        for row in standings:
+            info = participants_map.get(row["participant_id"])
+            row["name"] = info.display_name if info else f"Joueur {row['participant_id'][:8]}"
+
+        return {"standings": standings}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting tournament standings: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error fetching tournament standings"
+        )
+
+# Comment line sent to idle SSE connections so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
+
+@router.get("/tournament/{tournament_id}/events")
+async def stream_tournament_events(tournament_id: str, request: Request):
+    """Server-Sent Events stream of a tournament's live updates.
+
+    Events are JSON: "match" deltas (a match id and the fields that changed),
+    "tournament" status changes, and "bracket" / "resync" which ask the client
+    to refetch the bracket.
+    """
+    queue = live_broker.subscribe(tournament_id)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                    yield f"data: {payload}\n\n"
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            live_broker.unsubscribe(tournament_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/tournament/{tournament_id}/ws")
+async def tournament_events_websocket(websocket: WebSocket, tournament_id: str):
+    """WebSocket carrying the same events as the SSE stream, one JSON message per event."""
+    await websocket.accept()
+    queue = live_broker.subscribe(tournament_id)
+
+    async def forward():
+        while True:
+            await websocket.send_text(await queue.get())
+
+    sender = asyncio.create_task(forward())
+    try:
+        # Incoming messages are ignored; receiving detects the disconnection
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        live_broker.unsubscribe(tournament_id, queue)
+
 @router.get("/tournament/{tournament_id}/bracket")
+@cached_response(ttl=30, tags=("tournament:{tournament_id}",))
 async def get_tournament_bracket(tournament_id: str):
     """Get tournament bracket structure with participant names."""
     try:
         # Get all matches for the tournament
         matches = await db.matches.find(
             {"tournament_id": tournament_id}
-        ).sort("round_number", 1).to_list(100)
+        ).sort([("round_number", 1), ("match_number", 1)]).to_list(None)
         
         if not matches:
             return {"rounds": [], "tournament_status": "no_bracket"}
@@ -330,39 +542,14 @@ async def get_tournament_bracket(tournament_id: str):
         # Get participant names mapping
         participants_map = {}
         if tournament:
-            for participant_id in tournament.get("participants", []):
-                # Try to find as user first
-                user_data = await db.users.find_one({"id": participant_id})
-                if user_data:
-                    participants_map[participant_id] = {
-                        "type": "user",
-                        "name": user_data["username"],
-                        "display_name": user_data["username"]
-                    }
-                    continue
-                
-                # Try to find as team
-                team_data = await db.teams.find_one({"id": participant_id})
-                if team_data:
-                    participants_map[participant_id] = {
-                        "type": "team",
-                        "name": team_data["name"],
-                        "display_name": f"{team_data['name']} ({len(team_data['members'])}/{team_data['max_members']})"
-                    }
-                    continue
-                
-                # Fallback
-                participants_map[participant_id] = {
-                    "type": "unknown", 
-                    "name": f"Participant {participant_id[:8]}",
-                    "display_name": f"Participant {participant_id[:8]}"
-                }
+            participants_map = await embedded_participants(db, tournament)
 
         # Organize matches by rounds and enrich with participant names
         rounds = {}
         for match_data in matches:
             match = Match(**match_data)
-            round_num = match.round_number
+            # Double elimination has winners, losers and grand final rounds
+            round_num = (BRACKET_ORDER.get(match.bracket, 0), match.round_number)
             
             if round_num not in rounds:
                 rounds[round_num] = []
@@ -372,10 +559,13 @@ async def get_tournament_bracket(tournament_id: str):
             
             # Add participant names
             if match.player1_id and match.player1_id in participants_map:
-                match_dict["player1_name"] = participants_map[match.player1_id]["display_name"]
-                match_dict["player1_type"] = participants_map[match.player1_id]["type"]
+                match_dict["player1_name"] = participants_map[match.player1_id].display_name
+                match_dict["player1_type"] = participants_map[match.player1_id].type
+            elif match.player1_id == "BYE":
+                match_dict["player1_name"] = "BYE"
+                match_dict["player1_type"] = "bye"
             elif match.player1_id:
-                if match.player1_id.startswith("Winner of"):
+                if match.player1_id.startswith(("Winner of", "Loser of")):
                     match_dict["player1_name"] = match.player1_id
                     match_dict["player1_type"] = "placeholder"
                 else:
@@ -386,10 +576,13 @@ async def get_tournament_bracket(tournament_id: str):
                 match_dict["player1_type"] = "tbd"
             
             if match.player2_id and match.player2_id in participants_map:
-                match_dict["player2_name"] = participants_map[match.player2_id]["display_name"]
-                match_dict["player2_type"] = participants_map[match.player2_id]["type"]
+                match_dict["player2_name"] = participants_map[match.player2_id].display_name
+                match_dict["player2_type"] = participants_map[match.player2_id].type
+            elif match.player2_id == "BYE":
+                match_dict["player2_name"] = "BYE"
+                match_dict["player2_type"] = "bye"
             elif match.player2_id:
-                if match.player2_id.startswith("Winner of"):
+                if match.player2_id.startswith(("Winner of", "Loser of")):
                     match_dict["player2_name"] = match.player2_id
                     match_dict["player2_type"] = "placeholder"
                 else:
@@ -401,15 +594,21 @@ async def get_tournament_bracket(tournament_id: str):
             
             # Add winner name
             if match.winner_id and match.winner_id in participants_map:
-                match_dict["winner_name"] = participants_map[match.winner_id]["display_name"]
+                match_dict["winner_name"] = participants_map[match.winner_id].display_name
             
             rounds[round_num].append(match_dict)
 
         return {
-            "rounds": [{"round_number": k, "matches": v} for k, v in sorted(rounds.items())],
+            "rounds": [
+                {"round_number": k[1], "bracket": v[0]["bracket"], "matches": v}
+                for k, v in sorted(rounds.items())
+            ],
             "tournament_status": tournament_status,
             "tournament_type": tournament_type,
-            "participants_map": participants_map
+            "participants_map": {
+                participant_id: info.dict(exclude={"id"}, exclude_none=True)
+                for participant_id, info in participants_map.items()
+            }
         }
         
     except Exception as e:
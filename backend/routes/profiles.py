@@ -2,11 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from typing import Optional
 from models import User
 from auth import get_current_active_user
+from services.avatars import InvalidAvatarError, decode_data_url, store_avatar, store_avatar_stream
 from datetime import datetime
+import asyncio
 import logging
-import uuid
-import os
-import shutil
 
 logger = logging.getLogger(__name__)
 
@@ -15,58 +14,66 @@ router = APIRouter(prefix="/profiles", tags=["Profiles"])
 # Get database from database module
 from database import db
 
+# Fields read by get_user_profile, so each lookup only fetches what it shows
+USER_PROFILE_FIELDS = {"_id": 0, "id": 1, "username": 1, "role": 1, "status": 1, "created_at": 1, "is_verified": 1}
+PROFILE_FIELDS = {
+    "_id": 0, "display_name": 1, "bio": 1, "avatar_url": 1, "discord_username": 1, "twitch_username": 1,
+    "steam_profile": 1, "favorite_games": 1, "gaming_experience": 1, "location": 1, "banner_url": 1
+}
+TEAM_FIELDS = {"_id": 0, "id": 1, "name": 1, "game": 1, "captain_id": 1}
+RECENT_MATCH_FIELDS = {
+    "_id": 0, "id": 1, "tournament_id": 1, "player1_id": 1, "player2_id": 1,
+    "winner_id": 1, "player1_score": 1, "player2_score": 1, "completed_at": 1
+}
+
 @router.get("/{user_id}")
 async def get_user_profile(user_id: str):
     """Get user profile with trophies and statistics."""
     try:
-        # Get user basic info
-        user_data = await db.users.find_one({"id": user_id})
-        if not user_data:
+        # The lookups are independent: run them concurrently
+        user, profile, tournament_stats, teams, recent_matches = await asyncio.gather(
+            db.users.find_one({"id": user_id}, USER_PROFILE_FIELDS),
+            db.user_profiles.find_one({"user_id": user_id}, PROFILE_FIELDS),
+            get_user_tournament_stats(user_id),
+            db.teams.find({"members": {"$in": [user_id]}}, TEAM_FIELDS).to_list(10),
+            db.matches.find(
+                {
+                    "$or": [
+                        {"player1_id": user_id},
+                        {"player2_id": user_id}
+                    ],
+                    "status": "completed"
+                },
+                RECENT_MATCH_FIELDS
+            ).sort("completed_at", -1).limit(10).to_list(10)
+        )
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        user = User(**user_data)
-        
-        # Get extended profile
-        profile = await db.user_profiles.find_one({"user_id": user_id})
-        
-        # Get tournament statistics
-        tournament_stats = await get_user_tournament_stats(user_id)
-        
-        # Get team memberships
-        teams = await db.teams.find({"members": {"$in": [user_id]}}).to_list(10)
-        
-        # Get recent matches
-        recent_matches = await db.matches.find({
-            "$or": [
-                {"player1_id": user_id},
-                {"player2_id": user_id}
-            ],
-            "status": "completed"
-        }).sort("completed_at", -1).limit(10).to_list(10)
-        
+        profile = profile or {}
         profile_data = {
             "user": {
-                "id": user.id,
-                "username": user.username,
-                "role": user.role,
-                "status": user.status,
-                "created_at": user.created_at,
-                "is_verified": user.is_verified
+                "id": user["id"],
+                "username": user["username"],
+                "role": user.get("role"),
+                "status": user.get("status"),
+                "created_at": user.get("created_at"),
+                "is_verified": user.get("is_verified", False)
             },
             "profile": {
-                "display_name": profile.get("display_name", user.username) if profile else user.username,
-                "bio": profile.get("bio", "") if profile else "",
-                "avatar_url": profile.get("avatar_url", "") if profile else "",
-                "discord_username": profile.get("discord_username", "") if profile else "",
-                "twitch_username": profile.get("twitch_username", "") if profile else "",
-                "steam_profile": profile.get("steam_profile", "") if profile else "",
-                "favorite_games": profile.get("favorite_games", []) if profile else [],
-                "gaming_experience": profile.get("gaming_experience", {}) if profile else {},
-                "location": profile.get("location", "") if profile else "",
-                "banner_url": profile.get("banner_url", "") if profile else ""
+                "display_name": profile.get("display_name", user["username"]),
+                "bio": profile.get("bio", ""),
+                "avatar_url": profile.get("avatar_url", ""),
+                "discord_username": profile.get("discord_username", ""),
+                "twitch_username": profile.get("twitch_username", ""),
+                "steam_profile": profile.get("steam_profile", ""),
+                "favorite_games": profile.get("favorite_games", []),
+                "gaming_experience": profile.get("gaming_experience", {}),
+                "location": profile.get("location", ""),
+                "banner_url": profile.get("banner_url", "")
             },
             "statistics": tournament_stats,
             "teams": [
@@ -160,43 +167,17 @@ async def upload_avatar(
 ):
     """Upload user avatar."""
     try:
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/png", "image/webp"]
-        if file.content_type not in allowed_types:
+        # Copy, validate and resize in a worker thread: the 5MB limit, the image header
+        # and the hash are all checked while the upload is written, in a single pass
+        try:
+            avatar_url = await asyncio.to_thread(store_avatar_stream, file.file)
+        except InvalidAvatarError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only JPEG, PNG, and WebP images are allowed"
+                detail=str(e)
             )
         
-        # Validate file size (max 5MB)
-        file_size = 0
-        chunk_size = 1024
-        for chunk in iter(lambda: file.file.read(chunk_size), b""):
-            file_size += len(chunk)
-            if file_size > 5 * 1024 * 1024:  # 5MB
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="File size must be less than 5MB"
-                )
-        
-        # Reset file pointer
-        file.file.seek(0)
-        
-        # Create uploads directory if it doesn't exist
-        upload_dir = "/app/uploads/avatars"
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
-        file_extension = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-        filename = f"{current_user.id}_{uuid.uuid4().hex[:8]}.{file_extension}"
-        file_path = os.path.join(upload_dir, filename)
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
         # Update profile with avatar URL
-        avatar_url = f"/uploads/avatars/{filename}"
         await db.user_profiles.update_one(
             {"user_id": current_user.id},
             {
@@ -208,7 +189,7 @@ async def upload_avatar(
             upsert=True
         )
         
-        logger.info(f"Avatar uploaded for user {current_user.username}: {filename}")
+        logger.info(f"Avatar uploaded for user {current_user.username}: {avatar_url}")
         
         return {
             "message": "Avatar uploaded successfully",
@@ -231,62 +212,17 @@ async def upload_avatar_base64(
 ):
     """Upload user avatar from base64 encoded image data."""
     try:
-        import base64
-        import io
-        from PIL import Image
-        
-        # Extract the actual base64 data (remove data:image/...;base64, prefix if present)
-        if avatar_data.startswith('data:image'):
-            header, encoded = avatar_data.split(',', 1)
-            # Validate image type from header
-            if 'jpeg' not in header and 'jpg' not in header and 'png' not in header and 'webp' not in header:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Only JPEG, PNG, and WebP images are allowed"
-                )
-        else:
-            encoded = avatar_data
-        
-        # Decode base64
+        # Decode, resize and store on disk off the event loop; only the short URL goes to MongoDB
         try:
-            image_data = base64.b64decode(encoded)
-        except Exception:
+            image_data = decode_data_url(avatar_data)
+            avatar_url = await asyncio.to_thread(store_avatar, image_data)
+        except InvalidAvatarError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid base64 image data"
+                detail=str(e)
             )
         
-        # Validate image and check size
-        try:
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Check file size (max 5MB)
-            if len(image_data) > 5 * 1024 * 1024:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Image size must be less than 5MB"
-                )
-            
-            # Resize image if too large (max 800x800)
-            if image.width > 800 or image.height > 800:
-                image.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                
-                # Save resized image to bytes
-                output = io.BytesIO()
-                image.save(output, format='PNG', optimize=True)
-                image_data = output.getvalue()
-                
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid image data"
-            )
-        
-        # Convert to base64 and store directly in database (for simplicity)
-        avatar_base64 = base64.b64encode(image_data).decode('utf-8')
-        avatar_url = f"data:image/png;base64,{avatar_base64}"
-        
-        # Update profile with avatar base64 data
+        # Update profile with avatar URL
         await db.user_profiles.update_one(
             {"user_id": current_user.id},
             {
@@ -317,30 +253,34 @@ async def upload_avatar_base64(
 async def get_user_tournament_stats(user_id: str) -> dict:
     """Get comprehensive tournament statistics for a user."""
     try:
-        # Get all tournaments where user participated
-        tournaments_participated = await db.tournaments.find({
-            "participants": {"$in": [user_id]}
-        }).to_list(100)
-        
-        # Get tournaments won
-        tournaments_won = await db.tournaments.find({
-            "winner_id": user_id,
-            "status": "completed"
-        }).to_list(100)
-        
-        # Get all matches played
-        matches_played = await db.matches.find({
-            "$or": [
-                {"player1_id": user_id},
-                {"player2_id": user_id}
-            ],
-            "status": "completed"
-        }).to_list(200)
+        # Participations, tournaments won and match results in parallel
+        total_tournaments, tournaments_won, match_results = await asyncio.gather(
+            db.tournaments.count_documents({"participants": {"$in": [user_id]}}),
+            db.tournaments.find(
+                {"winner_id": user_id, "status": "completed"},
+                {"_id": 0, "title": 1, "max_participants": 1}
+            ).to_list(None),
+            # Completed matches and wins counted by the server
+            db.matches.aggregate([
+                {"$match": {
+                    "$or": [
+                        {"player1_id": user_id},
+                        {"player2_id": user_id}
+                    ],
+                    "status": "completed"
+                }},
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "won": {"$sum": {"$cond": [{"$eq": ["$winner_id", user_id]}, 1, 0]}}
+                }}
+            ]).to_list(1)
+        )
         
         # Calculate statistics
-        total_tournaments = len(tournaments_participated)
         total_victories = len(tournaments_won)
-        total_matches = len(matches_played)
+        total_matches = match_results[0]["total"] if match_results else 0
+        matches_won = match_results[0]["won"] if match_results else 0
         
         # Count victories by tournament type
         victories_by_type = {"1v1": 0, "2v2": 0, "5v5": 0}
@@ -356,7 +296,6 @@ async def get_user_tournament_stats(user_id: str) -> dict:
                 victories_by_type["5v5"] += 1
         
         # Calculate match win rate
-        matches_won = sum(1 for match in matches_played if match["winner_id"] == user_id)
         win_rate = (matches_won / total_matches * 100) if total_matches > 0 else 0
         
         # Calculate points
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
 from models import Team, TeamCreate, User, Game
 from auth import get_current_active_user, is_admin, is_moderator_or_admin
+from services.events import TeamMembershipChanged, event_bus
+from services.jobs import enqueue
+from services.maintenance import REMOVE_TEAM_FROM_TOURNAMENTS_JOB
+from services.pagination import NEWEST_FIRST, NEXT_CURSOR_HEADER, InvalidCursorError, paginate
+from services.participants import ParticipantResolver, summary_reconciler
+from services.response_cache import cached_response, response_cache
+from services.standings import (
+    team_statistics, ensure_standing, delete_standing
+)
 from datetime import datetime
 import logging
 
@@ -38,6 +47,7 @@ async def create_team(
         )
         
         await db.teams.insert_one(new_team.dict())
+        await ensure_standing(db, new_team.id, "team", new_team.game)
         
         # Update user profile team count
         await db.user_profiles.update_one(
@@ -45,6 +55,7 @@ async def create_team(
             {"$inc": {"total_teams": 1}}
         )
         
+        await response_cache.invalidate("teams")
         logger.info(f"Team created: {team_data.name} by {current_user.username}")
         
         return new_team
@@ -60,12 +71,14 @@ async def create_team(
 
 @router.get("/", response_model=List[Team])
 async def get_teams(
+    response: Response,
     game: Optional[Game] = None,
     is_open: Optional[bool] = None,
-    limit: int = Query(20, le=100),
-    skip: int = Query(0, ge=0)
+    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None
 ):
-    """Get teams with optional filtering."""
+    """Get teams with optional filtering, newest first (cursor in X-Next-Cursor)."""
     try:
         filter_dict = {}
         if game:
@@ -73,9 +86,16 @@ async def get_teams(
         if is_open is not None:
             filter_dict["is_open"] = is_open
         
-        teams = await db.teams.find(filter_dict).skip(skip).limit(limit).to_list(limit)
+        teams, next_cursor = await paginate(db.teams, filter_dict, NEWEST_FIRST, limit, cursor=cursor, skip=skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return [Team(**team) for team in teams]
         
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         logger.error(f"Error getting teams: {str(e)}")
         raise HTTPException(
@@ -174,6 +194,9 @@ async def join_team(
             }
         )
         
+        summary_reconciler.mark_changed(team_id)
+        await event_bus.publish(TeamMembershipChanged(team_id=team_id, members=[*team.members, current_user.id]))
+        await response_cache.invalidate("teams")
         logger.info(f"User {current_user.username} joined team {team.name}")
         
         return {"message": f"Successfully joined team {team.name}"}
@@ -221,6 +244,10 @@ async def leave_team(
             else:
                 # If captain is the only member, disband the team
                 await db.teams.delete_one({"id": team_id})
+                await delete_standing(db, team_id)
+                summary_reconciler.mark_changed(team_id)
+                await event_bus.publish(TeamMembershipChanged(team_id=team_id, members=[]))
+                await response_cache.invalidate("teams")
                 logger.info(f"Team {team.name} disbanded by captain {current_user.username}")
                 return {"message": f"Team {team.name} disbanded"}
         
@@ -233,6 +260,11 @@ async def leave_team(
             }
         )
         
+        summary_reconciler.mark_changed(team_id)
+        await event_bus.publish(TeamMembershipChanged(
+            team_id=team_id, members=[member_id for member_id in team.members if member_id != current_user.id]
+        ))
+        await response_cache.invalidate("teams")
         logger.info(f"User {current_user.username} left team {team.name}")
         
         return {"message": f"Successfully left team {team.name}"}
@@ -289,6 +321,7 @@ async def transfer_captaincy(
             }
         )
         
+        await response_cache.invalidate("teams")
         logger.info(f"Team {team.name} captaincy transferred to {new_captain_id} by {current_user.username}")
         
         return {"message": "Captaincy transferred successfully"}
@@ -335,6 +368,11 @@ async def delete_team(
                 detail="Failed to delete team"
             )
         
+        await delete_standing(db, team_id)
+        
+        summary_reconciler.mark_changed(team_id)
+        await event_bus.publish(TeamMembershipChanged(team_id=team_id, members=[]))
+        await response_cache.invalidate("teams")
         logger.info(f"Team {team.name} deleted by {current_user.username}")
         
         return {"message": f"Team '{team.name}' deleted successfully"}
@@ -413,6 +451,8 @@ async def update_team(
             {"$set": update_fields}
         )
         
+        summary_reconciler.mark_changed(team_id)
+        await response_cache.invalidate("teams")
         logger.info(f"Team {team.name} updated by {current_user.username}")
         
         return {"message": "Team updated successfully"}
@@ -482,6 +522,9 @@ async def add_member_to_team(
             }
         )
         
+        summary_reconciler.mark_changed(team_id)
+        await event_bus.publish(TeamMembershipChanged(team_id=team_id, members=[*team.members, user_id]))
+        await response_cache.invalidate("teams")
         logger.info(f"User {user_to_add['username']} added to team {team.name} by {current_user.username}")
         
         return {"message": f"User {user_to_add['username']} added to team successfully"}
@@ -546,6 +589,11 @@ async def remove_member_from_team(
             }
         )
         
+        summary_reconciler.mark_changed(team_id)
+        await event_bus.publish(TeamMembershipChanged(
+            team_id=team_id, members=[member_id for member_id in team.members if member_id != user_id]
+        ))
+        await response_cache.invalidate("teams")
         logger.info(f"User {user_to_remove['username'] if user_to_remove else user_id} removed from team {team.name} by {current_user.username}")
         
         return {"message": f"User removed from team successfully"}
@@ -611,6 +659,7 @@ async def get_available_users_for_team(
         )
 
 @router.get("/stats/community")
+@cached_response(ttl=60, tags=("teams",))
 async def get_team_stats():
     """Get team statistics for the community."""
     try:
@@ -652,34 +701,38 @@ async def get_team_stats():
 @router.get("/leaderboard")
 async def get_team_leaderboard(
     game: Optional[Game] = None,
-    limit: int = Query(50, le=100)
+    limit: int = Query(50, ge=1, le=100)
 ):
     """Get team leaderboard with rankings based on tournament victories."""
     try:
-        # Build filter for teams
-        filter_dict = {}
+        # Top teams from the materialized standings, already sorted by points
+        filter_dict = {"participant_type": "team"}
         if game:
             filter_dict["game"] = game
         
-        teams = await db.teams.find(filter_dict).to_list(500)
+        standings = await db.standings.find(filter_dict).sort(
+            [("total_points", -1), ("participant_id", 1)]
+        ).limit(limit).to_list(limit)
+        
+        teams = await db.teams.find(
+            {"id": {"$in": [standing["participant_id"] for standing in standings]}}
+        ).to_list(None)
+        teams_by_id = {team_data["id"]: Team(**team_data) for team_data in teams}
+        
+        # Resolve every member and captain name in one query
+        usernames = await ParticipantResolver(db).usernames(
+            user_id for team in teams_by_id.values() for user_id in [team.captain_id, *team.members]
+        )
         
         team_rankings = []
-        for team_data in teams:
-            team = Team(**team_data)
-            
-            # Calculate team statistics
-            team_stats = await calculate_team_statistics(team.id)
+        for standing in standings:
+            team = teams_by_id.get(standing["participant_id"])
+            if not team:
+                continue
             
             # Get team member names
-            member_names = []
-            for member_id in team.members:
-                member = await db.users.find_one({"id": member_id})
-                if member:
-                    member_names.append(member["username"])
-            
-            # Get captain name
-            captain = await db.users.find_one({"id": team.captain_id})
-            captain_name = captain["username"] if captain else "Unknown"
+            member_names = [usernames[member_id] for member_id in team.members if member_id in usernames]
+            captain_name = usernames.get(team.captain_id, "Unknown")
             
             team_rankings.append({
                 "team_id": team.id,
@@ -690,13 +743,10 @@ async def get_team_leaderboard(
                 "member_count": len(team.members),
                 "max_members": team.max_members,
                 "is_open": team.is_open,
-                "statistics": team_stats,
+                "statistics": team_statistics(standing),
                 "created_at": team.created_at
             })
         
-        # Sort by total points descending
-        team_rankings.sort(key=lambda x: x["statistics"]["total_points"], reverse=True)
-        
         # Add ranks
         for i, team in enumerate(team_rankings[:limit]):
             team["rank"] = i + 1
@@ -760,15 +810,16 @@ async def delete_team(
                 detail=f"Cannot delete team. Team is registered in active tournaments: {', '.join(tournament_names)}"
             )
         
-        # Remove team from all completed tournaments (cleanup)
-        await db.tournaments.update_many(
-            {"participants": {"$in": [team_id]}},
-            {"$pull": {"participants": team_id}}
-        )
+        # Remove team from all completed tournaments, in the background
+        await enqueue(db, REMOVE_TEAM_FROM_TOURNAMENTS_JOB, {"team_id": team_id})
         
         # Delete the team
         await db.teams.delete_one({"id": team_id})
+        await delete_standing(db, team_id)
         
+        summary_reconciler.mark_changed(team_id)
+        await event_bus.publish(TeamMembershipChanged(team_id=team_id, members=[]))
+        await response_cache.invalidate("teams")
         logger.info(f"Team {team.name} deleted by captain {current_user.username}")
         
         return {"message": f"Team '{team.name}' has been successfully deleted"}
@@ -1,10 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Response
 from typing import List, Optional
 from models import (
     Tournament, TournamentCreate, User, TournamentStatus, 
     TournamentType, Game, Match
 )
 from auth import get_current_active_user, is_admin, is_moderator_or_admin
+from services.events import TournamentChanged, TournamentCompleted, event_bus
+from services.jobs import enqueue
+from services.live import live_broker, tournament_event
+from services.maintenance import UNREGISTER_PARTICIPANTS_JOB
+from services.pagination import NEWEST_FIRST, NEXT_CURSOR_HEADER, InvalidCursorError, paginate
+from services.participants import ParticipantResolver, embedded_participants, team_participant, user_participant
+from services.registrations import (
+    PROFILE_COUNTS_FIELD, AlreadyRegisteredError, AlreadyWaitlistedError, NotRegisteredError, RegistrationClosedError,
+    count_profile_registrations, leave_waitlist, register_participant, registration_notifier, registration_status,
+    uncount_profile_registrations, unregister_participant
+)
+from services.response_cache import cached_response, response_cache
+from services.standings import record_registrations, record_tournament_victory
+from services.stats import collection_stats
 from datetime import datetime, timedelta
 import logging
 
@@ -30,7 +44,9 @@ async def create_tournament(
         )
         
         await db.tournaments.insert_one(new_tournament.dict())
+        await event_bus.publish(TournamentChanged(tournament_id=new_tournament.id, operation="insert"))
         
+        await response_cache.invalidate("tournaments")
         logger.info(f"Tournament created: {tournament_data.title} by {current_user.username}")
         
         return new_tournament
@@ -44,22 +60,36 @@ async def create_tournament(
 
 @router.get("/", response_model=List[Tournament])
 async def get_tournaments(
-    status: Optional[TournamentStatus] = None,
+    response: Response,
+    tournament_status: Optional[TournamentStatus] = Query(None, alias="status"),
     game: Optional[Game] = None,
-    limit: int = Query(20, le=100),
-    skip: int = Query(0, ge=0)
+    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None
 ):
-    """Get tournaments with optional filtering."""
+    """Get tournaments with optional filtering, newest first.
+
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one.
+    """
     try:
         filter_dict = {}
-        if status:
-            filter_dict["status"] = status
+        if tournament_status:
+            filter_dict["status"] = tournament_status
         if game:
             filter_dict["game"] = game
         
-        tournaments = await db.tournaments.find(filter_dict).skip(skip).limit(limit).to_list(limit)
+        tournaments, next_cursor = await paginate(
+            db.tournaments, filter_dict, NEWEST_FIRST, limit, cursor=cursor, skip=skip
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return [Tournament(**tournament) for tournament in tournaments]
         
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         logger.error(f"Error getting tournaments: {str(e)}")
         raise HTTPException(
@@ -162,6 +192,7 @@ async def register_for_tournament(
                 tournament_requires_team = False
         
         participant_id = current_user.id
+        participant = user_participant({"id": current_user.id, "username": current_user.username})
         
         # For team tournaments, team_id is required
         if tournament_requires_team:
@@ -198,6 +229,7 @@ async def register_for_tournament(
             
             # Use team ID as participant
             participant_id = team_id
+            participant = team_participant(team_data)
         
         # For individual tournaments, team_id should not be provided (optional check)
         elif team_id:
@@ -206,34 +238,46 @@ async def register_for_tournament(
                 detail="This is an individual tournament. Team registration is not allowed."
             )
         
-        # Check if already registered (user or team)
-        if participant_id in tournament.participants:
+        registration_type = "team" if team_id else "individual"
+        
+        # Register participant (user or team) in one conditional update: capacity,
+        # duplicates, status and deadline are enforced by the database
+        try:
+            waitlist_position = await register_participant(db, tournament_id, participant)
+        except RegistrationClosedError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Tournament is not open for registration"
+            )
+        except AlreadyRegisteredError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Already registered for this tournament"
             )
-        
-        # Check if tournament is full
-        if len(tournament.participants) >= tournament.max_participants:
+        except AlreadyWaitlistedError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Tournament is full"
+                detail="Already on the waitlist for this tournament"
             )
         
-        # Register participant (user or team)
-        await db.tournaments.update_one(
-            {"id": tournament_id},
-            {"$push": {"participants": participant_id}}
-        )
+        registration_notifier.notify(tournament_id)
+        if waitlist_position is not None:
+            logger.info(f"User {current_user.username} waitlisted for tournament {tournament.title} at position {waitlist_position}")
+            return {
+                "message": "Tournament is full: added to the waitlist",
+                "type": registration_type,
+                "waitlisted": True,
+                "waitlist_position": waitlist_position
+            }
         
-        # Update user profile tournament count
-        await db.user_profiles.update_one(
-            {"user_id": current_user.id},
-            {"$inc": {"total_tournaments": 1}},
-            upsert=True
-        )
+        await event_bus.publish(TournamentChanged(tournament_id=tournament_id, operation="update"))
+        await record_registrations(db, [participant_id], 1)
         
-        registration_type = "team" if team_id else "individual"
+        # Update tournament counts of the user, or of the team's members
+        await count_profile_registrations(db, tournament_id, [participant_id])
+        
+        await response_cache.invalidate("tournaments", f"tournament:{tournament_id}")
+        await live_broker.publish(tournament_id, tournament_event(tournament_id))
         logger.info(f"User {current_user.username} registered for tournament {tournament.title} as {registration_type}")
         
         return {"message": "Successfully registered for tournament", "type": registration_type}
@@ -270,25 +314,22 @@ async def get_user_teams_for_tournament(
             "game": tournament.game
         }).to_list(50)
         
+        # Resolve every member and captain name in one query
+        from models import Team
+        teams = [Team(**team_data) for team_data in user_teams]
+        usernames = await ParticipantResolver(db).usernames(
+            user_id for team in teams for user_id in [team.captain_id, *team.members]
+        )
+        
         # Format teams with member info
         eligible_teams = []
-        for team_data in user_teams:
-            from models import Team
-            team = Team(**team_data)
-            
-            # Get member names
-            member_names = []
-            for member_id in team.members:
-                member = await db.users.find_one({"id": member_id})
-                if member:
-                    member_names.append({
-                        "id": member["id"],
-                        "username": member["username"]
-                    })
-            
-            # Get captain name
-            captain = await db.users.find_one({"id": team.captain_id})
-            captain_name = captain["username"] if captain else "Unknown"
+        for team in teams:
+            member_names = [
+                {"id": member_id, "username": usernames[member_id]}
+                for member_id in team.members
+                if member_id in usernames
+            ]
+            captain_name = usernames.get(team.captain_id, "Unknown")
             
             eligible_teams.append({
                 "id": team.id,
@@ -375,19 +416,7 @@ async def delete_tournament(
                 detail="Cannot delete tournament that is currently in progress"
             )
         
-        # Clean up participant registrations first
-        for participant_id in tournament.participants:
-            # Update user profile tournament count
-            await db.user_profiles.update_one(
-                {"user_id": participant_id},
-                {"$inc": {"total_tournaments": -1}},
-                upsert=True
-            )
-        
-        # Delete associated matches
-        await db.matches.delete_many({"tournament_id": tournament_id})
-        
-        # Delete the tournament
+        # Delete the tournament: only the request that deletes it updates the counters
         result = await db.tournaments.delete_one({"id": tournament_id})
         
         if result.deleted_count == 0:
@@ -395,7 +424,28 @@ async def delete_tournament(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Tournament not found"
             )
+        await event_bus.publish(TournamentChanged(
+            tournament_id=tournament_id, operation="delete", document_key=str(tournament_data["_id"])
+        ))
         
+        # Delete associated matches and waitlist
+        await db.matches.delete_many({"tournament_id": tournament_id})
+        await db.tournament_waitlist.delete_many({"tournament_id": tournament_id})
+        
+        # Remove the tournament from standings
+        await record_registrations(db, tournament.participants, -1)
+        if tournament.status == TournamentStatus.COMPLETED and tournament.winner_id:
+            await record_tournament_victory(db, tournament_data, tournament.winner_id, delta=-1)
+        
+        # Profile counters are fixed in the background
+        if tournament.participants:
+            await enqueue(db, UNREGISTER_PARTICIPANTS_JOB, {
+                "tournament_id": tournament_id,
+                "participant_ids": tournament.participants,
+                "counted": tournament_data.get(PROFILE_COUNTS_FIELD, {})
+            }, key=f"{UNREGISTER_PARTICIPANTS_JOB}:{tournament_id}")
+        
+        await response_cache.invalidate("tournaments", "matches", "leaderboard", f"tournament:{tournament_id}")
         logger.info(f"Tournament {tournament.title} deleted by admin {current_user.username}")
         
         return {"message": f"Tournament '{tournament.title}' has been successfully deleted"}
@@ -440,21 +490,34 @@ async def unregister_from_tournament(
                 detail="Cannot unregister from ongoing tournament"
             )
         
-        # Unregister user
-        await db.tournaments.update_one(
-            {"id": tournament_id},
-            {"$pull": {"participants": current_user.id}}
-        )
+        # Unregister user, handing the spot to the head of the waitlist in the same update
+        try:
+            promoted = await unregister_participant(db, tournament_id, current_user.id)
+        except NotRegisteredError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Not registered for this tournament"
+            )
+        await event_bus.publish(TournamentChanged(tournament_id=tournament_id, operation="update"))
+        await record_registrations(db, [current_user.id], -1)
         
         # Update user profile tournament count
-        await db.user_profiles.update_one(
-            {"user_id": current_user.id},
-            {"$inc": {"total_tournaments": -1}}
-        )
+        await uncount_profile_registrations(db, tournament_data.get(PROFILE_COUNTS_FIELD, {}), [current_user.id])
         
+        if promoted:
+            await record_registrations(db, [promoted["id"]], 1)
+            await count_profile_registrations(db, tournament_id, [promoted["id"]])
+            logger.info(f"Participant {promoted['name']} promoted from the waitlist of tournament {tournament.title}")
+        
+        registration_notifier.notify(tournament_id)
+        await response_cache.invalidate("tournaments", f"tournament:{tournament_id}")
+        await live_broker.publish(tournament_id, tournament_event(tournament_id))
         logger.info(f"User {current_user.username} unregistered from tournament {tournament.title}")
         
-        return {"message": "Successfully unregistered from tournament"}
+        return {
+            "message": "Successfully unregistered from tournament",
+            "promoted_participant_id": promoted["id"] if promoted else None
+        }
         
     except HTTPException:
         raise
@@ -465,6 +528,75 @@ async def unregister_from_tournament(
             detail="Error unregistering from tournament"
         )
 
+async def candidate_participant_ids(user: User) -> List[str]:
+    """IDs under which a user may be registered: their own and their teams'."""
+    teams = await db.teams.find({"members": user.id}, {"_id": 0, "id": 1}).to_list(None)
+    return [user.id] + [team["id"] for team in teams]
+
+@router.get("/{tournament_id}/registration-status")
+async def get_registration_status(
+    tournament_id: str,
+    wait: int = Query(0, ge=0, le=30),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get spots left and the current user's registration or waitlist position.
+
+    With `wait`, the answer is held for up to that many seconds until the
+    tournament's registrations change, so clients can long-poll instead of
+    retrying registrations.
+    """
+    try:
+        participant_ids = await candidate_participant_ids(current_user)
+        if wait:
+            await registration_notifier.wait(tournament_id, wait)
+
+        registration = await registration_status(db, tournament_id, participant_ids)
+        if registration is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tournament not found"
+            )
+        return registration
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting registration status for tournament {tournament_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error fetching registration status"
+        )
+
+@router.delete("/{tournament_id}/waitlist")
+async def leave_tournament_waitlist(
+    tournament_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Remove the current user (or their team) from a tournament's waitlist."""
+    try:
+        removed = False
+        for participant_id in await candidate_participant_ids(current_user):
+            removed = await leave_waitlist(db, tournament_id, participant_id) or removed
+        if not removed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Not on the waitlist for this tournament"
+            )
+        
+        registration_notifier.notify(tournament_id)
+        logger.info(f"User {current_user.username} left the waitlist of tournament {tournament_id}")
+        
+        return {"message": "Successfully left the waitlist"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error leaving waitlist of tournament {tournament_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error leaving waitlist"
+        )
+
 @router.get("/{tournament_id}/participants-info")
 async def get_tournament_participants_info(tournament_id: str):
     """Get detailed information about tournament participants (users and teams)."""
@@ -478,40 +610,11 @@ async def get_tournament_participants_info(tournament_id: str):
             )
 
         tournament = Tournament(**tournament_data)
-        participants_info = []
-
-        for participant_id in tournament.participants:
-            # Try to find as user first
-            user_data = await db.users.find_one({"id": participant_id})
-            if user_data:
-                participants_info.append({
-                    "id": participant_id,
-                    "type": "user",
-                    "name": user_data["username"],
-                    "display_name": user_data["username"]
-                })
-                continue
-            
-            # Try to find as team
-            team_data = await db.teams.find_one({"id": participant_id})
-            if team_data:
-                participants_info.append({
-                    "id": participant_id,
-                    "type": "team", 
-                    "name": team_data["name"],
-                    "display_name": f"{team_data['name']} ({len(team_data['members'])}/{team_data['max_members']})",
-                    "members_count": len(team_data["members"]),
-                    "max_members": team_data["max_members"]
-                })
-                continue
-            
-            # Fallback for unknown participants
-            participants_info.append({
-                "id": participant_id,
-                "type": "unknown",
-                "name": f"Participant {participant_id[:8]}",
-                "display_name": f"Participant {participant_id[:8]}"
-            })
+        participants_map = await embedded_participants(db, tournament_data)
+        participants_info = [
+            participants_map[participant_id].dict(exclude_none=True)
+            for participant_id in tournament.participants
+        ]
 
         return {
             "tournament_id": tournament_id,
@@ -559,6 +662,12 @@ async def update_tournament_status(
             {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
         )
         
+        # Invalidate before publishing: clients refetch as soon as they get the event
+        await response_cache.invalidate("tournaments", f"tournament:{tournament_id}")
+        await live_broker.publish(tournament_id, tournament_event(tournament_id, status=new_status))
+        registration_notifier.notify(tournament_id)
+        if new_status == TournamentStatus.COMPLETED:
+            await event_bus.publish(TournamentCompleted(tournament_id=tournament_id, winner_id=tournament.winner_id))
         logger.info(f"Tournament {tournament.title} status updated to {new_status} by {current_user.username}")
         
         return {"message": f"Tournament status updated to {new_status}"}
@@ -573,26 +682,29 @@ async def update_tournament_status(
         )
 
 @router.get("/stats/community")
+@cached_response(ttl=60, tags=("tournaments",))
 async def get_tournament_stats():
     """Get tournament statistics for the community."""
     try:
-        total_tournaments = await db.tournaments.count_documents({})
-        active_tournaments = await db.tournaments.count_documents({"status": "in_progress"})
-        upcoming_tournaments = await db.tournaments.count_documents({"status": "open"})
-        completed_tournaments = await db.tournaments.count_documents({"status": "completed"})
-        
-        # Get tournaments by game
-        pipeline = [
-            {"$group": {"_id": "$game", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        games_stats = await db.tournaments.aggregate(pipeline).to_list(None)
-        
-        # Get recent tournament activity (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_tournaments = await db.tournaments.count_documents({
-            "created_at": {"$gte": thirty_days_ago}
-        })
+
+        # Status counts, recent activity (last 30 days) and tournaments by game in one aggregation
+        stats = await collection_stats(
+            db.tournaments,
+            {
+                "active": {"status": "in_progress"},
+                "upcoming": {"status": "open"},
+                "completed": {"status": "completed"},
+                "recent": {"created_at": {"$gte": thirty_days_ago}}
+            },
+            {"games": [{"$group": {"_id": "$game", "count": {"$sum": 1}}}, {"$sort": {"count": -1}}]}
+        )
+        total_tournaments = stats["total"]
+        active_tournaments = stats["active"]
+        upcoming_tournaments = stats["upcoming"]
+        completed_tournaments = stats["completed"]
+        games_stats = stats["games"]
+        recent_tournaments = stats["recent"]
         
         return {
             "total_tournaments": total_tournaments,
@@ -615,6 +727,7 @@ async def get_tournament_stats():
         )
 
 @router.get("/templates/popular")
+@cached_response(ttl=3600)
 async def get_popular_tournament_templates():
     """Get popular CS2 tournament templates for Oupafamilly community."""
     templates = [
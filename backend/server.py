@@ -1,16 +1,32 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, status
 from dotenv import load_dotenv
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.cors import CORSMiddleware
+from starlette.staticfiles import StaticFiles
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
+import hmac
 import uuid
 from datetime import datetime
 
 # Import database
 from database import db, client
+from auth import get_admin_user
+from services.indexes import ensure_indexes
+from services.events import change_stream, event_bus
+from services.jobs import job_runner
+from services.live import live_broker
+from services.maintenance import register_jobs
+from services.metrics import MetricsMiddleware, request_metrics
+from services.pagination import NEXT_CURSOR_HEADER
+from services.participants import summary_reconciler
+from services.passwords import password_service
+from services.standings import ensure_standings
+from services.subscribers import subscribe_defaults
+from services.avatars import AVATAR_DIR, AVATAR_URL_PREFIX
 
 # Import route modules
 from routes import auth, tournaments, teams, matches, content, admin, community, profiles
@@ -85,6 +101,26 @@ async def health_check():
             "timestamp": datetime.utcnow()
         }
 
+# Bearer token of the Prometheus scraper. Without it, /api/metrics needs an admin
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+async def require_metrics_token(authorization: Optional[str] = Header(None)):
+    if not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+# Prometheus metrics of this process
+@api_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_metrics_token if METRICS_TOKEN else get_admin_user)]
+)
+async def get_metrics():
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Include route modules
 api_router.include_router(auth.router)
 api_router.include_router(tournaments.router)
@@ -98,14 +134,21 @@ api_router.include_router(profiles.router)
 # Include the router in the main app
 app.include_router(api_router)
 
+# Serve the content-addressed avatars only, not the rest of the upload root
+app.mount(AVATAR_URL_PREFIX, StaticFiles(directory=AVATAR_DIR, check_dir=False), name="avatars")
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Outermost: per-route latency, status, size and Mongo usage for /api/metrics
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -113,6 +156,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_db_indexes():
+    created = await ensure_indexes(db)
+    logger.info(f"Database indexes ensured: {sum(len(names) for names in created.values())}")
+
+@app.on_event("startup")
+async def backfill_standings():
+    count = await ensure_standings(db)
+    if count is not None:
+        logger.info(f"Standings rebuilt: {count} participants")
+
+@app.on_event("startup")
+async def start_participant_reconciler():
+    summary_reconciler.start(db)
+
+@app.on_event("startup")
+async def start_live_broker():
+    await live_broker.start()
+
+@app.on_event("startup")
+async def start_event_bus():
+    subscribe_defaults(event_bus, db)
+    event_bus.start()
+    if os.getenv("EVENT_CHANGE_STREAM", "false").lower() in ("1", "true", "yes"):
+        change_stream.start(db)
+
+@app.on_event("startup")
+async def start_job_runner():
+    register_jobs(job_runner)
+    job_runner.start(db)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await job_runner.stop()
+    await summary_reconciler.stop()
+    await change_stream.stop()
+    await event_bus.stop()
+    await live_broker.stop()
     client.close()
+    password_service.shutdown()
@@ -0,0 +1,145 @@
+from PIL import Image, ImageOps
+from typing import Optional
+import base64
+import binascii
+import hashlib
+import io
+import os
+import tempfile
+
+# Avatars live on local disk, content-addressed: the same image is stored once
+UPLOAD_ROOT = os.getenv("UPLOAD_ROOT", "/app/uploads")
+AVATAR_DIR = os.path.join(UPLOAD_ROOT, "avatars")
+AVATAR_URL_PREFIX = "/api/uploads/avatars"
+# Partial writes go here, outside the served avatar directory (same filesystem for renames)
+UPLOAD_TMP_DIR = os.path.join(UPLOAD_ROOT, "tmp")
+
+AVATAR_SIZES = (32, 64, 256)
+DEFAULT_AVATAR_SIZE = 256
+MAX_AVATAR_BYTES = 5 * 1024 * 1024  # 5MB
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+class InvalidAvatarError(ValueError):
+    """Raised when avatar data is not an accepted image."""
+
+def avatar_path(digest: str, size: int) -> str:
+    return os.path.join(AVATAR_DIR, digest[:2], f"{digest}_{size}.webp")
+
+def avatar_url(digest: str, size: int = DEFAULT_AVATAR_SIZE) -> str:
+    return f"{AVATAR_URL_PREFIX}/{digest[:2]}/{digest}_{size}.webp"
+
+def decode_data_url(avatar_data: str) -> bytes:
+    """Decode a base64 image, with or without a `data:image/...;base64,` prefix."""
+    if avatar_data.startswith("data:image"):
+        header, encoded = avatar_data.split(",", 1)
+        # Validate image type from header
+        if not any(kind in header for kind in ("jpeg", "jpg", "png", "webp")):
+            raise InvalidAvatarError("Only JPEG, PNG, and WebP images are allowed")
+    else:
+        encoded = avatar_data
+
+    try:
+        return base64.b64decode(encoded)
+    except (binascii.Error, ValueError):
+        raise InvalidAvatarError("Invalid base64 image data")
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_TMP_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def store_avatar_image(image: Image.Image, digest: str) -> str:
+    """Write every size variant of an already decoded image. Returns the default URL."""
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    for size in AVATAR_SIZES:
+        path = avatar_path(digest, size)
+        if os.path.exists(path):
+            continue  # Same content already stored
+        variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        variant.save(output, format="WEBP", quality=85, method=4)
+        _write_atomic(path, output.getvalue())
+
+    return avatar_url(digest)
+
+def sniff_image_format(header: bytes) -> Optional[str]:
+    """Identify an image from its first bytes instead of trusting the declared content type."""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+def _decode_and_store(fp, digest: str) -> str:
+    try:
+        image = Image.open(fp)
+        if image.format not in ALLOWED_FORMATS:
+            raise InvalidAvatarError("Only JPEG, PNG, and WebP images are allowed")
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except InvalidAvatarError:
+        raise
+    except Exception:
+        raise InvalidAvatarError("Invalid image data")
+
+    return store_avatar_image(image, digest)
+
+def store_avatar(image_data: bytes) -> str:
+    """Decode image bytes once, store the 32/64/256 WebP variants and return the avatar URL.
+
+    Blocking (Pillow + disk I/O): call it from a worker thread in request handlers.
+    """
+    if len(image_data) > MAX_AVATAR_BYTES:
+        raise InvalidAvatarError("Image size must be less than 5MB")
+
+    digest = hashlib.sha256(image_data).hexdigest()[:32]
+    return _decode_and_store(io.BytesIO(image_data), digest)
+
+def store_avatar_stream(source, chunk_size: int = 64 * 1024) -> str:
+    """Store an avatar read from a binary file object in a single pass.
+
+    The stream is copied to a temporary file while its header is sniffed, its
+    size checked against the 5MB limit and its content hashed; the temporary
+    file is then decoded once and the variants are renamed into place.
+    Blocking: call it from a worker thread in request handlers.
+    """
+    os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_TMP_DIR, suffix=".upload")
+    hasher = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                if size == 0 and sniff_image_format(chunk) is None:
+                    raise InvalidAvatarError("Only JPEG, PNG, and WebP images are allowed")
+                size += len(chunk)
+                if size > MAX_AVATAR_BYTES:
+                    raise InvalidAvatarError("File size must be less than 5MB")
+                hasher.update(chunk)
+                tmp_file.write(chunk)
+
+        if size == 0:
+            raise InvalidAvatarError("Invalid image data")
+
+        with open(tmp_path, "rb") as tmp_file:
+            return _decode_and_store(tmp_file, hasher.hexdigest()[:32])
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
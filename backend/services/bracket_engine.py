@@ -0,0 +1,153 @@
+from datetime import datetime
+from models import Match, MatchStatus
+from typing import List, Optional, Tuple, Union
+
+# Match.bracket values
+WINNERS_BRACKET = "winners"
+LOSERS_BRACKET = "losers"
+GRAND_FINAL = "grand_final"
+BRACKET_ORDER = {WINNERS_BRACKET: 0, LOSERS_BRACKET: 1, GRAND_FINAL: 2}
+
+# What fills a match slot: nothing (a bye), a participant id, or the
+# ("winner" | "loser", match) outcome of an earlier match.
+Source = Optional[Union[str, Tuple[str, Match]]]
+
+def bracket_size(count: int) -> int:
+    """Smallest power of two holding `count` entrants."""
+    size = 2
+    while size < count:
+        size *= 2
+    return size
+
+def seed_positions(size: int) -> List[int]:
+    """Standard 1-vs-N seed order of a power-of-two bracket, e.g. [1, 8, 4, 5, 2, 7, 3, 6] for 8.
+
+    Adjacent positions meet in round one, so seed 1 faces seed N and the top
+    two seeds can only meet in the final.
+    """
+    order = [1]
+    while len(order) < size:
+        total = len(order) * 2 + 1
+        order = [seed for top in order for seed in (top, total - top)]
+    return order
+
+def seeded_slots(participants: List[str]) -> List[Optional[str]]:
+    """Place participants (best seed first) in bracket order; missing seeds are byes.
+
+    Byes go to the top seeds, at most one per first-round pair, so they are
+    spread evenly across the bracket.
+    """
+    count = len(participants)
+    return [participants[seed - 1] if seed <= count else None for seed in seed_positions(bracket_size(count))]
+
+class BracketBuilder:
+    """Create linked matches in memory, skipping the matches a bye makes pointless."""
+
+    def __init__(self, tournament_id: str):
+        self.tournament_id = tournament_id
+        self.matches: List[Match] = []
+        self.scheduled_time = datetime.utcnow()
+
+    @staticmethod
+    def _player(source: Source) -> str:
+        if isinstance(source, str):
+            return source
+        outcome, feeder = source
+        return f"{outcome.capitalize()} of Match {feeder.match_number}"
+
+    def play(self, bracket: Optional[str], round_number: int, source1: Source, source2: Source) -> Tuple[Source, Source]:
+        """Schedule source1 against source2. Returns the (winner, loser) sources.
+
+        When one side is empty the other advances without a match and there is
+        no loser; when both are empty nothing advances.
+        """
+        if source1 is None or source2 is None:
+            return (source1 if source2 is None else source2), None
+
+        match = Match(
+            tournament_id=self.tournament_id,
+            round_number=round_number,
+            match_number=len(self.matches) + 1,
+            bracket=bracket,
+            player1_id=self._player(source1),
+            player2_id=self._player(source2),
+            status=MatchStatus.SCHEDULED,
+            scheduled_time=self.scheduled_time
+        )
+
+        # Link the matches feeding this one
+        for slot, source in ((1, source1), (2, source2)):
+            if isinstance(source, tuple):
+                outcome, feeder = source
+                if outcome == "winner":
+                    feeder.next_match_id = match.id
+                    feeder.next_match_slot = slot
+                else:
+                    feeder.loser_next_match_id = match.id
+                    feeder.loser_next_match_slot = slot
+
+        self.matches.append(match)
+        return ("winner", match), ("loser", match)
+
+    def play_round(self, bracket: Optional[str], round_number: int, sources: List[Source]) -> Tuple[List[Source], List[Source]]:
+        """Pair adjacent sources. Returns the winner and loser sources, in bracket order."""
+        results = [self.play(bracket, round_number, sources[i], sources[i + 1]) for i in range(0, len(sources), 2)]
+        return [winner for winner, _ in results], [loser for _, loser in results]
+
+def generate_single_elimination(tournament_id: str, participants: List[str]) -> List[Match]:
+    """Generate a single elimination bracket for participants ordered best seed first.
+
+    Seeded 1-vs-N with byes to the top seeds; the final is the only match
+    without a next match.
+    """
+    builder = BracketBuilder(tournament_id)
+    sources: List[Source] = seeded_slots(participants)
+    round_number = 1
+    while len(sources) > 1:
+        sources, _ = builder.play_round(None, round_number, sources)
+        round_number += 1
+    return builder.matches
+
+def generate_double_elimination(tournament_id: str, participants: List[str]) -> List[Match]:
+    """Generate a double elimination bracket for participants ordered best seed first.
+
+    Winners bracket: seeded 1-vs-N with byes to the top seeds. Losers bracket:
+    first-round losers play each other, then every winners-bracket round drops
+    its losers into the losers bracket (in reverse order every other round, to
+    delay rematches) before the survivors are paired again. The winners and
+    losers bracket champions meet in a single grand final, the only match
+    without a next match. Each match is created once, so generation is linear.
+    """
+    builder = BracketBuilder(tournament_id)
+
+    # Winners bracket
+    sources: List[Source] = seeded_slots(participants)
+    dropped: List[List[Source]] = []
+    round_number = 1
+    while len(sources) > 1:
+        sources, losers = builder.play_round(WINNERS_BRACKET, round_number, sources)
+        dropped.append(losers)
+        round_number += 1
+    champion = sources[0]
+
+    # Losers bracket
+    survivors = dropped[0]
+    losers_round = 0
+    if len(survivors) > 1:
+        losers_round += 1
+        survivors, _ = builder.play_round(LOSERS_BRACKET, losers_round, survivors)
+
+    for wb_round, drops in enumerate(dropped[1:], start=1):
+        if wb_round % 2 == 1:
+            drops = drops[::-1]
+        losers_round += 1
+        survivors = [
+            builder.play(LOSERS_BRACKET, losers_round, survivor, drop)[0]
+            for survivor, drop in zip(survivors, drops)
+        ]
+        if len(survivors) > 1:
+            losers_round += 1
+            survivors, _ = builder.play_round(LOSERS_BRACKET, losers_round, survivors)
+
+    builder.play(GRAND_FINAL, round_number, champion, survivors[0])
+    return builder.matches
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from pymongo.errors import PyMongoError
+from typing import Dict, List
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# A generation claim older than this is treated as left over by a crashed request
+GENERATION_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# Statuses from which a bracket may no longer be (re)generated
+STARTED_STATUSES = ["in_progress", "completed", "cancelled"]
+
+class BracketConflictError(Exception):
+    """Raised when the tournament already has a bracket or one is being generated."""
+
+_transaction_support: Dict[int, bool] = {}
+
+async def supports_transactions(database) -> bool:
+    """True when the server is a replica set member or a mongos (multi-document transactions)."""
+    client = database.client
+    key = id(client)
+    if key not in _transaction_support:
+        try:
+            hello = await client.admin.command("hello")
+            _transaction_support[key] = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        except Exception:
+            _transaction_support[key] = False
+    return _transaction_support[key]
+
+def _claim_filter(tournament_id: str, now: datetime) -> dict:
+    return {
+        "id": tournament_id,
+        "status": {"$nin": STARTED_STATUSES},
+        "$or": [
+            {"bracket_generation_token": None},
+            {"bracket_generation_started_at": {"$lt": now - GENERATION_CLAIM_TIMEOUT}}
+        ]
+    }
+
+def _start_update(match_ids: List[str], remaining: int, now: datetime) -> dict:
+    return {
+        "$set": {
+            "status": "in_progress",
+            "matches": match_ids,
+            "remaining_matches": remaining,
+            # Rounds paired so far; later Swiss rounds are claimed on this count
+            "paired_rounds": 1,
+            "updated_at": now
+        },
+        "$unset": {"bracket_generation_token": "", "bracket_generation_started_at": ""}
+    }
+
+async def persist_bracket(database, tournament_id: str, matches: List[dict]) -> str:
+    """Insert every match of a generated bracket and start the tournament as one operation.
+
+    With a replica set the insert and the status change run in a single
+    transaction. Otherwise the tournament is first claimed with a generation
+    token: the matches are tagged with it, a retry after a crash removes the
+    matches left by the stale token, and the tournament only switches to
+    `in_progress` if it still holds our token. Returns the token used.
+    Raises BracketConflictError if the bracket already exists or is being generated.
+    """
+    token = str(uuid.uuid4())
+    now = datetime.utcnow()
+    documents = [{**match, "generation_token": token} for match in matches]
+    match_ids = [match["id"] for match in matches]
+    # Swiss byes are stored already completed
+    remaining = sum(1 for match in matches if match["status"] != "completed")
+
+    if await supports_transactions(database):
+        async with await database.client.start_session() as session:
+            async with session.start_transaction():
+                result = await database.tournaments.update_one(
+                    _claim_filter(tournament_id, now), _start_update(match_ids, remaining, now), session=session
+                )
+                if result.matched_count == 0:
+                    raise BracketConflictError(tournament_id)
+                # Matches from an earlier non-transactional attempt that never completed
+                await database.matches.delete_many(
+                    {"tournament_id": tournament_id, "generation_token": {"$ne": None}}, session=session
+                )
+                if documents:
+                    await database.matches.insert_many(documents, ordered=False, session=session)
+        return token
+
+    claimed = await database.tournaments.update_one(
+        _claim_filter(tournament_id, now),
+        {"$set": {"bracket_generation_token": token, "bracket_generation_started_at": now}}
+    )
+    if claimed.matched_count == 0:
+        raise BracketConflictError(tournament_id)
+
+    try:
+        # Leftovers of a crashed attempt carry another token
+        await database.matches.delete_many(
+            {"tournament_id": tournament_id, "generation_token": {"$nin": [None, token]}}
+        )
+        if documents:
+            await database.matches.insert_many(documents, ordered=False)
+
+        started = await database.tournaments.update_one(
+            {"id": tournament_id, "bracket_generation_token": token}, _start_update(match_ids, remaining, now)
+        )
+        if started.matched_count == 0:
+            # Our claim went stale and another request took over: its own matches win
+            await database.matches.delete_many({"tournament_id": tournament_id, "generation_token": token})
+            raise BracketConflictError(tournament_id)
+    except PyMongoError:
+        await _release_claim(database, tournament_id, token)
+        raise
+
+    return token
+
+async def _release_claim(database, tournament_id: str, token: str):
+    try:
+        await database.matches.delete_many({"tournament_id": tournament_id, "generation_token": token})
+        await database.tournaments.update_one(
+            {"id": tournament_id, "bracket_generation_token": token},
+            {"$unset": {"bracket_generation_token": "", "bracket_generation_started_at": ""}}
+        )
+    except PyMongoError as e:
+        logger.error(f"Error releasing bracket generation claim for tournament {tournament_id}: {str(e)}")
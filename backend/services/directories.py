@@ -0,0 +1,205 @@
+from services.standings import team_statistics, victories_by_type
+from typing import List, Optional, Tuple
+import asyncio
+
+# Sort options of the directories: name -> (sort key, sorted in the standings collection).
+# Standings sorts run on the standings indexes and break ties by participant ID.
+MEMBER_SORTS = {
+    "trophies": ([("trophies_total", -1), ("participant_id", 1)], True),
+    "points": ([("total_points", -1), ("participant_id", 1)], True),
+    "username": ([("username", 1), ("id", 1)], False),
+    "newest": ([("created_at", -1), ("id", -1)], False),
+}
+
+TEAM_SORTS = {
+    "points": ([("total_points", -1), ("participant_id", 1)], True),
+    "name": ([("name", 1), ("id", 1)], False),
+    "members": ([("member_count", -1), ("name", 1), ("id", 1)], False),
+    "newest": ([("created_at", -1), ("id", -1)], False),
+}
+
+_STANDING_LOOKUP = [
+    {"$lookup": {"from": "standings", "localField": "id", "foreignField": "participant_id", "as": "standing"}},
+    {"$addFields": {"standing": {"$arrayElemAt": ["$standing", 0]}}},
+]
+
+_MEMBER_PAGE = [
+    {"$lookup": {"from": "user_profiles", "localField": "id", "foreignField": "user_id", "as": "profile"}},
+    {"$project": {
+        "_id": 0,
+        "id": 1,
+        "username": 1,
+        "role": 1,
+        "status": 1,
+        "created_at": 1,
+        "standing": 1,
+        "profile": {"$arrayElemAt": ["$profile", 0]},
+    }},
+]
+
+PRIVATE_MEMBER_FIELDS = {"email": 1, "is_verified": 1}
+
+_TEAM_PAGE = [
+    {"$lookup": {"from": "users", "localField": "members", "foreignField": "id", "as": "member_users"}},
+    {"$project": {
+        "_id": 0,
+        "id": 1,
+        "name": 1,
+        "game": 1,
+        "captain_id": 1,
+        "members": 1,
+        "max_members": 1,
+        "is_open": 1,
+        "created_at": 1,
+        "standing": 1,
+        "member_users.id": 1,
+        "member_users.username": 1,
+    }},
+]
+
+def _directory_pipeline(
+    filter_dict: dict,
+    sort: List[Tuple[str, int]],
+    prepare: List[dict],
+    page: List[dict],
+    skip: Optional[int],
+    limit: Optional[int]
+) -> List[dict]:
+    """$match, sort, then the standings and page joins, run on the directory's collection.
+
+    Only the page is joined. With a limit the page and the total count come
+    from a single $facet.
+    """
+    items = prepare + [{"$sort": dict(sort)}]
+    if limit is not None:
+        items += [{"$skip": skip or 0}, {"$limit": limit}]
+    items += _STANDING_LOOKUP + page
+
+    if limit is None:
+        return [{"$match": filter_dict}] + items
+    return [{"$match": filter_dict}, {"$facet": {"items": items, "total": [{"$count": "count"}]}}]
+
+def _standings_pipeline(
+    collection: str,
+    standing_filter: dict,
+    filter_dict: dict,
+    sort: List[Tuple[str, int]],
+    page: List[dict],
+    skip: Optional[int],
+    limit: Optional[int]
+) -> List[dict]:
+    """Sort on the indexed standings collection, then join the directory's documents.
+
+    Run on `standings`. Documents are joined one standing at a time in sort
+    order, so the first pages cost their size, not the whole directory.
+    Standings left by deleted participants and documents not matching
+    `filter_dict` are skipped.
+    """
+    pipeline = [
+        {"$match": standing_filter},
+        {"$sort": dict(sort)},
+        {"$project": {"_id": 0, "standing": "$$ROOT"}},
+        {"$lookup": {"from": collection, "localField": "standing.participant_id", "foreignField": "id", "as": "doc"}},
+        {"$unwind": "$doc"},
+    ]
+    if filter_dict:
+        pipeline.append({"$match": {f"doc.{field}": value for field, value in filter_dict.items()}})
+    if limit is not None:
+        pipeline += [{"$skip": skip or 0}, {"$limit": limit}]
+    return pipeline + [{"$addFields": {"doc.standing": "$standing"}}, {"$replaceRoot": {"newRoot": "$doc"}}] + page
+
+def _member_page(private: bool) -> List[dict]:
+    if not private:
+        return _MEMBER_PAGE
+    return _MEMBER_PAGE[:-1] + [{"$project": {**_MEMBER_PAGE[-1]["$project"], **PRIVATE_MEMBER_FIELDS}}]
+
+def member_pipeline(
+    filter_dict: dict,
+    sort_by: str,
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    private: bool = False
+) -> List[dict]:
+    """Members directory pipeline, run on `users` or, for standings sorts, on `standings`.
+
+    `private` adds email and verification (admin export only).
+    """
+    sort, from_standings = MEMBER_SORTS[sort_by]
+    if from_standings:
+        return _standings_pipeline("users", {"participant_type": "user"}, filter_dict, sort, _member_page(private), skip, limit)
+    return _directory_pipeline(filter_dict, sort, [], _member_page(private), skip, limit)
+
+def team_pipeline(filter_dict: dict, sort_by: str, skip: Optional[int] = None, limit: Optional[int] = None) -> List[dict]:
+    """Teams directory pipeline, run on `teams` or, for standings sorts, on `standings`."""
+    sort, from_standings = TEAM_SORTS[sort_by]
+    if from_standings:
+        standing_filter = {"participant_type": "team", **({"game": filter_dict["game"]} if "game" in filter_dict else {})}
+        return _standings_pipeline("teams", standing_filter, filter_dict, sort, _TEAM_PAGE, skip, limit)
+    prepare = [{"$addFields": {"member_count": {"$size": {"$ifNull": ["$members", []]}}}}]
+    return _directory_pipeline(filter_dict, sort, prepare, _TEAM_PAGE, skip, limit)
+
+def member_entry(doc: dict) -> dict:
+    """Directory row in the shape of the former community.get_community_members."""
+    victories = victories_by_type(doc.get("standing"))
+    profile = doc.get("profile") or {}
+    entry = {
+        "id": doc["id"],
+        "username": doc["username"],
+        "role": doc.get("role"),
+        "status": doc.get("status"),
+        "created_at": doc.get("created_at"),
+        "trophies": {"total": sum(victories.values()), **victories},
+        "profile": {
+            "display_name": profile.get("display_name", doc["username"]),
+            "bio": profile.get("bio", ""),
+            "favorite_games": profile.get("favorite_games", []),
+            "avatar_url": profile.get("avatar_url", "")
+        }
+    }
+    # Only present when the pipeline was built with private=True
+    for field in PRIVATE_MEMBER_FIELDS:
+        if field in doc:
+            entry[field] = doc[field]
+    return entry
+
+def team_entry(doc: dict) -> dict:
+    """Directory row in the shape of the former community.get_community_teams."""
+    usernames = {user["id"]: user["username"] for user in doc.get("member_users", [])}
+    members = doc.get("members", [])
+    return {
+        "id": doc["id"],
+        "name": doc["name"],
+        "game": doc.get("game"),
+        "captain": usernames.get(doc.get("captain_id"), "Unknown"),
+        "members": [usernames[member_id] for member_id in members if member_id in usernames],
+        "member_count": len(members),
+        "max_members": doc.get("max_members"),
+        "is_open": doc.get("is_open"),
+        "statistics": team_statistics(doc.get("standing")),
+        "created_at": doc.get("created_at")
+    }
+
+async def _directory_page(
+    database, collection: str, from_standings: bool, filter_dict: dict, pipeline: List[dict]
+) -> Tuple[List[dict], int]:
+    if from_standings:
+        # Sorted in standings: the total is counted on the directory's own collection
+        return await asyncio.gather(
+            database.standings.aggregate(pipeline).to_list(None),
+            database[collection].count_documents(filter_dict)
+        )
+
+    result = await database[collection].aggregate(pipeline).to_list(1)
+    facet = result[0] if result else {"items": [], "total": []}
+    total = facet["total"][0]["count"] if facet["total"] else 0
+    return facet["items"], total
+
+async def member_page(database, filter_dict: dict, sort_by: str, skip: int, limit: int) -> Tuple[List[dict], int]:
+    """A page of the members directory. Returns (page documents, total matching)."""
+    pipeline = member_pipeline(filter_dict, sort_by, skip, limit)
+    return await _directory_page(database, "users", MEMBER_SORTS[sort_by][1], filter_dict, pipeline)
+
+async def team_page(database, filter_dict: dict, sort_by: str, skip: int, limit: int) -> Tuple[List[dict], int]:
+    """A page of the teams directory. Returns (page documents, total matching)."""
+    pipeline = team_pipeline(filter_dict, sort_by, skip, limit)
+    return await _directory_page(database, "teams", TEAM_SORTS[sort_by][1], filter_dict, pipeline)
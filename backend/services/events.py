@@ -0,0 +1,374 @@
+from collections import deque
+from datetime import datetime
+from pydantic import BaseModel, Field
+from pymongo.errors import OperationFailure, PyMongoError
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Type
+import asyncio
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Event sources: published by a route handler, or read from the MongoDB change stream
+API_SOURCE = "api"
+CHANGE_STREAM_SOURCE = "change_stream"
+
+class DomainEvent(BaseModel):
+    source: str = API_SOURCE
+    occurred_at: datetime = Field(default_factory=datetime.utcnow)
+
+    def key(self) -> str:
+        """Identity of the change, ignoring where and when it was seen."""
+        fields = self.dict(exclude={"source", "occurred_at"})
+        return type(self).__name__ + json.dumps(fields, sort_keys=True, default=str)
+
+class MatchCompleted(DomainEvent):
+    tournament_id: str
+    match_id: str
+    winner_id: Optional[str] = None
+    player1_id: Optional[str] = None
+    player2_id: Optional[str] = None
+
+class TournamentCompleted(DomainEvent):
+    tournament_id: str
+    winner_id: Optional[str] = None
+
+class TournamentChanged(DomainEvent):
+    """A tournament was created or deleted, or its participants changed.
+
+    `tournament_id` is None for deletions seen by the change stream, which only
+    reports the _id: deletions are identified by `document_key`, the _id, and
+    other changes by `tournament_id`.
+    """
+    tournament_id: Optional[str] = None
+    operation: str
+    document_key: Optional[str] = None
+
+    def key(self) -> str:
+        if self.operation == "delete":
+            return f"{type(self).__name__}:delete:{self.document_key}"
+        return type(self).__name__ + json.dumps(
+            {"tournament_id": self.tournament_id, "operation": self.operation}, sort_keys=True
+        )
+
+class TeamMembershipChanged(DomainEvent):
+    team_id: str
+    members: List[str] = []
+
+class UserRoleChanged(DomainEvent):
+    user_id: str
+    role: str
+
+class _ResyncWakeup(DomainEvent):
+    """Queued by `EventBus.request_resync` to wake a subscriber up; never handed to handlers."""
+
+Handler = Callable[[List[DomainEvent]], Awaitable[None]]
+Resync = Callable[[], Awaitable[None]]
+
+class Subscription:
+    """A subscriber with its own bounded queue and worker task."""
+
+    def __init__(self, name: str, handler: Handler, event_types: Tuple[Type[DomainEvent], ...],
+                 sources: Optional[Iterable[str]], resync: Optional[Resync], queue_size: int, batch_size: int):
+        self.name = name
+        self.handler = handler
+        self.event_types = event_types
+        self.sources = set(sources) if sources is not None else None
+        self.resync = resync
+        self.batch_size = batch_size
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.needs_resync = False
+        self.task: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def accepts(self, event: DomainEvent) -> bool:
+        return isinstance(event, self.event_types) and (self.sources is None or event.source in self.sources)
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            try:
+                if self.needs_resync and self.resync is not None:
+                    # Events were dropped: rebuild instead of applying a partial history
+                    self.needs_resync = False
+                    await self.resync()
+                else:
+                    self.needs_resync = False
+                    events = [event for event in batch if not isinstance(event, _ResyncWakeup)]
+                    if events:
+                        await self.handler(events)
+                self.processed += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Event subscriber {self.name} failed on {len(batch)} events: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "processed": self.processed,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "errors": self.errors
+        }
+
+class EventBus:
+    """In-process bus carrying typed domain events to asynchronous subscribers.
+
+    Each subscriber drains its own bounded queue in batches, so a burst of
+    events costs it one pass per batch and never runs inside the request that
+    published them. When a subscriber's queue is full, publishers wait up to
+    `publish_timeout` seconds for room; past that the event is dropped for this
+    subscriber only and its `resync` callback runs instead of the next batch.
+
+    A change seen from both the route that made it and the change stream
+    within `dedupe_seconds` is delivered once, so both sources can run side by
+    side. Occurrences are counted: three identical writes reported by the
+    route cancel the next three identical change stream events, not one.
+    """
+
+    def __init__(self, queue_size: int = 1000, publish_timeout: float = 0.5, dedupe_seconds: float = 30.0):
+        self.queue_size = queue_size
+        self.publish_timeout = publish_timeout
+        self.dedupe_seconds = dedupe_seconds
+        self._subscriptions: List[Subscription] = []
+        # Event key -> (source, times of the occurrences not matched by the other source yet)
+        self._pending: Dict[str, Tuple[str, Deque[float]]] = {}
+        self._expiry: Deque[Tuple[float, str]] = deque()
+        self._running = False
+        self.published = 0
+        self.duplicates = 0
+
+    def subscribe(self, name: str, handler: Handler, *event_types: Type[DomainEvent],
+                  sources: Optional[Iterable[str]] = None, resync: Optional[Resync] = None,
+                  queue_size: Optional[int] = None, batch_size: int = 100) -> Subscription:
+        """Call `handler` with batches of the given event types (all events when none are given)."""
+        subscription = Subscription(
+            name, handler, event_types or (DomainEvent,), sources, resync, queue_size or self.queue_size, batch_size
+        )
+        self._subscriptions.append(subscription)
+        if self._running:
+            subscription.task = asyncio.create_task(subscription.run())
+        return subscription
+
+    def start(self):
+        self._running = True
+        for subscription in self._subscriptions:
+            if subscription.task is None:
+                subscription.task = asyncio.create_task(subscription.run())
+
+    async def stop(self):
+        self._running = False
+        for subscription in self._subscriptions:
+            if subscription.task is not None:
+                subscription.task.cancel()
+                try:
+                    await subscription.task
+                except asyncio.CancelledError:
+                    pass
+                subscription.task = None
+
+    async def publish(self, event: DomainEvent):
+        """Queue an event for its subscribers. Never raises: derived state catches up on resync."""
+        if not self._running:
+            return
+        if self._is_duplicate(event):
+            self.duplicates += 1
+            return
+
+        self.published += 1
+        for subscription in self._subscriptions:
+            if not subscription.accepts(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                try:
+                    await asyncio.wait_for(subscription.queue.put(event), timeout=self.publish_timeout)
+                except asyncio.TimeoutError:
+                    subscription.dropped += 1
+                    subscription.needs_resync = True
+                    logger.warning(f"Event subscriber {subscription.name} is behind: {type(event).__name__} dropped")
+
+    def request_resync(self):
+        """Make every subscriber with a resync callback rebuild, e.g. after change stream events were lost."""
+        for subscription in self._subscriptions:
+            if subscription.resync is not None:
+                subscription.needs_resync = True
+                try:
+                    # Wake the worker up even if no event comes
+                    subscription.queue.put_nowait(_ResyncWakeup(source=CHANGE_STREAM_SOURCE))
+                except asyncio.QueueFull:
+                    pass
+
+    def _is_duplicate(self, event: DomainEvent) -> bool:
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] < now - self.dedupe_seconds:
+            seen_at, key = self._expiry.popleft()
+            pending = self._pending.get(key)
+            # Skip occurrences already matched by the other source
+            if pending is not None and pending[1][0] <= seen_at:
+                pending[1].popleft()
+                if not pending[1]:
+                    del self._pending[key]
+
+        # Whichever of the route and the change stream reports a change first
+        # wins; each report from the other source then cancels one occurrence
+        key = event.key()
+        pending = self._pending.get(key)
+        if pending is not None and pending[0] != event.source:
+            pending[1].popleft()
+            if not pending[1]:
+                del self._pending[key]
+            return True
+        if pending is None:
+            pending = self._pending[key] = (event.source, deque())
+        pending[1].append(now)
+        self._expiry.append((now, key))
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "running": self._running,
+            "published": self.published,
+            "duplicates": self.duplicates,
+            "subscribers": {subscription.name: subscription.stats() for subscription in self._subscriptions}
+        }
+
+# Collections whose writes are turned into events
+WATCHED_COLLECTIONS = ("matches", "tournaments", "teams", "users")
+
+# "The $changeStream stage is only supported on replica sets"
+CHANGE_STREAM_UNSUPPORTED = 40573
+CHANGE_STREAM_HISTORY_LOST = 286
+
+def events_from_change(change: dict) -> List[DomainEvent]:
+    """Translate a change stream document into domain events."""
+    collection = change["ns"]["coll"]
+    operation = change["operationType"]
+    document = change.get("fullDocument") or {}
+    updated_fields = (change.get("updateDescription") or {}).get("updatedFields", {})
+
+    def changed(field: str) -> bool:
+        if operation in ("insert", "replace"):
+            return True
+        return any(key == field or key.startswith(field + ".") for key in updated_fields)
+
+    if operation == "delete":
+        if collection != "tournaments":
+            return []
+        document_key = (change.get("documentKey") or {}).get("_id")
+        return [TournamentChanged(
+            source=CHANGE_STREAM_SOURCE, operation=operation,
+            document_key=str(document_key) if document_key is not None else None
+        )]
+    if not document.get("id"):
+        # Deleted since the update, or not an application document
+        return []
+
+    events = []
+    if collection == "matches":
+        if document.get("status") == "completed" and (changed("status") or changed("winner_id")):
+            events.append(MatchCompleted(
+                source=CHANGE_STREAM_SOURCE,
+                tournament_id=document.get("tournament_id"),
+                match_id=document["id"],
+                winner_id=document.get("winner_id"),
+                player1_id=document.get("player1_id"),
+                player2_id=document.get("player2_id")
+            ))
+    elif collection == "tournaments":
+        if document.get("status") == "completed" and (changed("status") or changed("winner_id")):
+            events.append(TournamentCompleted(
+                source=CHANGE_STREAM_SOURCE, tournament_id=document["id"], winner_id=document.get("winner_id")
+            ))
+        if changed("participants"):
+            events.append(TournamentChanged(source=CHANGE_STREAM_SOURCE, tournament_id=document["id"], operation=operation))
+    elif collection == "teams":
+        if changed("members"):
+            events.append(TeamMembershipChanged(
+                source=CHANGE_STREAM_SOURCE, team_id=document["id"], members=document.get("members", [])
+            ))
+    elif collection == "users":
+        if operation != "insert" and changed("role") and document.get("role"):
+            events.append(UserRoleChanged(source=CHANGE_STREAM_SOURCE, user_id=document["id"], role=document["role"]))
+    return events
+
+class ChangeStreamSource:
+    """Publishes events for writes made outside the API (maintenance scripts, the mongo shell).
+
+    Needs a replica set: on a standalone server it logs a warning and stops.
+    Writes made by the API are seen too; the bus drops those it already got
+    from the route. After a disconnection the stream resumes where it left
+    off; if the server no longer has that history, subscribers resync.
+    """
+
+    def __init__(self, bus: EventBus, retry_delay: float = 5.0):
+        self.bus = bus
+        self.retry_delay = retry_delay
+        self.db = None
+        self.resume_token = None
+        self.enabled = False
+        self._task: Optional[asyncio.Task] = None
+        self.changes = 0
+
+    def start(self, database):
+        self.db = database
+        if self._task is None:
+            self.enabled = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(WATCHED_COLLECTIONS)},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]}
+        }}]
+        while True:
+            try:
+                async with self.db.watch(pipeline, full_document="updateLookup", resume_after=self.resume_token) as stream:
+                    async for change in stream:
+                        self.changes += 1
+                        for event in events_from_change(change):
+                            await self.bus.publish(event)
+                        self.resume_token = stream.resume_token
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_UNSUPPORTED:
+                    self.enabled = False
+                    logger.warning("Change streams need a replica set: writes made outside the API will not raise events")
+                    return
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    self.resume_token = None
+                    self.bus.request_resync()
+                logger.error(f"Change stream failed: {str(e)}")
+                await asyncio.sleep(self.retry_delay)
+            except PyMongoError as e:
+                logger.error(f"Change stream interrupted: {str(e)}")
+                await asyncio.sleep(self.retry_delay)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "changes": self.changes}
+
+event_bus = EventBus(
+    queue_size=int(os.getenv("EVENT_BUS_QUEUE_SIZE", "1000")),
+    publish_timeout=float(os.getenv("EVENT_BUS_PUBLISH_TIMEOUT", "0.5"))
+)
+change_stream = ChangeStreamSource(event_bus)
@@ -0,0 +1,184 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Index registry: every collection queried by the routes and the indexes it needs.
+# Add new entries here rather than calling create_index from route modules.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_id"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="status_created_id"),
+        IndexModel([("role", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="role_created_id"),
+    ],
+    "teams": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("name", ASCENDING), ("game", ASCENDING)], name="name_game_unique", unique=True),
+        IndexModel([("members", ASCENDING)], name="members"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_id"),
+        IndexModel([("game", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="game_created_id"),
+    ],
+    "tournaments": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("participants", ASCENDING)], name="participants"),
+        IndexModel([("winner_id", ASCENDING), ("status", ASCENDING)], name="winner_status"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_id"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="status_created_id"),
+        IndexModel([("game", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="game_created_id"),
+    ],
+    "matches": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("tournament_id", ASCENDING), ("round_number", ASCENDING), ("match_number", ASCENDING)],
+            name="tournament_round_match"
+        ),
+        IndexModel(
+            [("player1_id", ASCENDING), ("status", ASCENDING), ("completed_at", DESCENDING)],
+            name="player1_status_completed"
+        ),
+        IndexModel(
+            [("player2_id", ASCENDING), ("status", ASCENDING), ("completed_at", DESCENDING)],
+            name="player2_status_completed"
+        ),
+    ],
+    "news": [
+        IndexModel(
+            [("is_published", ASCENDING), ("is_pinned", DESCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="published_pinned_created_id"
+        ),
+        IndexModel([("is_published", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="published_created_id"),
+    ],
+    "tutorials": [
+        IndexModel([("is_published", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="published_created_id"),
+        IndexModel([("is_published", ASCENDING), ("game", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="published_game_created_id"),
+    ],
+    "tournament_waitlist": [
+        IndexModel([("tournament_id", ASCENDING), ("participant_id", ASCENDING)], name="tournament_participant_unique", unique=True),
+        IndexModel([("tournament_id", ASCENDING), ("created_at", ASCENDING)], name="tournament_created"),
+    ],
+    "user_profiles": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_run_at"),
+        IndexModel(
+            [("key", ASCENDING)], name="queued_key_unique", unique=True,
+            partialFilterExpression={"status": "queued", "key": {"$exists": True}}
+        ),
+        # Finished jobs are kept a week for the monitoring endpoint
+        IndexModel([("finished_at", ASCENDING)], name="finished_ttl", expireAfterSeconds=7 * 24 * 3600),
+    ],
+    "schema_versions": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "standings": [
+        IndexModel([("participant_id", ASCENDING)], name="participant_id_unique", unique=True),
+        IndexModel(
+            [("participant_type", ASCENDING), ("total_points", DESCENDING), ("participant_id", ASCENDING)],
+            name="type_points"
+        ),
+        IndexModel(
+            [("participant_type", ASCENDING), ("game", ASCENDING), ("total_points", DESCENDING), ("participant_id", ASCENDING)],
+            name="type_game_points"
+        ),
+        IndexModel(
+            [("participant_type", ASCENDING), ("trophies_total", DESCENDING), ("participant_id", ASCENDING)],
+            name="type_trophies"
+        ),
+    ],
+}
+
+# Representative queries issued by the routes, used by the unindexed-query report.
+# Each entry: (route, collection, filter, sort)
+ROUTE_QUERIES = [
+    ("auth.get_user_by_email", "users", {"email": "probe@example.com"}, None),
+    ("auth.register_user", "users", {"username": "probe"}, None),
+    ("auth.get_user_by_id", "users", {"id": "probe"}, None),
+    ("teams.create_team", "teams", {"name": "probe", "game": "cs2"}, None),
+    ("teams.get_team", "teams", {"id": "probe"}, None),
+    ("profiles.get_user_profile", "teams", {"members": {"$in": ["probe"]}}, None),
+    ("tournaments.get_tournament", "tournaments", {"id": "probe"}, None),
+    ("teams.calculate_team_statistics", "tournaments", {"participants": {"$in": ["probe"]}}, None),
+    ("community.get_user_tournament_victories", "tournaments", {"winner_id": "probe", "status": "completed"}, None),
+    ("matches.get_tournament_bracket", "matches", {"tournament_id": "probe"},
+     [("round_number", ASCENDING), ("match_number", ASCENDING)]),
+    ("matches.update_match_result", "matches", {"id": "probe"}, None),
+    ("matches.update_next_round_match", "matches", {"tournament_id": "probe", "round_number": 2, "match_number": 1}, None),
+    ("profiles.get_user_profile", "matches", {"player1_id": "probe", "status": "completed"}, [("completed_at", DESCENDING)]),
+    ("tournaments.get_tournaments", "tournaments", {"status": "open"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("teams.get_teams", "teams", {}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("content.get_news", "news", {"is_published": True},
+     [("is_pinned", DESCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("content.get_tutorials", "tutorials", {"is_published": True, "game": "cs2"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("community.get_community_posts", "news", {"is_published": True}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("admin.get_all_users", "users", {"role": "admin"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("profiles.get_user_profile", "user_profiles", {"user_id": "probe"}, None),
+    ("tournaments.register_for_tournament", "tournament_waitlist", {"tournament_id": "probe"}, [("created_at", ASCENDING)]),
+    ("matches.generate_tournament_bracket", "standings", {"participant_id": {"$in": ["probe"]}}, None),
+    ("community.get_community_leaderboard", "standings", {"participant_type": "user"},
+     [("total_points", DESCENDING), ("participant_id", ASCENDING)]),
+    ("jobs.JobRunner", "jobs", {"status": "queued"}, [("run_at", ASCENDING)]),
+    ("community.get_community_members", "standings", {"participant_type": "user"},
+     [("trophies_total", DESCENDING), ("participant_id", ASCENDING)]),
+    ("teams.get_team_leaderboard", "standings", {"participant_type": "team", "game": "cs2"},
+     [("total_points", DESCENDING), ("participant_id", ASCENDING)]),
+]
+
+async def ensure_indexes(database) -> Dict[str, List[str]]:
+    """Create every index of the registry. Returns the index names created per collection.
+
+    Indexes are created one by one so that a single failure (e.g. a unique index
+    on a collection that already holds duplicates) does not block the others.
+    """
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        collection = database[collection_name]
+        created[collection_name] = []
+        for index in indexes:
+            try:
+                names = await collection.create_indexes([index])
+                created[collection_name].extend(names)
+            except PyMongoError as e:
+                logger.warning(
+                    f"Could not create index {index.document['name']} on {collection_name}: {str(e)}"
+                )
+    return created
+
+def _plan_stages(plan) -> List[str]:
+    """Collect every stage name of an explain() plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+async def find_unindexed_queries(database) -> List[dict]:
+    """Run explain() on each registered route query and report the ones doing a collection scan."""
+    report = []
+    for route, collection_name, query, sort in ROUTE_QUERIES:
+        cursor = database[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(winning_plan)
+        report.append({
+            "route": route,
+            "collection": collection_name,
+            "query": query,
+            "sort": sort,
+            "stages": stages,
+            "indexed": "COLLSCAN" not in stages
+        })
+    return report
@@ -0,0 +1,330 @@
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from services.stats import collection_stats
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Scheduled runs are aligned on multiples of their interval since this date
+EPOCH = datetime(1970, 1, 1)
+
+JobHandler = Callable[[Any, dict], Awaitable[Optional[dict]]]
+
+def job_document(job_type: str, payload: Optional[dict], run_at: datetime, max_attempts: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()),
+        "type": job_type,
+        "payload": payload or {},
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "run_at": run_at,
+        "created_at": now,
+        "updated_at": now
+    }
+
+async def enqueue(
+    database,
+    job_type: str,
+    payload: Optional[dict] = None,
+    run_at: Optional[datetime] = None,
+    max_attempts: int = 5,
+    key: Optional[str] = None
+) -> str:
+    """Queue a job to run at `run_at` (now by default). Returns the job ID.
+
+    With a `key`, a job still queued under the same key is reused instead (and
+    brought forward to `run_at` if that is earlier), so bursts of requests for
+    the same work coalesce into one run.
+    """
+    job = job_document(job_type, payload, run_at or datetime.utcnow(), max_attempts)
+    if key is None:
+        await database.jobs.insert_one(job)
+        job_runner.wake()
+        return job["id"]
+
+    run_at = job.pop("run_at")
+    job.pop("status")
+    # Unique on key among queued jobs: a concurrent enqueue of the same key may win the insert
+    for _ in range(2):
+        try:
+            queued = await database.jobs.find_one_and_update(
+                {"key": key, "status": QUEUED},
+                {"$setOnInsert": job, "$min": {"run_at": run_at}},
+                projection={"_id": 0, "id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            job_runner.wake()
+            return queued["id"]
+        except DuplicateKeyError:
+            continue
+    raise RuntimeError(f"Could not enqueue job {job_type} with key {key}")
+
+async def queue_stats(database) -> dict:
+    """Queue depth, wait and run times of the last hour, and the latest failures."""
+    now = datetime.utcnow()
+    stats = await collection_stats(
+        database.jobs,
+        counts={
+            "ready": {"status": QUEUED, "run_at": {"$lte": now}},
+            "scheduled": {"status": QUEUED, "run_at": {"$gt": now}},
+            "running": {"status": RUNNING},
+            "failed": {"status": FAILED}
+        },
+        facets={
+            "oldest_ready": [
+                {"$match": {"status": QUEUED, "run_at": {"$lte": now}}},
+                {"$sort": {"run_at": 1}},
+                {"$limit": 1},
+                {"$project": {"_id": 0, "run_at": 1}}
+            ],
+            "last_hour": [
+                {"$match": {"status": SUCCEEDED, "finished_at": {"$gte": now - timedelta(hours=1)}}},
+                {"$group": {
+                    "_id": "$type",
+                    "succeeded": {"$sum": 1},
+                    "avg_wait_ms": {"$avg": {"$subtract": ["$started_at", "$run_at"]}},
+                    "max_wait_ms": {"$max": {"$subtract": ["$started_at", "$run_at"]}},
+                    "avg_run_ms": {"$avg": {"$subtract": ["$finished_at", "$started_at"]}}
+                }}
+            ],
+            "recent_failures": [
+                {"$match": {"status": FAILED}},
+                {"$sort": {"finished_at": -1}},
+                {"$limit": 10},
+                {"$project": {"_id": 0, "id": 1, "type": 1, "attempts": 1, "last_error": 1, "finished_at": 1}}
+            ]
+        }
+    )
+    oldest_ready = stats.pop("oldest_ready")
+    stats["oldest_ready_seconds"] = (now - oldest_ready[0]["run_at"]).total_seconds() if oldest_ready else 0
+    stats["last_hour"] = {row.pop("_id"): row for row in stats["last_hour"]}
+    return stats
+
+class JobRunner:
+    """Runs the jobs of the `jobs` collection in background tasks.
+
+    Every API process runs one. A job is claimed with a lease of
+    `lease_seconds`, renewed while its handler runs; the job of a process that
+    died is claimed again once its lease expires. Failed jobs are retried with
+    exponential backoff up to their `max_attempts`; jobs interrupted by a
+    shutdown are queued again, except single-attempt ones, which fail. At
+    most `concurrency` jobs run at once in a process, and at most the
+    registered limit for each type. Recurring jobs registered with `schedule`
+    are queued once per interval whatever the number of processes.
+    """
+
+    def __init__(self, concurrency: int = 4, lease_seconds: float = 60.0, poll_interval: float = 1.0,
+                 retry_delay: float = 5.0):
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.db = None
+        self._handlers: Dict[str, Tuple[JobHandler, Optional[int]]] = {}
+        self._schedules: List[Tuple[str, float, dict]] = []
+        self._active: Dict[str, int] = {}
+        self._jobs: Set[asyncio.Task] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+
+    def register(self, job_type: str, handler: JobHandler, concurrency: Optional[int] = None):
+        """Run jobs of `job_type` with `handler(database, payload)`, at most `concurrency` at a time."""
+        self._handlers[job_type] = (handler, concurrency)
+
+    def schedule(self, job_type: str, every: float, payload: Optional[dict] = None):
+        """Queue a `job_type` job every `every` seconds."""
+        self._schedules.append((job_type, every, payload or {}))
+
+    def start(self, database):
+        self.db = database
+        if not self._tasks:
+            self._tasks.append(asyncio.create_task(self._run()))
+            for job_type, every, payload in self._schedules:
+                self._tasks.append(asyncio.create_task(self._schedule_loop(job_type, every, payload)))
+
+    async def stop(self):
+        tasks = self._tasks + list(self._jobs)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def wake(self):
+        """Look for ready jobs now instead of at the next poll."""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                while len(self._jobs) < self.concurrency:
+                    job = await self._claim()
+                    if job is None:
+                        break
+                    self._active[job["type"]] = self._active.get(job["type"], 0) + 1
+                    task = asyncio.create_task(self._execute(job))
+                    self._jobs.add(task)
+                    task.add_done_callback(self._job_done)
+            except Exception as e:
+                logger.error(f"Error claiming jobs: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _job_done(self, task: asyncio.Task):
+        self._jobs.discard(task)
+        # A slot is free: claim the next job right away
+        self._wakeup.set()
+
+    async def _claim(self) -> Optional[dict]:
+        job_types = [
+            job_type for job_type, (_, limit) in self._handlers.items()
+            if limit is None or self._active.get(job_type, 0) < limit
+        ]
+        if not job_types:
+            return None
+
+        now = datetime.utcnow()
+        return await self.db.jobs.find_one_and_update(
+            {
+                "type": {"$in": job_types},
+                "$or": [
+                    {"status": QUEUED, "run_at": {"$lte": now}},
+                    # Lease of a dead worker
+                    {"status": RUNNING, "lease_expires_at": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease_owner": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "started_at": now,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _execute(self, job: dict):
+        job_type = job["type"]
+        handler, _ = self._handlers[job_type]
+        owned = {"id": job["id"], "lease_owner": self.worker_id}
+        heartbeat = asyncio.create_task(self._keep_lease(owned))
+        try:
+            if job["attempts"] > job["max_attempts"]:
+                # Claimed again after its lease expired on every attempt
+                raise RuntimeError("lease expired before the job finished")
+            result = await handler(self.db, job.get("payload", {}))
+            now = datetime.utcnow()
+            await self.db.jobs.update_one(owned, {
+                "$set": {"status": SUCCEEDED, "result": result, "finished_at": now, "updated_at": now},
+                "$unset": {"lease_owner": "", "lease_expires_at": ""}
+            })
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            now = datetime.utcnow()
+            if job["max_attempts"] > 1:
+                # Shutting down: hand the job back without counting the attempt
+                update = {"$set": {"status": QUEUED, "updated_at": now}, "$inc": {"attempts": -1}}
+            else:
+                # Single-attempt jobs are not safe to run twice: part of the work may be done
+                update = {"$set": {
+                    "status": FAILED, "last_error": "interrupted by shutdown", "finished_at": now, "updated_at": now
+                }}
+                self.failed += 1
+            await self.db.jobs.update_one(owned, {**update, "$unset": {"lease_owner": "", "lease_expires_at": ""}})
+            raise
+        except Exception as e:
+            await self._fail(job, owned, e)
+        finally:
+            heartbeat.cancel()
+            self._active[job_type] -= 1
+
+    async def _fail(self, job: dict, owned: dict, error: Exception):
+        now = datetime.utcnow()
+        if job["attempts"] < job["max_attempts"]:
+            delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+            update = {"status": QUEUED, "run_at": now + timedelta(seconds=delay)}
+            self.retried += 1
+            logger.warning(f"Job {job['type']} {job['id']} failed (attempt {job['attempts']}), retrying in {delay:g}s: {str(error)}")
+        else:
+            update = {"status": FAILED, "finished_at": now}
+            self.failed += 1
+            logger.error(f"Job {job['type']} {job['id']} failed after {job['attempts']} attempts: {str(error)}")
+
+        try:
+            await self.db.jobs.update_one(owned, {
+                "$set": {**update, "last_error": str(error), "updated_at": now},
+                "$unset": {"lease_owner": "", "lease_expires_at": ""}
+            })
+        except Exception as e:
+            # The lease expires and the job is claimed again
+            logger.error(f"Could not record failure of job {job['id']}: {str(e)}")
+
+    async def _keep_lease(self, owned: dict):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.db.jobs.update_one(owned, {
+                    "$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}
+                })
+            except Exception as e:
+                logger.warning(f"Could not renew job lease {owned['id']}: {str(e)}")
+
+    async def _schedule_loop(self, job_type: str, every: float, payload: dict):
+        while True:
+            # Every process queues the same slot: the job ID makes it run once
+            elapsed = (datetime.utcnow() - EPOCH).total_seconds()
+            slot = EPOCH + timedelta(seconds=(elapsed // every + 1) * every)
+            job = job_document(job_type, payload, slot, max_attempts=1)
+            job["id"] = f"{job_type}@{slot.isoformat()}"
+            try:
+                await self.db.jobs.insert_one(job)
+            except DuplicateKeyError:
+                pass
+            except Exception as e:
+                logger.error(f"Error scheduling job {job_type}: {str(e)}")
+            await asyncio.sleep(max(0.0, (slot - datetime.utcnow()).total_seconds()))
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "running": len(self._jobs),
+            "running_by_type": {job_type: count for job_type, count in self._active.items() if count},
+            "concurrency": self.concurrency,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried
+        }
+
+job_runner = JobRunner(
+    concurrency=int(os.getenv("JOBS_CONCURRENCY", "4")),
+    lease_seconds=float(os.getenv("JOBS_LEASE_SECONDS", "60"))
+)
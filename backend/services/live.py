@@ -0,0 +1,165 @@
+from fastapi.encoders import jsonable_encoder
+from typing import Dict, Optional, Set
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "live:tournament:"
+
+# Fields of a match sent in "match" events; deltas only carry the ones that changed
+MATCH_EVENT_FIELDS = (
+    "id", "status", "player1_id", "player2_id", "winner_id",
+    "player1_score", "player2_score", "round_number", "match_number", "bracket"
+)
+
+# Sent instead of the dropped events when a subscriber falls behind: refetch the bracket
+RESYNC_EVENT = json.dumps({"type": "resync"})
+
+def match_event(tournament_id: str, match: dict) -> dict:
+    """Delta event for a match: `match` holds its id and the fields that changed."""
+    return {
+        "type": "match",
+        "tournament_id": tournament_id,
+        "match": {field: match[field] for field in MATCH_EVENT_FIELDS if field in match}
+    }
+
+def tournament_event(tournament_id: str, **fields) -> dict:
+    return {"type": "tournament", "tournament_id": tournament_id, **fields}
+
+def bracket_event(tournament_id: str) -> dict:
+    """The bracket was (re)built or extended: clients refetch it."""
+    return {"type": "bracket", "tournament_id": tournament_id}
+
+class TournamentBroker:
+    """In-process pub/sub with one channel per tournament.
+
+    Each subscriber (a WebSocket or SSE connection) gets a bounded queue of
+    serialized events. An event is serialized once whatever the number of
+    subscribers. A subscriber whose queue is full loses its backlog and gets a
+    single "resync" event telling it to refetch the bracket, so a slow client
+    never holds back publishers or other viewers.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._channels: Dict[str, Set[asyncio.Queue]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+        self.errors = 0
+
+    def subscribe(self, tournament_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._channels.setdefault(tournament_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, tournament_id: str, queue: asyncio.Queue):
+        subscribers = self._channels.get(tournament_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._channels[tournament_id]
+
+    def deliver(self, tournament_id: str, payload: str):
+        """Fan a serialized event out to this process's subscribers of the tournament."""
+        for queue in self._channels.get(tournament_id, ()):
+            try:
+                queue.put_nowait(payload)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+                self.resyncs += 1
+
+    async def publish(self, tournament_id: str, event: dict):
+        """Publish an event. Failures are logged: live updates never fail the write that caused them."""
+        try:
+            payload = json.dumps(jsonable_encoder(event), separators=(",", ":"))
+            await self._send(tournament_id, payload)
+            self.published += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Live event for tournament {tournament_id} not published: {str(e)}")
+
+    async def _send(self, tournament_id: str, payload: str):
+        self.deliver(tournament_id, payload)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "broker": type(self).__name__,
+            "channels": len(self._channels),
+            "subscribers": sum(len(subscribers) for subscribers in self._channels.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+            "errors": self.errors
+        }
+
+class RedisTournamentBroker(TournamentBroker):
+    """Relays events through Redis pub/sub so every worker process reaches its own subscribers."""
+
+    def __init__(self, redis, queue_size: int = 256):
+        super().__init__(queue_size)
+        self.redis = redis
+        self._listener: Optional[asyncio.Task] = None
+
+    async def _send(self, tournament_id: str, payload: str):
+        await self.redis.publish(CHANNEL_PREFIX + tournament_id, payload)
+
+    async def start(self):
+        pubsub = self.redis.pubsub()
+        await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self, pubsub):
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message["channel"]
+                    payload = message["data"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    if isinstance(payload, bytes):
+                        payload = payload.decode()
+                    self.deliver(channel[len(CHANNEL_PREFIX):], payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Live event relay interrupted: {str(e)}")
+                await asyncio.sleep(1)
+
+def create_broker() -> TournamentBroker:
+    """Redis relay when LIVE_EVENTS_URL is set and the redis package is installed, else in-process."""
+    queue_size = int(os.getenv("LIVE_EVENTS_QUEUE_SIZE", "256"))
+    url = os.getenv("LIVE_EVENTS_URL")
+    if url:
+        try:
+            import redis.asyncio as redis_asyncio
+            return RedisTournamentBroker(redis_asyncio.from_url(url), queue_size)
+        except ImportError:
+            logger.warning("LIVE_EVENTS_URL is set but the redis package is missing: using the in-process broker")
+    return TournamentBroker(queue_size)
+
+live_broker = create_broker()
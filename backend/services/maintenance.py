@@ -0,0 +1,57 @@
+from services.jobs import JobRunner
+from services.participants import SUMMARIES_FIELD
+from services.registrations import uncount_profile_registrations
+from services.response_cache import response_cache
+from services.standings import rebuild_standings
+from typing import Optional
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Job types
+UNREGISTER_PARTICIPANTS_JOB = "tournaments.unregister_participants"
+REMOVE_TEAM_FROM_TOURNAMENTS_JOB = "teams.remove_from_tournaments"
+REBUILD_STANDINGS_JOB = "standings.rebuild"
+
+# Full standings rebuild period in seconds (0 disables it)
+STANDINGS_REBUILD_INTERVAL = float(os.getenv("STANDINGS_REBUILD_INTERVAL", "86400"))
+
+async def unregister_participants(database, payload: dict) -> dict:
+    """Take a deleted tournament off its participants' profile counters.
+
+    Profiles already uncounted for the tournament are skipped, so the job can
+    be retried.
+    """
+    participant_ids = payload.get("participant_ids", [])
+    tournament_id = payload.get("tournament_id")
+    await uncount_profile_registrations(
+        database, payload.get("counted", {}), participant_ids,
+        marker=f"deleted:{tournament_id}" if tournament_id else None
+    )
+    return {"participants": len(participant_ids)}
+
+async def remove_team_from_tournaments(database, payload: dict) -> dict:
+    """Remove a deleted team from the tournaments it played."""
+    team_id = payload["team_id"]
+    result = await database.tournaments.update_many(
+        {"participants": team_id},
+        {"$pull": {"participants": team_id, SUMMARIES_FIELD: {"id": team_id}}}
+    )
+    if result.modified_count:
+        await response_cache.invalidate("tournaments")
+    return {"tournaments": result.modified_count}
+
+async def rebuild_all_standings(database, payload: Optional[dict] = None) -> dict:
+    count = await rebuild_standings(database)
+    await response_cache.invalidate("leaderboard", "teams")
+    logger.info(f"Standings rebuilt: {count} participants")
+    return {"standings": count}
+
+def register_jobs(runner: JobRunner):
+    runner.register(UNREGISTER_PARTICIPANTS_JOB, unregister_participants)
+    runner.register(REMOVE_TEAM_FROM_TOURNAMENTS_JOB, remove_team_from_tournaments)
+    # A rebuild rewrites the whole collection: never two at once in a process
+    runner.register(REBUILD_STANDINGS_JOB, rebuild_all_standings, concurrency=1)
+    if STANDINGS_REBUILD_INTERVAL > 0:
+        runner.schedule(REBUILD_STANDINGS_JOB, STANDINGS_REBUILD_INTERVAL)
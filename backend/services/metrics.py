@@ -0,0 +1,224 @@
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from pymongo import monitoring
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+COMMAND_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Requests issuing more Mongo commands than this are flagged as N+1 suspects
+N_PLUS_ONE_THRESHOLD = int(os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", "20"))
+
+# Route label of requests that matched no route (404s)
+UNMATCHED_ROUTE = "unmatched"
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield format(bound, "g"), total
+        yield "+Inf", self.count
+
+class RequestStats:
+    """Mongo commands issued while serving one request."""
+    __slots__ = ("commands", "mongo_seconds")
+
+    def __init__(self):
+        self.commands = 0
+        self.mongo_seconds = 0.0
+
+# Set by the middleware for the duration of a request. Motor copies the context
+# into the threads running pymongo, so the listener sees the request's stats.
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo listener counting commands and their time, per command and per request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands: Dict[str, int] = defaultdict(int)
+        self.failures: Dict[str, int] = defaultdict(int)
+        self.seconds: Dict[str, float] = defaultdict(float)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, failed=False)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+    def _record(self, event, failed: bool):
+        seconds = event.duration_micros / 1e6
+        stats = _request_stats.get()
+        with self._lock:
+            self.commands[event.command_name] += 1
+            self.seconds[event.command_name] += seconds
+            if failed:
+                self.failures[event.command_name] += 1
+            if stats is not None:
+                stats.commands += 1
+                stats.mongo_seconds += seconds
+
+    def snapshot(self) -> Tuple[Dict[str, int], Dict[str, float], Dict[str, int]]:
+        """Copies of the command, time and failure counters."""
+        with self._lock:
+            return dict(self.commands), dict(self.seconds), dict(self.failures)
+
+class RequestMetrics:
+    """Latency, status, payload size and Mongo usage per route template.
+
+    Metrics are kept per process: with several workers, each one exposes its
+    own series and Prometheus sums them.
+    """
+
+    def __init__(self, commands: MongoCommandMetrics, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.commands = commands
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.durations: Dict[Tuple[str, str], Histogram] = {}
+        self.sizes: Dict[Tuple[str, str], Histogram] = {}
+        self.mongo_commands: Dict[Tuple[str, str], Histogram] = {}
+        self.mongo_durations: Dict[Tuple[str, str], Histogram] = {}
+        self.n_plus_one: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int, stats: RequestStats):
+        key = (method, route)
+        if key not in self.durations:
+            self.durations[key] = Histogram(DURATION_BUCKETS)
+            self.sizes[key] = Histogram(SIZE_BUCKETS)
+            self.mongo_commands[key] = Histogram(COMMAND_BUCKETS)
+            self.mongo_durations[key] = Histogram(DURATION_BUCKETS)
+
+        self.requests[(method, route, str(status))] += 1
+        self.durations[key].observe(seconds)
+        self.sizes[key].observe(size)
+        self.mongo_commands[key].observe(stats.commands)
+        self.mongo_durations[key].observe(stats.mongo_seconds)
+
+        if stats.commands > self.n_plus_one_threshold:
+            if not self.n_plus_one[key]:
+                logger.warning(
+                    f"Possible N+1 queries: {method} {route} issued {stats.commands} Mongo commands "
+                    f"(threshold {self.n_plus_one_threshold})"
+                )
+            self.n_plus_one[key] += 1
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def counter(name: str, help_text: str, values: Dict[tuple, float], label_names: Tuple[str, ...]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(values.items()):
+                lines.append(f"{name}{{{_labels(zip(label_names, labels))}}} {format(value, 'g')}")
+
+        def histogram(name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), hist in sorted(histograms.items()):
+                labels = _labels([("method", method), ("route", route)])
+                for bound, count in hist.cumulative():
+                    lines.append(f"{name}_bucket{{{labels},le=\"{bound}\"}} {count}")
+                lines.append(f"{name}_sum{{{labels}}} {format(hist.sum, 'g')}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        counter("http_requests_total", "HTTP requests by route template and status code.",
+                self.requests, ("method", "route", "status"))
+        histogram("http_request_duration_seconds", "HTTP request latency.", self.durations)
+        histogram("http_response_size_bytes", "HTTP response body size.", self.sizes)
+        histogram("http_request_mongo_commands", "Mongo commands issued per HTTP request.", self.mongo_commands)
+        histogram("http_request_mongo_duration_seconds", "Time spent in Mongo commands per HTTP request.",
+                  self.mongo_durations)
+        counter("http_n_plus_one_suspects_total",
+                f"HTTP requests issuing more than {self.n_plus_one_threshold} Mongo commands.",
+                self.n_plus_one, ("method", "route"))
+
+        commands, seconds, failures = self.commands.snapshot()
+        counter("mongo_commands_total", "Mongo commands by name, background tasks included.",
+                {(name,): count for name, count in commands.items()}, ("command",))
+        counter("mongo_command_duration_seconds_total", "Time spent in Mongo commands by name.",
+                {(name,): total for name, total in seconds.items()}, ("command",))
+        counter("mongo_command_failures_total", "Failed Mongo commands by name.",
+                {(name,): count for name, count in failures.items()}, ("command",))
+
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+def route_template(scope: dict) -> str:
+    """Path template of the route that served the request, e.g. /api/tournaments/{tournament_id}."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("endpoint") is not None and "app_root_path" in scope:
+        # Mounted application (static files): label it with its mount path
+        return scope["root_path"][len(scope["app_root_path"]):] or UNMATCHED_ROUTE
+    return UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """ASGI middleware feeding `request_metrics` for every HTTP request.
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so streaming
+    responses (server-sent events) pass through untouched.
+    """
+
+    def __init__(self, app, metrics: Optional[RequestMetrics] = None):
+        self.app = app
+        self.metrics = metrics or request_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        response = {"status": 500, "size": 0}
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_stats.reset(token)
+            self.metrics.observe(
+                scope["method"], route_template(scope), response["status"],
+                time.perf_counter() - start, response["size"], stats
+            )
+
+command_metrics = MongoCommandMetrics()
+request_metrics = RequestMetrics(command_metrics)
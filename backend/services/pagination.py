@@ -0,0 +1,87 @@
+from datetime import datetime
+from pymongo import ASCENDING
+from typing import Any, List, Optional, Tuple
+import base64
+import binascii
+import json
+
+# List endpoints return the cursor of the next page in this header (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Sort orders of the paginated endpoints. Each ends with `id` so the order is
+# total and a cursor designates exactly one position.
+NEWEST_FIRST = [("created_at", -1), ("id", -1)]
+PINNED_THEN_NEWEST = [("is_pinned", -1), ("created_at", -1), ("id", -1)]
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque token holding the sort key values of the last document of a page."""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: List[Tuple[str, int]]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(sort):
+            raise InvalidCursorError("Invalid cursor")
+        return [_decode_value(value) for value in values]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+
+def keyset_filter(sort: List[Tuple[str, int]], values: List[Any]) -> dict:
+    """Documents strictly after `values` in `sort` order.
+
+    For sort (a desc, b desc) and values (x, y): a < x, or a == x and b < y.
+    """
+    branches = []
+    for position, (field, direction) in enumerate(sort):
+        branch = {previous: values[i] for i, (previous, _) in enumerate(sort[:position])}
+        branch[field] = {"$gt" if direction == ASCENDING else "$lt": values[position]}
+        branches.append(branch)
+    return {"$or": branches}
+
+async def paginate(
+    collection,
+    filter_dict: dict,
+    sort: List[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    projection: Optional[dict] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one page. Returns (documents, cursor of the next page or None).
+
+    With a cursor the page starts right after the cursor position through the
+    sort index, so deep pages cost the same as the first one; `skip` is only
+    honoured without a cursor, for existing clients. Raises ValueError if
+    `limit` is below 1 (endpoints bound it with Query(ge=1)).
+    """
+    if limit < 1:
+        raise ValueError(f"Page limit must be at least 1, got {limit}")
+
+    query = filter_dict
+    if cursor:
+        query = {"$and": [filter_dict, keyset_filter(sort, decode_cursor(cursor, sort))]}
+        skip = 0
+
+    # One extra document tells whether a next page exists
+    documents = await collection.find(query, projection).sort(sort).skip(skip).limit(limit + 1).to_list(limit + 1)
+    if len(documents) <= limit:
+        return documents, None
+
+    documents = documents[:limit]
+    last = documents[-1]
+    return documents, encode_cursor([last.get(field) for field, _ in sort])
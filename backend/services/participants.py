@@ -0,0 +1,224 @@
+from typing import Dict, Iterable, List, Optional, Set
+from models import ParticipantInfo, ParticipantType
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+USER_PROJECTION = {"_id": 0, "id": 1, "username": 1}
+TEAM_PROJECTION = {"_id": 0, "id": 1, "name": 1, "members": 1, "max_members": 1}
+
+# Tournament field holding a summary (ParticipantInfo) of each entry of `participants`
+SUMMARIES_FIELD = "participant_summaries"
+
+def _unique_ids(ids: Iterable[str]) -> List[str]:
+    """Deduplicate IDs while keeping their order, dropping missing values."""
+    return list(dict.fromkeys(i for i in ids if i is not None))
+
+def user_participant(user_data: dict) -> ParticipantInfo:
+    return ParticipantInfo(
+        id=user_data["id"],
+        type=ParticipantType.USER,
+        name=user_data["username"],
+        display_name=user_data["username"]
+    )
+
+def team_participant(team_data: dict) -> ParticipantInfo:
+    members_count = len(team_data.get("members", []))
+    max_members = team_data.get("max_members", 6)
+    return ParticipantInfo(
+        id=team_data["id"],
+        type=ParticipantType.TEAM,
+        name=team_data["name"],
+        display_name=f"{team_data['name']} ({members_count}/{max_members})",
+        members_count=members_count,
+        max_members=max_members
+    )
+
+def unknown_participant(participant_id: str) -> ParticipantInfo:
+    return ParticipantInfo(
+        id=participant_id,
+        type=ParticipantType.UNKNOWN,
+        name=f"Participant {participant_id[:8]}",
+        display_name=f"Participant {participant_id[:8]}"
+    )
+
+class ParticipantResolver:
+    """Resolve participant IDs (users or teams) in bulk.
+
+    A whole set of IDs costs two `$in` queries, run concurrently, instead of one
+    or two `find_one` calls per ID. Users win over teams when an ID matches both,
+    as in the original per-ID lookups.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    async def resolve(self, participant_ids: Iterable[str]) -> Dict[str, ParticipantInfo]:
+        """Map every ID to its ParticipantInfo, falling back to an 'unknown' entry."""
+        ids = _unique_ids(participant_ids)
+        if not ids:
+            return {}
+
+        users, teams = await asyncio.gather(
+            self.db.users.find({"id": {"$in": ids}}, USER_PROJECTION).to_list(None),
+            self.db.teams.find({"id": {"$in": ids}}, TEAM_PROJECTION).to_list(None)
+        )
+        users_by_id = {user["id"]: user for user in users}
+        teams_by_id = {team["id"]: team for team in teams}
+
+        resolved = {}
+        for participant_id in ids:
+            if participant_id in users_by_id:
+                resolved[participant_id] = user_participant(users_by_id[participant_id])
+            elif participant_id in teams_by_id:
+                resolved[participant_id] = team_participant(teams_by_id[participant_id])
+            else:
+                resolved[participant_id] = unknown_participant(participant_id)
+        return resolved
+
+    async def usernames(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """Map user IDs to usernames with a single query. Missing users are omitted."""
+        ids = _unique_ids(user_ids)
+        if not ids:
+            return {}
+
+        users = await self.db.users.find({"id": {"$in": ids}}, USER_PROJECTION).to_list(None)
+        return {user["id"]: user["username"] for user in users}
+
+def summary_document(info: ParticipantInfo) -> dict:
+    """Compact form of a participant embedded in tournament documents."""
+    return info.dict(exclude_none=True)
+
+async def embedded_participants(database, tournament: dict) -> Dict[str, ParticipantInfo]:
+    """Participants of a tournament document keyed by ID, from its embedded summaries.
+
+    Only IDs without a summary (tournaments not reconciled yet) are resolved
+    from users and teams.
+    """
+    summaries = {summary["id"]: ParticipantInfo(**summary) for summary in tournament.get(SUMMARIES_FIELD) or []}
+    missing = [participant_id for participant_id in tournament.get("participants", []) if participant_id not in summaries]
+    if missing:
+        summaries.update(await ParticipantResolver(database).resolve(missing))
+    return summaries
+
+class ParticipantSummaryReconciler:
+    """Background task keeping the embedded participant summaries up to date.
+
+    Routes that rename a team or change its members call `mark_changed`; the
+    summaries of those participants are refreshed in every tournament shortly
+    after. Every `interval` seconds (and at startup) a full sweep rewrites the
+    summaries that differ from users and teams, which also backfills
+    tournaments created before summaries were embedded and catches writes made
+    outside the API.
+    """
+
+    def __init__(self, interval: float = 600.0, batch_size: int = 100):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.db = None
+        self._pending: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshed = 0
+        self.sweeps = 0
+
+    def start(self, database):
+        self.db = database
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def mark_changed(self, *participant_ids: str):
+        """Schedule a refresh of these participants' summaries."""
+        self._pending.update(participant_ids)
+        self._wakeup.set()
+
+    async def refresh(self, participant_ids: Iterable[str]) -> int:
+        """Rewrite the summaries of these participants in every tournament. Returns tournaments updated."""
+        resolved = await ParticipantResolver(self.db).resolve(participant_ids)
+        modified = 0
+        for participant_id, info in resolved.items():
+            result = await self.db.tournaments.update_many(
+                {f"{SUMMARIES_FIELD}.id": participant_id},
+                {"$set": {f"{SUMMARIES_FIELD}.$": summary_document(info)}}
+            )
+            modified += result.modified_count
+        self.refreshed += modified
+        return modified
+
+    async def reconcile_all(self) -> int:
+        """Compare every tournament's summaries with users and teams. Returns tournaments updated."""
+        modified = 0
+        cursor = self.db.tournaments.find({}, {"_id": 0, "id": 1, "participants": 1, SUMMARIES_FIELD: 1})
+        batch = []
+        async for tournament in cursor:
+            batch.append(tournament)
+            if len(batch) >= self.batch_size:
+                modified += await self._reconcile_batch(batch)
+                batch = []
+        if batch:
+            modified += await self._reconcile_batch(batch)
+        self.sweeps += 1
+        self.refreshed += modified
+        return modified
+
+    async def _reconcile_batch(self, tournaments: List[dict]) -> int:
+        resolved = await ParticipantResolver(self.db).resolve(
+            participant_id for tournament in tournaments for participant_id in tournament.get("participants", [])
+        )
+        modified = 0
+        for tournament in tournaments:
+            stored = tournament.get(SUMMARIES_FIELD)
+            expected = [summary_document(resolved[participant_id]) for participant_id in tournament.get("participants", [])]
+            if stored == expected:
+                continue
+            # Only applies if no registration changed the tournament since it was read
+            result = await self.db.tournaments.update_one(
+                {
+                    "id": tournament["id"],
+                    "participants": tournament.get("participants", []),
+                    SUMMARIES_FIELD: stored if stored is not None else {"$exists": False}
+                },
+                {"$set": {SUMMARIES_FIELD: expected}}
+            )
+            modified += result.modified_count
+        return modified
+
+    async def _run(self):
+        await self._sweep()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                await self._sweep()
+                continue
+
+            self._wakeup.clear()
+            participant_ids, self._pending = self._pending, set()
+            try:
+                await self.refresh(participant_ids)
+            except Exception as e:
+                # Retried by the next sweep
+                logger.error(f"Error refreshing participant summaries: {str(e)}")
+
+    async def _sweep(self):
+        try:
+            modified = await self.reconcile_all()
+            if modified:
+                logger.info(f"Participant summaries reconciled in {modified} tournaments")
+        except Exception as e:
+            logger.error(f"Error reconciling participant summaries: {str(e)}")
+
+summary_reconciler = ParticipantSummaryReconciler(
+    interval=float(os.getenv("PARTICIPANT_RECONCILE_INTERVAL", "600"))
+)
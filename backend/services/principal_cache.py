@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+from models import User
+import os
+import time
+
+class PrincipalCache:
+    """In-process TTL + LRU cache of authenticated users, keyed by token subject (email).
+
+    Memory is bounded by `max_entries`: the least recently used principal is
+    evicted when the cache is full. Entries also expire after `ttl_seconds`, which
+    bounds staleness for writes made outside this process. Writes made through
+    the API (status, role, deletion) must call `invalidate_user` so that bans and
+    role changes take effect on the very next request.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # subject -> (expires_at, user)
+        self._subjects_by_user_id: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[User]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            self._remove(subject)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        return user
+
+    def set(self, subject: str, user: User):
+        if self.max_entries <= 0:
+            return
+        if subject in self._entries:
+            self._remove(subject)
+        self._entries[subject] = (time.monotonic() + self.ttl_seconds, user)
+        self._subjects_by_user_id[user.id] = subject
+        while len(self._entries) > self.max_entries:
+            oldest_subject = next(iter(self._entries))
+            self._remove(oldest_subject)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: str):
+        """Drop the cached principal of a user after its status, role or account changed."""
+        subject = self._subjects_by_user_id.get(user_id)
+        if subject is not None:
+            self._remove(subject)
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._subjects_by_user_id.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups > 0 else 0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+    def _remove(self, subject: str):
+        _, user = self._entries.pop(subject)
+        if self._subjects_by_user_id.get(user.id) == subject:
+            del self._subjects_by_user_id[user.id]
+
+principal_cache = PrincipalCache(
+    max_entries=int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+)
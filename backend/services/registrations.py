@@ -0,0 +1,324 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from models import ParticipantInfo
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from services.participants import SUMMARIES_FIELD, summary_document
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import uuid
+
+# Conditional registration attempts before giving up on a spot freed concurrently
+REGISTRATION_ATTEMPTS = 3
+
+# Waitlist entries are served first come, first served
+WAITLIST_ORDER = [("created_at", 1), ("_id", 1)]
+
+# Profile field holding the markers of the last uncounts applied to it
+UNCOUNTED_FIELD = "uncounted_markers"
+UNCOUNTED_MARKERS = 50
+
+# Tournament field mapping each entry to the users its registration was counted
+# for in profiles. Entries of participants who left stay: only current
+# participants are looked up and registering again overwrites the entry.
+PROFILE_COUNTS_FIELD = "profile_counted"
+
+class RegistrationClosedError(Exception):
+    """Raised when the tournament is not open or its registration period has ended."""
+
+class AlreadyRegisteredError(Exception):
+    """Raised when the participant is already registered for the tournament."""
+
+class AlreadyWaitlistedError(Exception):
+    """Raised when the participant is already on the tournament's waitlist."""
+
+class NotRegisteredError(Exception):
+    """Raised when the participant is not registered for the tournament."""
+
+def registration_filter(tournament_id: str, participant_id: str, now: datetime) -> dict:
+    """Matches the tournament only if `participant_id` may register right now.
+
+    Status, deadline, duplicates and capacity are all checked by the server in
+    the same operation as the write, so concurrent registrations can neither
+    overshoot `max_participants` nor register a participant twice.
+    """
+    return {
+        "id": tournament_id,
+        "status": "open",
+        "registration_end": {"$gte": now},
+        "participants": {"$ne": participant_id},
+        "$expr": {"$lt": [{"$size": {"$ifNull": ["$participants", []]}}, "$max_participants"]}
+    }
+
+async def register_participant(database, tournament_id: str, participant: ParticipantInfo) -> Optional[int]:
+    """Register a participant, or put it on the waitlist when the tournament is full.
+
+    Returns None once registered, else the participant's 1-based waitlist position.
+    """
+    for _ in range(REGISTRATION_ATTEMPTS):
+        now = datetime.utcnow()
+        result = await database.tournaments.update_one(
+            registration_filter(tournament_id, participant.id, now),
+            {
+                "$addToSet": {"participants": participant.id},
+                "$push": {SUMMARIES_FIELD: summary_document(participant)},
+                "$set": {"updated_at": now}
+            }
+        )
+        if result.modified_count:
+            # Registered directly (e.g. after a plain unregister): no longer waiting
+            await database.tournament_waitlist.delete_one({"tournament_id": tournament_id, "participant_id": participant.id})
+            return None
+
+        # Tell why the conditional update did not match
+        tournament = await database.tournaments.find_one(
+            {"id": tournament_id},
+            {"_id": 0, "status": 1, "registration_end": 1, "participants": 1, "max_participants": 1}
+        )
+        if not tournament or tournament.get("status") != "open" or tournament["registration_end"] < now:
+            raise RegistrationClosedError()
+        participants = tournament.get("participants", [])
+        if participant.id in participants:
+            raise AlreadyRegisteredError()
+        if len(participants) >= tournament["max_participants"]:
+            break
+        # A spot was freed between the update and the read: try again
+
+    return await join_waitlist(database, tournament_id, participant)
+
+async def join_waitlist(database, tournament_id: str, participant: ParticipantInfo) -> int:
+    """Queue a participant for a full tournament. Returns its 1-based position."""
+    entry = {
+        "id": str(uuid.uuid4()),
+        "tournament_id": tournament_id,
+        "participant_id": participant.id,
+        "participant": summary_document(participant),
+        "created_at": datetime.utcnow()
+    }
+    try:
+        # Unique on (tournament_id, participant_id)
+        await database.tournament_waitlist.insert_one(entry)
+    except DuplicateKeyError:
+        raise AlreadyWaitlistedError()
+
+    return await waitlist_position(database, entry)
+
+async def waitlist_position(database, entry: dict) -> int:
+    """1-based position of a waitlist entry (as stored, with its _id)."""
+    return await database.tournament_waitlist.count_documents({
+        "tournament_id": entry["tournament_id"],
+        "$or": [
+            {"created_at": {"$lt": entry["created_at"]}},
+            {"created_at": entry["created_at"], "_id": {"$lte": entry["_id"]}}
+        ]
+    })
+
+def _replace_in_array(array: str, match_on: str, value, replacement) -> dict:
+    """Pipeline-update expression swapping the elements of `array` whose `match_on` equals `value`, in place."""
+    return {"$map": {
+        "input": {"$ifNull": [array, []]},
+        "in": {"$cond": [{"$eq": [match_on, value]}, replacement, "$$this"]}
+    }}
+
+async def unregister_participant(database, tournament_id: str, participant_id: str) -> Optional[dict]:
+    """Remove a participant; while the tournament is open its spot goes to the head of the waitlist.
+
+    The promotion replaces the leaving participant in place, in the same
+    update that removes it (a pipeline update, MongoDB 4.2+), so the spot is
+    never seen free and a concurrent registration cannot take it. Returns the promoted participant's summary,
+    or None when nobody was promoted.
+    """
+    while True:
+        head = await database.tournament_waitlist.find(
+            {"tournament_id": tournament_id}
+        ).sort(WAITLIST_ORDER).limit(1).to_list(1)
+        if not head:
+            break
+
+        entry = head[0]
+        promoted_id = entry["participant_id"]
+        result = await database.tournaments.update_one(
+            {
+                "id": tournament_id,
+                "status": "open",
+                "$and": [{"participants": participant_id}, {"participants": {"$ne": promoted_id}}]
+            },
+            [{"$set": {
+                "participants": _replace_in_array("$participants", "$$this", participant_id, promoted_id),
+                SUMMARIES_FIELD: _replace_in_array(
+                    f"${SUMMARIES_FIELD}", "$$this.id", participant_id, {"$literal": entry["participant"]}
+                ),
+                "updated_at": datetime.utcnow()
+            }}]
+        )
+        if result.modified_count:
+            await database.tournament_waitlist.delete_one({"_id": entry["_id"]})
+            return entry["participant"]
+
+        # Tell why the promotion did not apply
+        tournament = await database.tournaments.find_one({"id": tournament_id}, {"_id": 0, "status": 1, "participants": 1})
+        participants = tournament.get("participants", []) if tournament else []
+        if participant_id not in participants:
+            raise NotRegisteredError()
+        if tournament.get("status") != "open":
+            break
+        if promoted_id in participants:
+            # Registered since it was queued: drop the stale entry and try the next one
+            await database.tournament_waitlist.delete_one({"_id": entry["_id"]})
+
+    # Nobody to promote
+    result = await database.tournaments.update_one(
+        {"id": tournament_id, "participants": participant_id},
+        {
+            "$pull": {"participants": participant_id, SUMMARIES_FIELD: {"id": participant_id}},
+            "$set": {"updated_at": datetime.utcnow()}
+        }
+    )
+    if not result.modified_count:
+        raise NotRegisteredError()
+    return None
+
+async def leave_waitlist(database, tournament_id: str, participant_id: str) -> bool:
+    result = await database.tournament_waitlist.delete_one({"tournament_id": tournament_id, "participant_id": participant_id})
+    return result.deleted_count > 0
+
+async def registration_status(database, tournament_id: str, participant_ids: List[str]) -> Optional[dict]:
+    """Registration state of a tournament for the given candidate participants (a user and their teams).
+
+    Returns None when the tournament does not exist.
+    """
+    tournament, entry, waitlist_length = await asyncio.gather(
+        database.tournaments.find_one(
+            {"id": tournament_id},
+            {"_id": 0, "status": 1, "max_participants": 1, "participants": 1, "registration_end": 1}
+        ),
+        database.tournament_waitlist.find_one({"tournament_id": tournament_id, "participant_id": {"$in": participant_ids}}),
+        database.tournament_waitlist.count_documents({"tournament_id": tournament_id})
+    )
+    if not tournament:
+        return None
+
+    participants = tournament.get("participants", [])
+    registered_as = next((participant_id for participant_id in participant_ids if participant_id in participants), None)
+    return {
+        "tournament_id": tournament_id,
+        "status": tournament.get("status"),
+        "registration_end": tournament.get("registration_end"),
+        "max_participants": tournament["max_participants"],
+        "registered_count": len(participants),
+        "spots_left": max(0, tournament["max_participants"] - len(participants)),
+        "waitlist_length": waitlist_length,
+        "registered": registered_as is not None,
+        "participant_id": registered_as or (entry["participant_id"] if entry else None),
+        "waitlisted": entry is not None,
+        "waitlist_position": await waitlist_position(database, entry) if entry else None
+    }
+
+async def count_profile_registrations(database, tournament_id: str, participant_ids: Iterable[str]):
+    """Count new tournament entries in user profiles.
+
+    Registered users are counted directly and registered teams through each of
+    their members; team IDs never get a profile. The users counted for each
+    entry are stored on the tournament under `PROFILE_COUNTS_FIELD`, so the
+    entry is later uncounted from exactly them even if the team changed.
+    Missing profiles are created.
+    """
+    participant_ids = list(participant_ids)
+    if not participant_ids:
+        return
+
+    teams = await database.teams.find(
+        {"id": {"$in": participant_ids}}, {"_id": 0, "id": 1, "members": 1}
+    ).to_list(None)
+    members = {team["id"]: team.get("members", []) for team in teams}
+    counted = {participant_id: members.get(participant_id, [participant_id]) for participant_id in participant_ids}
+
+    # A user may be registered both directly and through a team
+    entries = Counter(user_id for user_ids in counted.values() for user_id in user_ids)
+    if entries:
+        await database.user_profiles.bulk_write([
+            UpdateOne({"user_id": user_id}, {"$inc": {"total_tournaments": count}}, upsert=True)
+            for user_id, count in entries.items()
+        ], ordered=False)
+    await database.tournaments.update_one(
+        {"id": tournament_id},
+        {"$set": {f"{PROFILE_COUNTS_FIELD}.{participant_id}": user_ids for participant_id, user_ids in counted.items()}}
+    )
+
+async def uncount_profile_registrations(
+    database, counted: Dict[str, List[str]], participant_ids: Iterable[str], marker: Optional[str] = None
+):
+    """Take tournament entries off user profiles.
+
+    `counted` is the tournament's `PROFILE_COUNTS_FIELD`. Entries registered
+    before it existed counted the registering user only: a user entry is
+    uncounted from that user, a team entry from nobody since the member who
+    registered it is unknown. Counters never go below 0. Only existing
+    profiles are touched.
+
+    With a `marker`, each profile remembers it among its last
+    `UNCOUNTED_MARKERS` and is skipped if it already has it, so a retried
+    call does not uncount twice.
+    """
+    participant_ids = list(participant_ids)
+    legacy_ids = [participant_id for participant_id in participant_ids if participant_id not in counted]
+    team_ids = set()
+    if legacy_ids:
+        team_ids = {team["id"] for team in await database.teams.find(
+            {"id": {"$in": legacy_ids}}, {"_id": 0, "id": 1}
+        ).to_list(None)}
+
+    entries = Counter(user_id for participant_id in participant_ids for user_id in counted.get(participant_id, []))
+    entries.update(participant_id for participant_id in legacy_ids if participant_id not in team_ids)
+    if not entries:
+        return
+
+    users_by_count = defaultdict(list)
+    for user_id, count in entries.items():
+        users_by_count[count].append(user_id)
+    operations = []
+    for count, user_ids in users_by_count.items():
+        profiles = {"user_id": {"$in": user_ids}}
+        update = {"total_tournaments": {"$max": [0, {"$subtract": [{"$ifNull": ["$total_tournaments", 0]}, count]}]}}
+        if marker is not None:
+            profiles[UNCOUNTED_FIELD] = {"$ne": marker}
+            update[UNCOUNTED_FIELD] = {"$slice": [
+                {"$concatArrays": [{"$ifNull": [f"${UNCOUNTED_FIELD}", []]}, [marker]]}, -UNCOUNTED_MARKERS
+            ]}
+        operations.append(UpdateMany(profiles, [{"$set": update}]))
+    await database.user_profiles.bulk_write(operations, ordered=False)
+
+class RegistrationNotifier:
+    """Wakes up registration status long-polls when a tournament's registrations change.
+
+    Notifications are in-process: with several workers a poll is answered at
+    its timeout at the latest.
+    """
+
+    def __init__(self):
+        self._events: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[asyncio.Event, int] = {}
+
+    def notify(self, tournament_id: str):
+        event = self._events.pop(tournament_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait(self, tournament_id: str, timeout: float) -> bool:
+        """Wait for the next change of the tournament's registrations. False on timeout."""
+        event = self._events.setdefault(tournament_id, asyncio.Event())
+        self._waiters[event] = self._waiters.get(event, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters[event] -= 1
+            if not self._waiters[event]:
+                del self._waiters[event]
+                # Last waiter gone: forget the event unless a notify already replaced it
+                if self._events.get(tournament_id) is event:
+                    del self._events[tournament_id]
+
+registration_notifier = RegistrationNotifier()
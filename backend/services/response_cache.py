@@ -0,0 +1,238 @@
+from collections import OrderedDict
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from typing import Dict, Iterable, Optional, Set, Tuple
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "respcache:"
+TAG_PREFIX = "respcache-tag:"
+REQUEST_PARAM = "_cache_request"
+
+class InMemoryBackend:
+    """In-process store speaking the subset of Redis commands the cache uses
+    (GET, SET with EX, DEL, SADD, SMEMBERS, EXPIRE), so it can stand in for a Redis client.
+
+    Values are bounded by `max_entries`, evicting the least recently used.
+    Sets only hold keys of live values: a key leaves its sets when its value
+    is evicted, expires or is deleted, and empty sets are dropped, so tag sets
+    stay bounded too.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._values: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._sets: Dict[str, Set[str]] = {}
+        self._memberships: Dict[str, Set[str]] = {}  # value key -> keys of the sets holding it
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._drop_value(key)
+            return None
+        self._values.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None):
+        if self.max_entries <= 0:
+            return
+        self._values.pop(key, None)
+        self._values[key] = (time.monotonic() + ex if ex else None, value)
+        while len(self._values) > self.max_entries:
+            self._drop_value(next(iter(self._values)))
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            if key in self._values:
+                self._drop_value(key)
+                deleted += 1
+            elif key in self._sets:
+                for member in self._sets.pop(key):
+                    self._memberships[member].discard(key)
+                deleted += 1
+        return deleted
+
+    async def sadd(self, key: str, *members: str) -> int:
+        # Members without a value would never be removed: skip them
+        members = [member for member in members if member in self._values]
+        if not members:
+            return 0
+        members_set = self._sets.setdefault(key, set())
+        before = len(members_set)
+        members_set.update(members)
+        for member in members:
+            self._memberships.setdefault(member, set()).add(key)
+        return len(members_set) - before
+
+    async def smembers(self, key: str) -> Set[str]:
+        return set(self._sets.get(key, ()))
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        # Sets are pruned as their values go: they need no expiry of their own
+        return key in self._values or key in self._sets
+
+    def _drop_value(self, key: str):
+        del self._values[key]
+        for set_key in self._memberships.pop(key, ()):
+            members = self._sets.get(set_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._sets[set_key]
+
+class ResponseCache:
+    """Cache of serialized JSON responses with ETags, invalidated by tags.
+
+    Each cached response is registered under tags (collection names or
+    `tournament:<id>`); write endpoints call `invalidate` with the tags they
+    affect. The TTL of each route bounds staleness for anything not tagged.
+    Backend errors are logged and treated as misses.
+
+    Tag sets expire `tag_ttl` seconds after their last addition, the longest
+    TTL of the cached routes, so a set outlives its members and, with Redis,
+    sets of tags never invalidated do not pile up.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.tag_ttl = 0  # Raised by each cached_response route to its TTL
+        self._generation = 0  # Bumped by every local invalidation
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def lookup(self, key: str) -> Optional[Tuple[str, bytes]]:
+        try:
+            value = await self.backend.get(KEY_PREFIX + key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache lookup failed: {str(e)}")
+            return None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        etag, body = value.split(b"\n", 1)
+        return etag.decode(), body
+
+    async def store(self, key: str, etag: str, body: bytes, ttl: int, tags: Iterable[str], generation: int):
+        # An invalidation ran while the response was computed: it may already be stale
+        if generation != self._generation:
+            return
+        try:
+            await self.backend.set(KEY_PREFIX + key, etag.encode() + b"\n" + body, ex=ttl)
+            for tag in tags:
+                await self.backend.sadd(TAG_PREFIX + tag, KEY_PREFIX + key)
+                await self.backend.expire(TAG_PREFIX + tag, max(self.tag_ttl, ttl))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache store failed: {str(e)}")
+
+    async def invalidate(self, *tags: str):
+        """Drop every cached response registered under one of `tags`."""
+        self._generation += 1
+        self.invalidations += 1
+        try:
+            for tag in tags:
+                keys = await self.backend.smembers(TAG_PREFIX + tag)
+                await self.backend.delete(*keys, TAG_PREFIX + tag)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache invalidation failed: {str(e)}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "errors": self.errors
+        }
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def cached_response(ttl: int, tags: Iterable[str] = ()):
+    """Cache a GET endpoint's JSON response for `ttl` seconds, with ETag / If-None-Match.
+
+    Tags may reference path parameters, e.g. "tournament:{tournament_id}".
+    The endpoint must return JSON-serializable data (not a Response).
+    """
+    tags = tuple(tags)
+    response_cache.tag_ttl = max(response_cache.tag_ttl, ttl)
+
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        # Only the query parameters the endpoint declares vary the response:
+        # others would just fill the cache with copies
+        query_names = frozenset(
+            getattr(parameter.default, "alias", None) or name for name, parameter in signature.parameters.items()
+        )
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.pop(REQUEST_PARAM)
+            query = sorted(item for item in request.query_params.multi_items() if item[0] in query_names)
+            key = f"{endpoint.__module__}.{endpoint.__name__}:{request.url.path}?{query}"
+
+            cached = await response_cache.lookup(key)
+            if cached:
+                etag, body = cached
+            else:
+                generation = response_cache._generation
+                content = await endpoint(*args, **kwargs)
+                body = json.dumps(
+                    jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+                ).encode("utf-8")
+                etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+                route_tags = [tag.format(**kwargs) for tag in tags]
+                await response_cache.store(key, etag, body, ttl, route_tags, generation)
+
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                response_cache.not_modified += 1
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        # Let FastAPI inject the request next to the endpoint's own parameters
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        ])
+        return wrapper
+
+    return decorator
+
+def create_backend():
+    """Redis when RESPONSE_CACHE_URL is set and the redis package is installed, else in-process."""
+    url = os.getenv("RESPONSE_CACHE_URL")
+    if url:
+        try:
+            import redis.asyncio as redis_asyncio
+            return redis_asyncio.from_url(url)
+        except ImportError:
+            logger.warning("RESPONSE_CACHE_URL is set but the redis package is missing: using the in-process cache")
+    return InMemoryBackend(max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "512")))
+
+response_cache = ResponseCache(create_backend())
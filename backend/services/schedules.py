@@ -0,0 +1,211 @@
+from datetime import datetime
+from models import Match, MatchStatus
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import math
+import numpy as np
+
+# Step budget of the rematch-avoiding pairing search before rematches are allowed
+PAIRING_SEARCH_BUDGET = 20000
+
+def generate_round_robin(tournament_id: str, participants: List[str]) -> List[Match]:
+    """Generate every round of a round robin with the circle method.
+
+    The first participant stays fixed while the others rotate, so each pair
+    meets exactly once in n-1 rounds (n rounds with a bye when n is odd).
+    """
+    players: List[Optional[str]] = participants.copy()
+    if len(players) % 2 != 0:
+        players.append(None)  # Bye
+
+    count = len(players)
+    scheduled_time = datetime.utcnow()
+    matches = []
+
+    for round_index in range(count - 1):
+        for i in range(count // 2):
+            player1, player2 = players[i], players[count - 1 - i]
+            if player1 is None or player2 is None:
+                continue
+            # Alternate sides of the fixed participant between rounds
+            if i == 0 and round_index % 2 == 1:
+                player1, player2 = player2, player1
+            matches.append(Match(
+                tournament_id=tournament_id,
+                round_number=round_index + 1,
+                match_number=len(matches) + 1,
+                player1_id=player1,
+                player2_id=player2,
+                status=MatchStatus.SCHEDULED,
+                scheduled_time=scheduled_time
+            ))
+        players = [players[0], players[-1]] + players[1:-1]
+
+    return matches
+
+def swiss_round_count(participants_count: int) -> int:
+    """Rounds needed for a single undefeated participant: ceil(log2(n))."""
+    return max(1, math.ceil(math.log2(max(participants_count, 2))))
+
+class Standings(NamedTuple):
+    points: np.ndarray  # Wins, a bye counts as a win
+    buchholz: np.ndarray  # Sum of the opponents' points
+    head_to_head: np.ndarray  # Wins against opponents on the same points
+    played: np.ndarray  # played[i, j]: i and j already met
+    had_bye: np.ndarray
+    ranking: np.ndarray  # Participant indexes, best first
+
+def compute_standings(participants: List[str], matches: List[dict]) -> Standings:
+    """Points, Buchholz and head-to-head of every participant, computed on arrays.
+
+    Ties on every criterion keep the participants' order (their seed).
+    """
+    count = len(participants)
+    index = {participant_id: i for i, participant_id in enumerate(participants)}
+
+    pairings = []
+    results = []
+    byes = []
+    for match in matches:
+        player1, player2 = index.get(match.get("player1_id")), index.get(match.get("player2_id"))
+        if player1 is None:
+            continue
+        if player2 is None:
+            if match.get("player2_id") == "BYE":
+                byes.append(player1)
+            continue
+        pairings.append((player1, player2))
+        winner = index.get(match.get("winner_id"))
+        if match.get("status") == MatchStatus.COMPLETED and winner is not None:
+            results.append((player1, player2, winner))
+
+    played = np.zeros((count, count), dtype=bool)
+    if pairings:
+        first, second = np.array(pairings, dtype=np.intp).T
+        played[first, second] = True
+        played[second, first] = True
+
+    points = np.zeros(count)
+    had_bye = np.zeros(count, dtype=bool)
+    if byes:
+        np.add.at(points, byes, 1)
+        had_bye[byes] = True
+
+    buchholz = np.zeros(count)
+    head_to_head = np.zeros(count)
+    if results:
+        player1, player2, winner = np.array(results, dtype=np.intp).T
+        np.add.at(points, winner, 1)
+        np.add.at(buchholz, player1, points[player2])
+        np.add.at(buchholz, player2, points[player1])
+        tied = points[player1] == points[player2]
+        np.add.at(head_to_head, winner[tied], 1)
+
+    ranking = np.lexsort((np.arange(count), -head_to_head, -buchholz, -points))
+    return Standings(points, buchholz, head_to_head, played, had_bye, ranking)
+
+def _pairing_candidates(first: int, unpaired: List[int], points: np.ndarray) -> List[int]:
+    """Opponents for the best unpaired participant, preferred first.
+
+    Within its score group the top half meets the bottom half (first faces the
+    participant half a group below), then lower score groups in ranking order.
+    """
+    others = unpaired[1:]
+    group_size = int(np.count_nonzero(points[others] == points[first])) + 1
+    mirror = group_size // 2 - 1
+    group = others[:group_size - 1]
+    return group[mirror:] + group[:mirror][::-1] + others[group_size - 1:]
+
+def pair_swiss_round(ranking: List[int], standings: Standings) -> List[Tuple[int, int]]:
+    """Pair ranked participants by score group, avoiding rematches.
+
+    Depth-first search over the preferred opponents; if no rematch-free
+    pairing is found within the step budget, rematches are allowed.
+    """
+    budget = [PAIRING_SEARCH_BUDGET]
+
+    def search(unpaired: List[int], avoid_rematches: bool) -> Optional[List[Tuple[int, int]]]:
+        if not unpaired:
+            return []
+        first = unpaired[0]
+        candidates = _pairing_candidates(first, unpaired, standings.points)
+        if avoid_rematches:
+            candidates = [c for c, met in zip(candidates, standings.played[first, candidates]) if not met]
+        for candidate in candidates:
+            budget[0] -= 1
+            if budget[0] < 0 and avoid_rematches:
+                return None
+            rest = [player for player in unpaired[1:] if player != candidate]
+            pairs = search(rest, avoid_rematches)
+            if pairs is not None:
+                return [(first, candidate)] + pairs
+        return None
+
+    pairs = search(ranking, True)
+    if pairs is None:
+        pairs = search(ranking, False)
+    return pairs
+
+def generate_swiss_round(
+    tournament_id: str,
+    participants: List[str],
+    matches: List[dict],
+    round_number: int,
+    first_match_number: int = 1
+) -> List[Match]:
+    """Pair the next Swiss round from the results of `matches`.
+
+    With an odd field the lowest ranked participant without a bye yet gets
+    one, stored as a completed match against "BYE" worth one point.
+    """
+    standings = compute_standings(participants, matches)
+    ranking = [int(i) for i in standings.ranking]
+
+    bye = None
+    if len(ranking) % 2 != 0:
+        bye = next((i for i in reversed(ranking) if not standings.had_bye[i]), ranking[-1])
+        ranking.remove(bye)
+
+    scheduled_time = datetime.utcnow()
+    round_matches = []
+    for player1, player2 in pair_swiss_round(ranking, standings):
+        round_matches.append(Match(
+            tournament_id=tournament_id,
+            round_number=round_number,
+            match_number=first_match_number + len(round_matches),
+            player1_id=participants[player1],
+            player2_id=participants[player2],
+            status=MatchStatus.SCHEDULED,
+            scheduled_time=scheduled_time
+        ))
+
+    if bye is not None:
+        round_matches.append(Match(
+            tournament_id=tournament_id,
+            round_number=round_number,
+            match_number=first_match_number + len(round_matches),
+            player1_id=participants[bye],
+            player2_id="BYE",
+            winner_id=participants[bye],
+            status=MatchStatus.COMPLETED,
+            scheduled_time=scheduled_time,
+            completed_at=scheduled_time
+        ))
+
+    return round_matches
+
+def standings_leader(participants: List[str], matches: List[dict]) -> str:
+    return participants[int(compute_standings(participants, matches).ranking[0])]
+
+def standings_table(participants: List[str], matches: List[dict]) -> List[Dict]:
+    """Ranked standings rows for the API."""
+    standings = compute_standings(participants, matches)
+    return [
+        {
+            "rank": rank,
+            "participant_id": participants[i],
+            "points": int(standings.points[i]),
+            "buchholz": int(standings.buchholz[i]),
+            "head_to_head": int(standings.head_to_head[i])
+        }
+        for rank, i in enumerate(standings.ranking, start=1)
+    ]
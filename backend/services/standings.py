@@ -0,0 +1,256 @@
+from pymongo import ReplaceOne, UpdateOne
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+
+# Points awarded for a tournament victory, by game mode
+TROPHY_POINTS = {"1v1": 100, "2v2": 150, "5v5": 200}
+
+# Bump when the standing document shape or the way it is computed changes:
+# the next startup rebuilds the collection
+STANDINGS_SCHEMA_VERSION = 2
+
+STANDING_FIELDS = {
+    "total_points": 0,
+    "trophies_1v1": 0,
+    "trophies_2v2": 0,
+    "trophies_5v5": 0,
+    # Sum of the trophies, stored so that the members directory sorts on an index
+    "trophies_total": 0,
+    "tournaments_won": 0,
+    "total_tournaments": 0,
+    "matches_played": 0,
+    "matches_won": 0,
+}
+
+def tournament_mode(tournament: dict) -> str:
+    """Classify a tournament as 1v1, 2v2 or 5v5 from its title and size."""
+    max_participants = tournament.get("max_participants", 2)
+    tournament_name = tournament.get("title", "").lower()
+
+    if "1v1" in tournament_name or max_participants <= 2:
+        return "1v1"
+    elif "2v2" in tournament_name or max_participants <= 4:
+        return "2v2"
+    return "5v5"
+
+def is_placeholder(participant_id: Optional[str]) -> bool:
+    """Bracket slots not yet filled hold placeholders such as 'Winner of Match 3' or 'Loser of Match 5'."""
+    return not participant_id or participant_id == "BYE" or participant_id.startswith(("Winner of", "Loser of"))
+
+def victories_by_type(standing: Optional[dict]) -> Dict[str, int]:
+    standing = standing or {}
+    return {mode: standing.get(f"trophies_{mode}", 0) for mode in TROPHY_POINTS}
+
+def team_statistics(standing: Optional[dict]) -> dict:
+    """Team statistics in the shape returned by teams.calculate_team_statistics."""
+    standing = standing or {}
+    total_tournaments = standing.get("total_tournaments", 0)
+    tournaments_won = standing.get("tournaments_won", 0)
+    win_rate = (tournaments_won / total_tournaments * 100) if total_tournaments > 0 else 0
+
+    return {
+        "total_tournaments": total_tournaments,
+        "tournaments_won": tournaments_won,
+        "win_rate": round(win_rate, 1),
+        "total_points": standing.get("total_points", 0),
+        "victories_by_type": victories_by_type(standing)
+    }
+
+async def ensure_standing(database, participant_id: str, participant_type: str, game: Optional[str] = None):
+    """Create an empty standing for a new user or team so it shows up in leaderboards."""
+    on_insert = {
+        "participant_id": participant_id,
+        "participant_type": participant_type,
+        **STANDING_FIELDS,
+        "updated_at": datetime.utcnow()
+    }
+    if game:
+        on_insert["game"] = game
+
+    await database.standings.update_one(
+        {"participant_id": participant_id},
+        {"$setOnInsert": on_insert},
+        upsert=True
+    )
+
+async def delete_standing(database, participant_id: str):
+    await database.standings.delete_one({"participant_id": participant_id})
+
+async def _increment_standings(database, increments: Dict[str, Dict[str, int]]):
+    """Apply counter increments per participant in one bulk write.
+
+    Participants without a standing yet (created before the standings
+    collection, or missed by a rebuild) get one with the other counters at 0,
+    typed as a team when a team has that ID and as a user otherwise.
+    """
+    increments = {
+        participant_id: inc for participant_id, inc in increments.items()
+        if not is_placeholder(participant_id) and any(inc.values())
+    }
+    if not increments:
+        return
+
+    teams = await database.teams.find(
+        {"id": {"$in": list(increments)}}, {"_id": 0, "id": 1, "game": 1}
+    ).to_list(None)
+    team_games = {team["id"]: team.get("game") for team in teams}
+
+    now = datetime.utcnow()
+    operations = []
+    for participant_id, inc in increments.items():
+        on_insert = {
+            "participant_id": participant_id,
+            "participant_type": "team" if participant_id in team_games else "user",
+            **{field: value for field, value in STANDING_FIELDS.items() if field not in inc}
+        }
+        if team_games.get(participant_id):
+            on_insert["game"] = team_games[participant_id]
+        operations.append(UpdateOne(
+            {"participant_id": participant_id},
+            {"$inc": inc, "$set": {"updated_at": now}, "$setOnInsert": on_insert},
+            upsert=True
+        ))
+    await database.standings.bulk_write(operations, ordered=False)
+
+async def record_registrations(database, participant_ids: Iterable[str], delta: int):
+    """Count (delta=1) or uncount (delta=-1) tournament registrations."""
+    await _increment_standings(
+        database, {participant_id: {"total_tournaments": delta} for participant_id in participant_ids}
+    )
+
+async def record_match_result(database, match: dict, winner_id: str):
+    """Update match counters when a match result is recorded.
+
+    `match` is the document as it was before the update, so that correcting the
+    result of an already completed match only moves the win, without counting
+    the match twice.
+    """
+    increments = {}
+
+    if match.get("status") == "completed":
+        previous_winner = match.get("winner_id")
+        if previous_winner == winner_id:
+            return
+        increments[previous_winner] = {"matches_won": -1}
+        increments[winner_id] = {"matches_won": 1}
+    else:
+        for player_id in [match.get("player1_id"), match.get("player2_id")]:
+            increments[player_id] = {"matches_played": 1, "matches_won": 1 if player_id == winner_id else 0}
+
+    await _increment_standings(database, increments)
+
+async def record_tournament_victory(database, tournament: dict, winner_id: str, delta: int = 1):
+    """Award (delta=1) or revoke (delta=-1) the trophy and points of a tournament victory."""
+    if is_placeholder(winner_id):
+        return
+
+    mode = tournament_mode(tournament)
+    await _increment_standings(database, {winner_id: {
+        "total_points": TROPHY_POINTS[mode] * delta,
+        f"trophies_{mode}": delta,
+        "trophies_total": delta,
+        "tournaments_won": delta
+    }})
+
+async def seed_by_points(database, participant_ids: List[str]) -> List[str]:
+    """Order participants best seed first by standings points, in one aggregation.
+
+    Participants without a standing count as 0 points; ties keep the given order,
+    so shuffle beforehand for a random draw among equal seeds.
+    """
+    pipeline = [
+        {"$match": {"participant_id": {"$in": participant_ids}}},
+        {"$project": {"_id": 0, "participant_id": 1, "total_points": 1}}
+    ]
+    points = {
+        doc["participant_id"]: doc.get("total_points", 0)
+        async for doc in database.standings.aggregate(pipeline)
+    }
+    return sorted(participant_ids, key=lambda participant_id: -points.get(participant_id, 0))
+
+async def rebuild_standings(database) -> int:
+    """Recompute the whole standings collection from users, teams, tournaments and matches.
+
+    Returns the number of standings written.
+    """
+    users = await database.users.find({}, {"_id": 0, "id": 1}).to_list(None)
+    teams = await database.teams.find({}, {"_id": 0, "id": 1, "game": 1}).to_list(None)
+
+    standings = {}
+    for user in users:
+        standings[user["id"]] = {"participant_id": user["id"], "participant_type": "user", **STANDING_FIELDS}
+    for team in teams:
+        standings.setdefault(
+            team["id"],
+            {"participant_id": team["id"], "participant_type": "team", "game": team.get("game"), **STANDING_FIELDS}
+        )
+
+    # Tournament registrations
+    registrations = await database.tournaments.aggregate([
+        {"$unwind": "$participants"},
+        {"$group": {"_id": "$participants", "count": {"$sum": 1}}}
+    ]).to_list(None)
+    for row in registrations:
+        if row["_id"] in standings:
+            standings[row["_id"]]["total_tournaments"] = row["count"]
+
+    # Tournament victories
+    won_tournaments = await database.tournaments.find(
+        {"status": "completed", "winner_id": {"$ne": None}},
+        {"_id": 0, "winner_id": 1, "title": 1, "max_participants": 1}
+    ).to_list(None)
+    for tournament in won_tournaments:
+        standing = standings.get(tournament["winner_id"])
+        if not standing:
+            continue
+        mode = tournament_mode(tournament)
+        standing["total_points"] += TROPHY_POINTS[mode]
+        standing[f"trophies_{mode}"] += 1
+        standing["trophies_total"] += 1
+        standing["tournaments_won"] += 1
+
+    # Completed matches, played and won
+    match_counts = await database.matches.aggregate([
+        {"$match": {"status": "completed"}},
+        {"$project": {"winner_id": 1, "players": ["$player1_id", "$player2_id"]}},
+        {"$unwind": "$players"},
+        {"$group": {
+            "_id": "$players",
+            "played": {"$sum": 1},
+            "won": {"$sum": {"$cond": [{"$eq": ["$players", "$winner_id"]}, 1, 0]}}
+        }}
+    ]).to_list(None)
+    for row in match_counts:
+        if row["_id"] in standings:
+            standings[row["_id"]]["matches_played"] = row["played"]
+            standings[row["_id"]]["matches_won"] = row["won"]
+
+    now = datetime.utcnow()
+    operations = [
+        ReplaceOne({"participant_id": participant_id}, {**standing, "updated_at": now}, upsert=True)
+        for participant_id, standing in standings.items()
+    ]
+    if operations:
+        await database.standings.bulk_write(operations, ordered=False)
+    await database.standings.delete_many({"participant_id": {"$nin": list(standings)}})
+
+    return len(operations)
+
+async def ensure_standings(database) -> Optional[int]:
+    """Rebuild the standings at startup when they are missing or out of date.
+
+    The collection is rebuilt when it is empty (a database from before
+    standings existed) or was built with another STANDINGS_SCHEMA_VERSION.
+    Returns the number of standings written, or None when they were current.
+    """
+    marker = await database.schema_versions.find_one({"id": "standings"}, {"_id": 0, "version": 1})
+    if marker and marker.get("version") == STANDINGS_SCHEMA_VERSION and await database.standings.find_one({}, {"_id": 1}):
+        return None
+
+    count = await rebuild_standings(database)
+    await database.schema_versions.update_one(
+        {"id": "standings"},
+        {"$set": {"version": STANDINGS_SCHEMA_VERSION, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    return count
@@ -0,0 +1,51 @@
+from typing import Awaitable, Dict, List, Optional
+import asyncio
+import os
+
+# Take whole-collection totals from collection metadata instead of counting documents
+ESTIMATED_TOTALS = os.getenv("STATS_ESTIMATED_TOTALS", "false").lower() in ("1", "true", "yes")
+
+async def collection_stats(
+    collection,
+    counts: Optional[Dict[str, dict]] = None,
+    facets: Optional[Dict[str, List[dict]]] = None,
+    total: bool = True,
+    estimated_total: Optional[bool] = None
+) -> dict:
+    """Numbers of one collection in a single `$facet` aggregation.
+
+    Returns {"total": ..., <name>: count of documents matching the filter for
+    each `counts` entry, <name>: documents of the sub-pipeline for each `facets`
+    entry}; "total" is left out when `total` is False. With `estimated_total`
+    (default: STATS_ESTIMATED_TOTALS) the total comes from
+    estimated_document_count, which reads collection metadata and may be off
+    after an unclean shutdown or on sharded clusters.
+    """
+    counts = counts or {}
+    facets = facets or {}
+    if estimated_total is None:
+        estimated_total = ESTIMATED_TOTALS
+
+    branches = {name: [{"$match": filter_dict}, {"$count": "count"}] for name, filter_dict in counts.items()}
+    branches.update(facets)
+    if total and not estimated_total:
+        branches["total"] = [{"$count": "count"}]
+
+    stats = {}
+    if branches:
+        result = await collection.aggregate([{"$facet": branches}]).to_list(1)
+        facet = result[0] if result else {}
+        for name in branches:
+            documents = facet.get(name, [])
+            if name in facets:
+                stats[name] = documents
+            else:
+                stats[name] = documents[0]["count"] if documents else 0
+    if total and estimated_total:
+        stats["total"] = await collection.estimated_document_count()
+    return stats
+
+async def gather_stats(**queries: Awaitable) -> dict:
+    """Run the per-collection queries concurrently; results keyed like the arguments."""
+    results = await asyncio.gather(*queries.values())
+    return dict(zip(queries, results))
@@ -0,0 +1,94 @@
+from services.events import (
+    CHANGE_STREAM_SOURCE, EventBus, MatchCompleted, TeamMembershipChanged, TournamentChanged, TournamentCompleted,
+    UserRoleChanged
+)
+from services.jobs import enqueue
+from services.live import bracket_event, live_broker, tournament_event
+from services.maintenance import REBUILD_STANDINGS_JOB
+from services.participants import summary_reconciler
+from services.principal_cache import principal_cache
+from services.registrations import registration_notifier
+from services.response_cache import response_cache
+from typing import List, Set
+
+# Response cache tags that depend on each event type
+CACHE_TAGS = {
+    MatchCompleted: ("matches",),
+    TournamentCompleted: ("tournaments", "leaderboard"),
+    TournamentChanged: ("tournaments",),
+    TeamMembershipChanged: ("teams",),
+    UserRoleChanged: ("users", "leaderboard")
+}
+
+def cache_tags(events: List) -> Set[str]:
+    tags = set()
+    for event in events:
+        tags.update(CACHE_TAGS.get(type(event), ()))
+        tournament_id = getattr(event, "tournament_id", None)
+        if tournament_id:
+            tags.add(f"tournament:{tournament_id}")
+    return tags
+
+def subscribe_defaults(bus: EventBus, database):
+    """Register the subscribers keeping caches and projections in line with events."""
+
+    async def invalidate_cached_responses(events):
+        tags = cache_tags(events)
+        if tags:
+            await response_cache.invalidate(*tags)
+
+    async def invalidate_all_cached_responses():
+        await response_cache.invalidate(*{tag for tags in CACHE_TAGS.values() for tag in tags})
+
+    bus.subscribe(
+        "response-cache", invalidate_cached_responses,
+        MatchCompleted, TournamentCompleted, TournamentChanged, TeamMembershipChanged, UserRoleChanged,
+        resync=invalidate_all_cached_responses
+    )
+
+    async def invalidate_principals(events):
+        for event in events:
+            principal_cache.invalidate_user(event.user_id)
+
+    async def clear_principals():
+        principal_cache.clear()
+
+    bus.subscribe("principals", invalidate_principals, UserRoleChanged, resync=clear_principals)
+
+    # Routes update standings incrementally; writes made outside the API need a
+    # rebuild, queued under a key so that bursts and other processes share one run
+    async def rebuild(events=None):
+        await enqueue(database, REBUILD_STANDINGS_JOB, key=REBUILD_STANDINGS_JOB)
+
+    bus.subscribe(
+        "standings", rebuild, MatchCompleted, TournamentCompleted, TournamentChanged,
+        sources=[CHANGE_STREAM_SOURCE], resync=rebuild, batch_size=1000
+    )
+
+    # Routes push live deltas themselves; external writes make viewers refetch
+    async def notify_viewers(events):
+        # Viewers refetch on these events: drop cached reads first
+        await response_cache.invalidate(*cache_tags(events))
+        refetch = set()
+        for event in events:
+            if isinstance(event, TournamentCompleted):
+                await live_broker.publish(event.tournament_id, tournament_event(
+                    event.tournament_id, status="completed", winner_id=event.winner_id
+                ))
+            elif event.tournament_id:
+                refetch.add(event.tournament_id)
+        for tournament_id in refetch:
+            await live_broker.publish(tournament_id, bracket_event(tournament_id))
+            registration_notifier.notify(tournament_id)
+
+    bus.subscribe(
+        "live-views", notify_viewers, MatchCompleted, TournamentCompleted, TournamentChanged,
+        sources=[CHANGE_STREAM_SOURCE]
+    )
+
+    async def refresh_team_summaries(events):
+        summary_reconciler.mark_changed(*(event.team_id for event in events))
+
+    bus.subscribe(
+        "participant-summaries", refresh_team_summaries, TeamMembershipChanged, sources=[CHANGE_STREAM_SOURCE]
+    )
@@ -0,0 +1,94 @@
+import random
+from collections import Counter
+
+import pytest
+
+from services.bracket_engine import (
+    GRAND_FINAL, LOSERS_BRACKET, WINNERS_BRACKET, bracket_size, generate_double_elimination,
+    generate_single_elimination, seed_positions, seeded_slots
+)
+
+SIZES = range(2, 1025)
+
+def participants(count):
+    return [f"p{i}" for i in range(count)]
+
+def test_seed_positions():
+    assert seed_positions(8) == [1, 8, 4, 5, 2, 7, 3, 6]
+
+def test_byes_go_to_top_seeds_one_per_pair():
+    slots = seeded_slots(participants(5))
+    assert len(slots) == 8
+    pairs = [slots[i:i + 2] for i in range(0, 8, 2)]
+    assert sum(None in pair for pair in pairs) == 3
+    assert all(pair != [None, None] for pair in pairs)
+    byes = {player for pair in pairs if None in pair for player in pair if player}
+    assert byes == {"p0", "p1", "p2"}
+
+@pytest.mark.parametrize("count", SIZES)
+def test_double_elimination_structure(count):
+    matches = generate_double_elimination("t", participants(count))
+    by_id = {match.id: match for match in matches}
+    entrants = set(participants(count))
+
+    assert len(matches) == 2 * count - 2
+    finals = [match for match in matches if match.next_match_id is None]
+    assert len(finals) == 1 and finals[0].bracket == GRAND_FINAL
+
+    # Links point forward, to existing matches, one feeder per slot
+    fed_slots = Counter()
+    for match in matches:
+        for target_id, slot in ((match.next_match_id, match.next_match_slot),
+                                (match.loser_next_match_id, match.loser_next_match_slot)):
+            if target_id is None:
+                continue
+            target = by_id[target_id]
+            assert target.match_number > match.match_number
+            assert slot in (1, 2)
+            fed_slots[(target_id, slot)] += 1
+    assert all(fed == 1 for fed in fed_slots.values())
+
+    # Slots are either fed by a link or hold a first-round entrant; no byes in matches
+    for match in matches:
+        for slot in (1, 2):
+            player = getattr(match, f"player{slot}_id")
+            assert player and player != "BYE"
+            assert (player in entrants) != ((match.id, slot) in fed_slots)
+
+    # Every winners-bracket loser drops to the losers bracket, and only those
+    for match in matches:
+        if match.bracket == WINNERS_BRACKET:
+            assert by_id[match.loser_next_match_id].bracket in (LOSERS_BRACKET, GRAND_FINAL)
+        else:
+            assert match.loser_next_match_id is None
+
+    # Byes: the top seeds skip the first round
+    first_round = [match for match in matches if match.bracket == WINNERS_BRACKET and match.round_number == 1]
+    assert len(first_round) == count - bracket_size(count) // 2
+    byes = bracket_size(count) - count
+    first_round_players = {player for match in first_round for player in (match.player1_id, match.player2_id)}
+    assert not first_round_players & set(participants(count)[:byes])
+
+    # Random results along the links: nobody plays after a second loss
+    rng = random.Random(count)
+    losses = Counter()
+    for match in matches:  # Creation order is a valid play order
+        players = (match.player1_id, match.player2_id)
+        assert all(player in entrants for player in players)
+        assert all(losses[player] < 2 for player in players)
+        winner = rng.choice(players)
+        loser = players[1] if winner == players[0] else players[0]
+        losses[loser] += 1
+        if match.next_match_id:
+            setattr(by_id[match.next_match_id], f"player{match.next_match_slot}_id", winner)
+        if match.loser_next_match_id:
+            setattr(by_id[match.loser_next_match_id], f"player{match.loser_next_match_slot}_id", loser)
+
+    assert sum(1 for player in entrants if losses[player] == 2) >= count - 2
+
+@pytest.mark.parametrize("count", [2, 3, 5, 8, 13, 64, 100, 1024])
+def test_single_elimination_structure(count):
+    matches = generate_single_elimination("t", participants(count))
+    assert len(matches) == count - 1
+    assert sum(1 for match in matches if match.next_match_id is None) == 1
+    assert all(match.loser_next_match_id is None for match in matches)
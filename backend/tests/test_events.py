@@ -0,0 +1,111 @@
+import asyncio
+
+from bson import ObjectId
+
+import services.events as events
+from services.events import (
+    API_SOURCE, CHANGE_STREAM_SOURCE, EventBus, MatchCompleted, TournamentChanged, UserRoleChanged, events_from_change
+)
+
+def run(coro):
+    return asyncio.run(coro)
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def match_completed(source, winner_id="p1"):
+    return MatchCompleted(source=source, tournament_id="t", match_id="m", winner_id=winner_id)
+
+def running_bus(monkeypatch, dedupe_seconds=30.0):
+    clock = Clock()
+    monkeypatch.setattr(events.time, "monotonic", clock)
+    bus = EventBus(dedupe_seconds=dedupe_seconds)
+    bus._running = True
+    return bus, clock
+
+async def publish_all(bus, *published):
+    for event in published:
+        await bus.publish(event)
+
+def test_route_and_change_stream_reports_cancel_out_in_either_order(monkeypatch):
+    bus, _ = running_bus(monkeypatch)
+    run(publish_all(
+        bus,
+        match_completed(API_SOURCE), match_completed(CHANGE_STREAM_SOURCE),
+        match_completed(CHANGE_STREAM_SOURCE, "p2"), match_completed(API_SOURCE, "p2")
+    ))
+
+    assert (bus.published, bus.duplicates) == (2, 2)
+    assert bus._pending == {}
+
+def test_identical_events_cancel_one_occurrence_each(monkeypatch):
+    bus, _ = running_bus(monkeypatch)
+    run(publish_all(bus, *[match_completed(API_SOURCE)] * 3, *[match_completed(CHANGE_STREAM_SOURCE)] * 4))
+
+    # Three route reports cancel three change stream reports; the fourth is a new change
+    assert (bus.published, bus.duplicates) == (4, 3)
+
+def test_same_source_reports_are_all_delivered(monkeypatch):
+    bus, _ = running_bus(monkeypatch)
+    run(publish_all(bus, *[match_completed(CHANGE_STREAM_SOURCE)] * 2))
+
+    assert (bus.published, bus.duplicates) == (2, 0)
+
+def test_unmatched_occurrences_expire(monkeypatch):
+    bus, clock = running_bus(monkeypatch, dedupe_seconds=30.0)
+    run(publish_all(bus, match_completed(API_SOURCE), match_completed(API_SOURCE)))
+    clock.now += 10
+    run(publish_all(bus, match_completed(CHANGE_STREAM_SOURCE)))
+    clock.now += 25
+
+    # The unmatched route report is 35s old: the change stream report is a new change
+    run(publish_all(bus, match_completed(CHANGE_STREAM_SOURCE)))
+    assert (bus.published, bus.duplicates) == (3, 1)
+
+    clock.now += 31
+    run(publish_all(bus, UserRoleChanged(user_id="u", role="admin")))
+    assert list(bus._pending) == [UserRoleChanged(user_id="u", role="admin").key()]
+    assert len(bus._expiry) == 1
+
+def test_tournament_deletes_match_on_the_document_key(monkeypatch):
+    bus, _ = running_bus(monkeypatch)
+    document_id = ObjectId()
+    change = {"ns": {"coll": "tournaments"}, "operationType": "delete", "documentKey": {"_id": document_id}}
+    run(publish_all(
+        bus,
+        TournamentChanged(tournament_id="t", operation="delete", document_key=str(document_id)),
+        *events_from_change(change)
+    ))
+
+    assert (bus.published, bus.duplicates) == (1, 1)
+
+def test_resync_wakeup_never_reaches_handlers():
+    async def scenario():
+        handled, resyncs = [], []
+
+        async def handler(batch):
+            handled.extend(batch)
+
+        async def resync():
+            resyncs.append(True)
+
+        bus = EventBus()
+        subscription = bus.subscribe("test", handler, UserRoleChanged, resync=resync)
+        bus.request_resync()
+        # Resynced by another path before the worker got to the wakeup
+        subscription.needs_resync = False
+        bus.start()
+        await bus.publish(UserRoleChanged(user_id="u", role="admin"))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await bus.stop()
+        return handled, resyncs, subscription
+
+    handled, resyncs, subscription = run(scenario())
+    assert [type(event) for event in handled] == [UserRoleChanged]
+    assert resyncs == []
+    assert subscription.errors == 0
@@ -0,0 +1,165 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from services.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobRunner, enqueue
+
+def run(coro):
+    return asyncio.run(coro)
+
+async def make_database():
+    database = AsyncMongoMockClient()["jobs"]
+    await database.jobs.create_index("id", unique=True)
+    return database
+
+def make_runner(database, handler=None, **options):
+    runner = JobRunner(**{"retry_delay": 5.0, **options})
+    runner.db = database
+    runner.register("test", handler or succeed)
+    return runner
+
+async def succeed(database, payload):
+    return {"done": payload.get("n")}
+
+async def fail(database, payload):
+    raise RuntimeError("boom")
+
+async def job(database, job_id):
+    return await database.jobs.find_one({"id": job_id}, {"_id": 0})
+
+async def claim_and_execute(runner):
+    claimed = await runner._claim()
+    runner._active[claimed["type"]] = runner._active.get(claimed["type"], 0) + 1
+    await runner._execute(claimed)
+    return claimed
+
+def test_job_runs_and_records_its_result():
+    async def scenario():
+        database = await make_database()
+        job_id = await enqueue(database, "test", {"n": 3})
+        await claim_and_execute(make_runner(database))
+        return await job(database, job_id)
+
+    done = run(scenario())
+    assert done["status"] == SUCCEEDED
+    assert done["result"] == {"done": 3}
+    assert "lease_owner" not in done
+
+def test_leased_job_is_claimed_again_only_once_its_lease_expires():
+    async def scenario():
+        database = await make_database()
+        job_id = await enqueue(database, "test")
+        first, second = make_runner(database), make_runner(database)
+        claimed = await first._claim()
+        assert claimed["status"] == RUNNING and claimed["lease_owner"] == first.worker_id
+        assert await second._claim() is None
+
+        # The first worker died: its lease runs out
+        await database.jobs.update_one({"id": job_id}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+        return await second._claim(), second
+
+    reclaimed, second = run(scenario())
+    assert reclaimed["lease_owner"] == second.worker_id
+    assert reclaimed["attempts"] == 2
+
+def test_failures_are_retried_with_exponential_backoff():
+    async def scenario():
+        database = await make_database()
+        job_id = await enqueue(database, "test", max_attempts=3)
+        runner = make_runner(database, fail)
+        delays = []
+        for _ in range(3):
+            start = datetime.utcnow()
+            await claim_and_execute(runner)
+            state = await job(database, job_id)
+            if state["status"] == QUEUED:
+                delays.append((state["run_at"] - start).total_seconds())
+                await database.jobs.update_one({"id": job_id}, {"$set": {"run_at": datetime.utcnow()}})
+        return await job(database, job_id), delays, runner
+
+    failed, delays, runner = run(scenario())
+    assert [round(delay) for delay in delays] == [5, 10]
+    assert failed["status"] == FAILED
+    assert failed["attempts"] == 3
+    assert failed["last_error"] == "boom"
+    assert (runner.retried, runner.failed) == (2, 1)
+
+def test_job_whose_lease_expired_on_every_attempt_fails_without_running():
+    calls = []
+
+    async def handler(database, payload):
+        calls.append(payload)
+
+    async def scenario():
+        database = await make_database()
+        job_id = await enqueue(database, "test", max_attempts=2)
+        await database.jobs.update_one({"id": job_id}, {"$set": {"attempts": 2}})
+        await claim_and_execute(make_runner(database, handler))
+        return await job(database, job_id)
+
+    failed = run(scenario())
+    assert calls == []
+    assert failed["status"] == FAILED
+    assert failed["last_error"] == "lease expired before the job finished"
+
+def test_keyed_jobs_coalesce_while_queued():
+    async def scenario():
+        database = await make_database()
+        later = datetime.utcnow() + timedelta(minutes=10)
+        first = await enqueue(database, "test", run_at=later, key="k")
+        second = await enqueue(database, "test", run_at=later - timedelta(minutes=5), key="k")
+        third = await enqueue(database, "test", run_at=later + timedelta(minutes=5), key="k")
+        queued = await job(database, first)
+
+        # Once the job runs, the key queues a new one
+        await database.jobs.update_one({"id": first}, {"$set": {"status": RUNNING}})
+        fourth = await enqueue(database, "test", key="k")
+        return first, second, third, fourth, queued, later
+
+    first, second, third, fourth, queued, later = run(scenario())
+    assert first == second == third
+    assert fourth != first
+    assert abs((queued["run_at"] - (later - timedelta(minutes=5))).total_seconds()) < 1
+
+def test_scheduled_slot_is_queued_once_across_processes():
+    async def scenario():
+        database = await make_database()
+        runners = [make_runner(database) for _ in range(3)]
+        tasks = [asyncio.create_task(runner._schedule_loop("test", 3600, {})) for runner in runners]
+        for _ in range(5):
+            await asyncio.sleep(0)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return await database.jobs.find({}, {"_id": 0}).to_list(None)
+
+    jobs = run(scenario())
+    assert len(jobs) == 1
+    assert jobs[0]["id"].startswith("test@")
+    assert jobs[0]["max_attempts"] == 1
+
+@pytest.mark.parametrize("max_attempts, status, attempts", [(1, FAILED, 1), (3, QUEUED, 0)])
+def test_shutdown_requeues_only_retriable_jobs(max_attempts, status, attempts):
+    async def scenario():
+        database = await make_database()
+        running = asyncio.Event()
+
+        async def handler(database, payload):
+            running.set()
+            await asyncio.sleep(60)
+
+        job_id = await enqueue(database, "test", max_attempts=max_attempts)
+        runner = make_runner(database, handler)
+        task = asyncio.create_task(claim_and_execute(runner))
+        await running.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await job(database, job_id)
+
+    interrupted = run(scenario())
+    assert interrupted["status"] == status
+    assert interrupted["attempts"] == attempts
+    assert "lease_owner" not in interrupted
@@ -0,0 +1,193 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from models import ParticipantInfo, ParticipantType
+from services.participants import SUMMARIES_FIELD, summary_document
+from services.registrations import (
+    PROFILE_COUNTS_FIELD, NotRegisteredError, RegistrationNotifier, count_profile_registrations,
+    register_participant, uncount_profile_registrations, unregister_participant
+)
+
+def run(coro):
+    return asyncio.run(coro)
+
+def user(user_id):
+    return ParticipantInfo(id=user_id, type=ParticipantType.USER, name=user_id, display_name=user_id)
+
+async def make_database(participants, max_participants=2, status="open", waitlist=()):
+    database = AsyncMongoMockClient()["registrations"]
+    await database.tournament_waitlist.create_index([("tournament_id", 1), ("participant_id", 1)], unique=True)
+    await database.tournaments.insert_one({
+        "id": "t",
+        "status": status,
+        "max_participants": max_participants,
+        "registration_end": datetime.utcnow() + timedelta(days=1),
+        "participants": list(participants),
+        SUMMARIES_FIELD: [summary_document(user(participant_id)) for participant_id in participants]
+    })
+    for offset, participant_id in enumerate(waitlist):
+        await database.tournament_waitlist.insert_one({
+            "id": f"w-{participant_id}",
+            "tournament_id": "t",
+            "participant_id": participant_id,
+            "participant": summary_document(user(participant_id)),
+            "created_at": datetime(2024, 1, 1) + timedelta(seconds=offset)
+        })
+    return database
+
+async def tournament(database):
+    return await database.tournaments.find_one({"id": "t"}, {"_id": 0})
+
+async def waitlisted(database):
+    return [entry["participant_id"] async for entry in database.tournament_waitlist.find({}).sort("created_at", 1)]
+
+def test_full_tournament_waitlists_in_order():
+    async def scenario():
+        database = await make_database(["a"], max_participants=2)
+        return (
+            await register_participant(database, "t", user("b")),
+            await register_participant(database, "t", user("c")),
+            await register_participant(database, "t", user("d")),
+            await tournament(database)
+        )
+
+    registered, first, second, state = run(scenario())
+    assert (registered, first, second) == (None, 1, 2)
+    assert state["participants"] == ["a", "b"]
+
+def test_unregister_promotes_waitlist_head_in_place():
+    async def scenario():
+        database = await make_database(["a", "b"], waitlist=["c", "d"])
+        promoted = await unregister_participant(database, "t", "a")
+        return promoted, await tournament(database), await waitlisted(database)
+
+    promoted, state, queue = run(scenario())
+    assert promoted["id"] == "c"
+    assert state["participants"] == ["c", "b"]
+    assert [summary["id"] for summary in state[SUMMARIES_FIELD]] == ["c", "b"]
+    assert queue == ["d"]
+
+def test_stale_waitlist_entries_are_skipped():
+    async def scenario():
+        # "b" registered directly while still queued
+        database = await make_database(["a", "b"], waitlist=["b", "c"])
+        promoted = await unregister_participant(database, "t", "a")
+        return promoted, await tournament(database), await waitlisted(database)
+
+    promoted, state, queue = run(scenario())
+    assert promoted["id"] == "c"
+    assert state["participants"] == ["c", "b"]
+    assert queue == []
+
+def test_only_stale_entries_frees_the_spot():
+    async def scenario():
+        database = await make_database(["a", "b"], waitlist=["b"])
+        promoted = await unregister_participant(database, "t", "a")
+        return promoted, await tournament(database), await waitlisted(database)
+
+    promoted, state, queue = run(scenario())
+    assert promoted is None
+    assert state["participants"] == ["b"]
+    assert queue == []
+
+@pytest.mark.parametrize("status", ["registration_closed", "in_progress"])
+def test_no_promotion_once_registration_is_closed(status):
+    async def scenario():
+        database = await make_database(["a", "b"], status=status, waitlist=["c"])
+        promoted = await unregister_participant(database, "t", "a")
+        return promoted, await tournament(database), await waitlisted(database)
+
+    promoted, state, queue = run(scenario())
+    assert promoted is None
+    assert state["participants"] == ["b"]
+    assert [summary["id"] for summary in state[SUMMARIES_FIELD]] == ["b"]
+    assert queue == ["c"]
+
+@pytest.mark.parametrize("waitlist", [(), ("c",)])
+def test_unregister_unknown_participant_raises(waitlist):
+    async def scenario():
+        database = await make_database(["a", "b"], waitlist=waitlist)
+        with pytest.raises(NotRegisteredError):
+            await unregister_participant(database, "t", "z")
+        return await tournament(database), await waitlisted(database)
+
+    state, queue = run(scenario())
+    assert state["participants"] == ["a", "b"]
+    assert queue == list(waitlist)
+
+def test_notifier_wakes_waiters_and_forgets_them():
+    notifier = RegistrationNotifier()
+
+    async def scenario():
+        waiter = asyncio.create_task(notifier.wait("t", timeout=5))
+        await asyncio.sleep(0)
+        notifier.notify("t")
+        return await waiter
+
+    assert run(scenario()) is True
+    assert notifier._events == {} and notifier._waiters == {}
+
+def test_notifier_drops_event_after_last_timeout():
+    notifier = RegistrationNotifier()
+
+    async def scenario():
+        long_poll = asyncio.create_task(notifier.wait("t", timeout=5))
+        assert await notifier.wait("t", timeout=0.01) is False
+        # Another waiter still holds the event
+        still_tracked = "t" in notifier._events
+        notifier.notify("t")
+        return still_tracked, await long_poll
+
+    assert run(scenario()) == (True, True)
+    assert notifier._events == {} and notifier._waiters == {}
+
+    assert run(notifier.wait("u", timeout=0.01)) is False
+    assert notifier._events == {} and notifier._waiters == {}
+
+async def profile_counts(database):
+    return {profile["user_id"]: profile["total_tournaments"] async for profile in database.user_profiles.find({})}
+
+def test_team_entry_is_uncounted_from_the_members_counted():
+    async def scenario():
+        database = await make_database(["team", "carol"])
+        await database.teams.insert_one({"id": "team", "members": ["alice", "bob"]})
+        await count_profile_registrations(database, "t", ["team", "carol"])
+        assert await profile_counts(database) == {"alice": 1, "bob": 1, "carol": 1}
+
+        # Members changing after registration do not change who gets uncounted
+        await database.teams.update_one({"id": "team"}, {"$set": {"members": ["alice", "dave"]}})
+        counted = (await tournament(database))[PROFILE_COUNTS_FIELD]
+        assert counted == {"team": ["alice", "bob"], "carol": ["carol"]}
+        await uncount_profile_registrations(database, counted, ["team", "carol"])
+        return await profile_counts(database)
+
+    assert run(scenario()) == {"alice": 0, "bob": 0, "carol": 0}
+
+def test_legacy_entries_uncount_users_only_and_never_below_zero():
+    async def scenario():
+        database = await make_database(["team", "carol", "erin"])
+        await database.teams.insert_one({"id": "team", "members": ["alice", "bob"]})
+        await database.user_profiles.insert_many([
+            {"user_id": "alice", "total_tournaments": 1},
+            {"user_id": "carol", "total_tournaments": 2},
+            {"user_id": "erin", "total_tournaments": 0}
+        ])
+        await uncount_profile_registrations(database, {}, ["team", "carol", "erin"])
+        return await profile_counts(database)
+
+    assert run(scenario()) == {"alice": 1, "carol": 1, "erin": 0}
+
+def test_marked_uncount_applies_once():
+    async def scenario():
+        database = await make_database(["alice", "bob"])
+        await count_profile_registrations(database, "t", ["alice", "bob"])
+        await count_profile_registrations(database, "other", ["alice"])
+        counted = (await tournament(database))[PROFILE_COUNTS_FIELD]
+        for _ in range(2):
+            await uncount_profile_registrations(database, counted, ["alice", "bob"], marker="deleted:t")
+        return await profile_counts(database)
+
+    assert run(scenario()) == {"alice": 1, "bob": 0}
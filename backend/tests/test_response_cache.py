@@ -0,0 +1,170 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import response_cache as cache_module
+from services.response_cache import KEY_PREFIX, TAG_PREFIX, InMemoryBackend, ResponseCache, cached_response
+
+def run(coro):
+    return asyncio.run(coro)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_lookup_hits_after_store():
+    cache = ResponseCache(InMemoryBackend())
+
+    async def scenario():
+        assert await cache.lookup("k") is None
+        await cache.store("k", '"etag"', b'{"a":1}', ttl=60, tags=["t"], generation=cache._generation)
+        return await cache.lookup("k")
+
+    assert run(scenario()) == ('"etag"', b'{"a":1}')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_store_skipped_when_invalidated_meanwhile():
+    cache = ResponseCache(InMemoryBackend())
+
+    async def scenario():
+        generation = cache._generation
+        await cache.invalidate("t")
+        await cache.store("k", '"etag"', b"{}", ttl=60, tags=["t"], generation=generation)
+        return await cache.lookup("k")
+
+    assert run(scenario()) is None
+
+def test_values_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    backend = InMemoryBackend()
+
+    async def scenario():
+        await backend.set("k", b"v", ex=10)
+        await backend.sadd("tag", "k")
+        clock.now += 9
+        fresh = await backend.get("k")
+        clock.now += 2
+        return fresh, await backend.get("k"), await backend.smembers("tag")
+
+    assert run(scenario()) == (b"v", None, set())
+    assert backend._sets == {} and backend._memberships == {}
+
+def test_invalidate_drops_tagged_responses_only():
+    cache = ResponseCache(InMemoryBackend())
+
+    async def scenario():
+        await cache.store("a", '"a"', b"{}", ttl=60, tags=["tournaments", "tournament:1"], generation=cache._generation)
+        await cache.store("b", '"b"', b"{}", ttl=60, tags=["teams"], generation=cache._generation)
+        await cache.invalidate("tournament:1")
+        return await cache.lookup("a"), await cache.lookup("b")
+
+    missing, kept = run(scenario())
+    assert missing is None
+    assert kept == ('"b"', b"{}")
+    # The other tag of the dropped response no longer lists it
+    assert KEY_PREFIX + "a" not in cache.backend._sets.get(TAG_PREFIX + "tournaments", set())
+
+def test_eviction_prunes_tag_sets():
+    backend = InMemoryBackend(max_entries=2)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await backend.set(key, b"v", ex=60)
+            await backend.sadd("tag", key)
+            await backend.sadd(f"tag:{key}", key)
+        return await backend.get("a"), await backend.smembers("tag")
+
+    assert run(scenario()) == (None, {"b", "c"})
+    assert backend.evictions == 1
+    assert "tag:a" not in backend._sets
+    assert "a" not in backend._memberships
+
+def test_sets_stay_bounded_under_churn():
+    backend = InMemoryBackend(max_entries=8)
+
+    async def scenario():
+        for i in range(1000):
+            await backend.set(f"k{i}", b"v", ex=60)
+            await backend.sadd("tag", f"k{i}")
+            await backend.sadd(f"tag:{i}", f"k{i}")
+
+    run(scenario())
+    assert len(backend._values) == 8
+    assert len(backend._sets["tag"]) == 8
+    assert len(backend._sets) == 9
+    assert len(backend._memberships) == 8
+
+def test_sadd_skips_keys_without_value():
+    backend = InMemoryBackend(max_entries=0)
+
+    async def scenario():
+        await backend.set("k", b"v")
+        return await backend.sadd("tag", "k")
+
+    assert run(scenario()) == 0
+    assert backend._sets == {}
+
+def test_cache_key_ignores_undeclared_query_params(monkeypatch):
+    cache = ResponseCache(InMemoryBackend())
+    monkeypatch.setattr(cache_module, "response_cache", cache)
+    calls = []
+    app = FastAPI()
+
+    @app.get("/items")
+    @cached_response(ttl=60, tags=("items",))
+    async def list_items(game: str = "cs2"):
+        calls.append(game)
+        return {"game": game}
+
+    client = TestClient(app)
+    first = client.get("/items?game=cs2")
+    assert client.get("/items?game=cs2&x=1").json() == {"game": "cs2"}
+    assert client.get("/items?x=2&game=cs2").headers["etag"] == first.headers["etag"]
+    client.get("/items?game=lol")
+    assert calls == ["cs2", "lol"]
+    assert len(cache.backend._values) == 2
+
+def test_if_none_match_returns_304(monkeypatch):
+    cache = ResponseCache(InMemoryBackend())
+    monkeypatch.setattr(cache_module, "response_cache", cache)
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    @cached_response(ttl=60, tags=("item:{item_id}",))
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    etag = client.get("/items/1").headers["etag"]
+    response = client.get("/items/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert cache.not_modified == 1
+    assert len(run(cache.backend.smembers(TAG_PREFIX + "item:1"))) == 1
+
+class ExpiryRecordingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.expiries = {}
+
+    async def expire(self, key, seconds):
+        self.expiries[key] = seconds
+        return await super().expire(key, seconds)
+
+def test_tag_sets_outlive_their_longest_lived_member(monkeypatch):
+    cache = ResponseCache(ExpiryRecordingBackend())
+    monkeypatch.setattr(cache_module, "response_cache", cache)
+    cached_response(ttl=300)
+    cached_response(ttl=30)
+
+    async def scenario():
+        await cache.store("short", '"a"', b"{}", ttl=30, tags=["t"], generation=cache._generation)
+        await cache.store("long", '"b"', b"{}", ttl=600, tags=["u"], generation=cache._generation)
+
+    run(scenario())
+    assert cache.tag_ttl == 300
+    assert cache.backend.expiries == {TAG_PREFIX + "t": 300, TAG_PREFIX + "u": 600}
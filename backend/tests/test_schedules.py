@@ -0,0 +1,163 @@
+import asyncio
+import random
+from collections import Counter
+from itertools import combinations
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import routes.matches as match_routes
+import services.schedules as schedules
+from models import MatchStatus
+from services.schedules import (
+    compute_standings, generate_round_robin, generate_swiss_round, pair_swiss_round, swiss_round_count
+)
+
+def run(coro):
+    return asyncio.run(coro)
+
+def participants(count):
+    return [f"p{i}" for i in range(count)]
+
+def pairs_of(matches):
+    return [frozenset((match["player1_id"], match["player2_id"])) for match in matches if match["player2_id"] != "BYE"]
+
+def play_swiss(count, seed=0):
+    """Play every round of a Swiss tournament with random winners."""
+    rng = random.Random(seed)
+    players = participants(count)
+    matches = []
+    for round_number in range(1, swiss_round_count(count) + 1):
+        for match in generate_swiss_round("t", players, matches, round_number, first_match_number=len(matches) + 1):
+            match = match.dict()
+            if match["status"] != MatchStatus.COMPLETED:
+                match["winner_id"] = rng.choice([match["player1_id"], match["player2_id"]])
+                match["status"] = MatchStatus.COMPLETED
+            matches.append(match)
+    return players, matches
+
+@pytest.mark.parametrize("count", [2, 3, 7, 8, 9, 16])
+def test_round_robin_pairs_everyone_once(count):
+    matches = [match.dict() for match in generate_round_robin("t", participants(count))]
+
+    assert Counter(pairs_of(matches)) == Counter(frozenset(pair) for pair in combinations(participants(count), 2))
+    rounds = {match["round_number"] for match in matches}
+    assert len(rounds) == (count if count % 2 else count - 1)
+    for round_number in rounds:
+        players = [player for match in matches if match["round_number"] == round_number
+                   for player in (match["player1_id"], match["player2_id"])]
+        assert len(players) == len(set(players))
+    assert [match["match_number"] for match in matches] == list(range(1, len(matches) + 1))
+
+@pytest.mark.parametrize("count", [7, 9, 33, 256])
+def test_swiss_has_no_rematches_nor_repeated_byes(count):
+    players, matches = play_swiss(count)
+
+    assert max(Counter(pairs_of(matches)).values()) == 1
+    byes = [match["player1_id"] for match in matches if match["player2_id"] == "BYE"]
+    assert len(byes) == (swiss_round_count(count) if count % 2 else 0)
+    assert len(byes) == len(set(byes))
+    for round_number in range(1, swiss_round_count(count) + 1):
+        seated = [player for match in matches if match["round_number"] == round_number
+                  for player in (match["player1_id"], match["player2_id"]) if player != "BYE"]
+        assert sorted(seated) == sorted(players)
+
+def test_swiss_allows_rematches_when_the_search_budget_runs_out(monkeypatch):
+    players = participants(4)
+    played = [
+        {"player1_id": "p0", "player2_id": "p1", "winner_id": "p0", "status": MatchStatus.COMPLETED},
+        {"player1_id": "p2", "player2_id": "p3", "winner_id": "p2", "status": MatchStatus.COMPLETED},
+    ]
+    standings = compute_standings(players, played)
+    ranking = [int(i) for i in standings.ranking]
+
+    assert not any(standings.played[a, b] for a, b in pair_swiss_round(ranking, standings))
+
+    monkeypatch.setattr(schedules, "PAIRING_SEARCH_BUDGET", 0)
+    pairs = pair_swiss_round(ranking, standings)
+    assert sorted(player for pair in pairs for player in pair) == [0, 1, 2, 3]
+
+def test_swiss_pairs_a_forced_rematch():
+    players = participants(2)
+    played = [{"player1_id": "p0", "player2_id": "p1", "winner_id": "p1", "status": MatchStatus.COMPLETED}]
+    standings = compute_standings(players, played)
+
+    assert pair_swiss_round([int(i) for i in standings.ranking], standings) == [(1, 0)]
+
+class FailingInserts:
+    """A collection whose insert_many fails."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def insert_many(self, *args, **kwargs):
+        raise RuntimeError("insert failed")
+
+class Database:
+    def __init__(self, database, failing_inserts=False):
+        self._database = database
+        self._failing_inserts = failing_inserts
+
+    def __getattr__(self, name):
+        collection = self._database[name]
+        return FailingInserts(collection) if self._failing_inserts and name == "matches" else collection
+
+async def finished_first_round(count):
+    database = AsyncMongoMockClient()["schedules"]
+    players = participants(count)
+    matches = []
+    for match in generate_swiss_round("t", players, [], 1):
+        match = match.dict()
+        match["winner_id"] = match["player1_id"]
+        match["status"] = MatchStatus.COMPLETED
+        matches.append(match)
+    await database.matches.insert_many(matches)
+    await database.tournaments.insert_one({
+        "id": "t",
+        "tournament_type": "swiss",
+        "participants": players,
+        "matches": [match["id"] for match in matches],
+        "remaining_matches": 0,
+        "paired_rounds": 1
+    })
+    return database
+
+def test_concurrent_round_finishers_pair_the_next_round_once(monkeypatch):
+    async def scenario():
+        database = await finished_first_round(8)
+        monkeypatch.setattr(match_routes, "db", database)
+        tournament = await database.tournaments.find_one({"id": "t"}, match_routes.ADVANCE_PROJECTION)
+        await asyncio.gather(*(match_routes.finish_schedule_round("t", tournament) for _ in range(3)))
+        return (
+            await database.tournaments.find_one({"id": "t"}, {"_id": 0}),
+            await database.matches.count_documents({"round_number": 2})
+        )
+
+    tournament, second_round = run(scenario())
+    assert second_round == 4
+    assert tournament["paired_rounds"] == 2
+    assert tournament["remaining_matches"] == 4
+    assert len(tournament["matches"]) == 8
+
+def test_failed_round_insert_releases_the_claim(monkeypatch):
+    async def scenario():
+        database = await finished_first_round(8)
+        monkeypatch.setattr(match_routes, "db", Database(database, failing_inserts=True))
+        tournament = await database.tournaments.find_one({"id": "t"}, match_routes.ADVANCE_PROJECTION)
+        with pytest.raises(RuntimeError):
+            await match_routes.finish_schedule_round("t", tournament)
+        failed = await database.tournaments.find_one({"id": "t"}, {"_id": 0})
+
+        # The round can be paired again
+        monkeypatch.setattr(match_routes, "db", database)
+        await match_routes.finish_schedule_round("t", tournament)
+        return failed, await database.matches.count_documents({"round_number": 2})
+
+    failed, second_round = run(scenario())
+    assert failed["paired_rounds"] == 1
+    assert failed["remaining_matches"] == 0
+    assert len(failed["matches"]) == 4
+    assert second_round == 4
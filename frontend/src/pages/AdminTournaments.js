@@ -30,7 +30,8 @@ const AdminTournaments = () => {
   const tournamentTypes = [
     { id: 'elimination', name: 'Élimination directe' },
     { id: 'bracket', name: 'Bracket' },
-    { id: 'round_robin', name: 'Round Robin' }
+    { id: 'round_robin', name: 'Round Robin' },
+    { id: 'swiss', name: 'Système Suisse' }
   ];
 
   useEffect(() => {
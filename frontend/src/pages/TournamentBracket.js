@@ -22,6 +22,72 @@ const TournamentBracket = () => {
     fetchBracket();
   }, [id]);
 
+  // Live updates: the server pushes match deltas, we patch the bracket in place
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+
+    const source = new EventSource(`${API_BASE_URL}/matches/tournament/${id}/events`);
+    source.onmessage = (message) => {
+      let event;
+      try {
+        event = JSON.parse(message.data);
+      } catch (error) {
+        return;
+      }
+
+      if (event.type === 'match') {
+        setBracket((current) => applyMatchEvent(current, event.match));
+      } else if (event.type === 'tournament') {
+        if (event.status) {
+          setBracket((current) => ({ ...current, tournament_status: event.status }));
+        }
+        fetchTournamentInfo();
+      } else if (event.type === 'bracket' || event.type === 'resync') {
+        fetchBracket();
+      }
+    };
+
+    return () => source.close();
+  }, [id]);
+
+  const slotName = (participantsMap, participantId) => {
+    if (participantId && participantsMap?.[participantId]) {
+      return { name: participantsMap[participantId].display_name, type: participantsMap[participantId].type };
+    }
+    if (participantId === 'BYE') return { name: 'BYE', type: 'bye' };
+    if (participantId?.startsWith('Winner of') || participantId?.startsWith('Loser of')) {
+      return { name: participantId, type: 'placeholder' };
+    }
+    if (participantId) return { name: `Joueur ${participantId.slice(0, 8)}`, type: 'unknown' };
+    return { name: 'TBD', type: 'tbd' };
+  };
+
+  const applyMatchEvent = (current, delta) => {
+    const participantsMap = current.participants_map || {};
+    return {
+      ...current,
+      rounds: current.rounds.map((round) => ({
+        ...round,
+        matches: round.matches.map((match) => {
+          if (match.id !== delta.id) return match;
+
+          const updated = { ...match, ...delta };
+          ['player1', 'player2'].forEach((slot) => {
+            if (`${slot}_id` in delta) {
+              const { name, type } = slotName(participantsMap, delta[`${slot}_id`]);
+              updated[`${slot}_name`] = name;
+              updated[`${slot}_type`] = type;
+            }
+          });
+          if ('winner_id' in delta) {
+            updated.winner_name = participantsMap[delta.winner_id]?.display_name;
+          }
+          return updated;
+        })
+      }))
+    };
+  };
+
   const fetchTournamentInfo = async () => {
     try {
       const response = await fetch(`${API_BASE_URL}/tournaments/${id}`);
@@ -53,9 +119,9 @@ const TournamentBracket = () => {
     }
   };
 
-  const generateBracket = async () => {
+  const generateBracket = async (seeding = 'random') => {
     try {
-      const response = await fetch(`${API_BASE_URL}/matches/tournament/${id}/generate-bracket`, {
+      const response = await fetch(`${API_BASE_URL}/matches/tournament/${id}/generate-bracket?seeding=${seeding}`, {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -198,9 +264,14 @@ const TournamentBracket = () => {
         {canManageMatch() && bracket.tournament_status !== 'completed' && (
           <div className="admin-actions">
             {bracket.rounds.length === 0 ? (
-              <button className="btn-generate" onClick={generateBracket}>
-                🎲 Générer le Bracket Aléatoire
-              </button>
+              <>
+                <button className="btn-generate" onClick={() => generateBracket('random')}>
+                  🎲 Générer le Bracket Aléatoire
+                </button>
+                <button className="btn-generate" onClick={() => generateBracket('standings')}>
+                  🏅 Générer le Bracket par Classement
+                </button>
+              </>
             ) : (
               <p className="bracket-info">Bracket généré avec {bracket.rounds.length} rounds</p>
             )}
@@ -221,7 +292,7 @@ const TournamentBracket = () => {
           <h3>Bracket non généré</h3>
           <p>Le bracket du tournoi n'a pas encore été généré.</p>
           {canManageMatch() ? (
-            <button className="btn-generate-large" onClick={generateBracket}>
+            <button className="btn-generate-large" onClick={() => generateBracket('random')}>
               🎲 Générer le Bracket Maintenant
             </button>
           ) : (
@@ -231,10 +302,14 @@ const TournamentBracket = () => {
       ) : (
         <div className="bracket-grid">
           {bracket.rounds.map((round, roundIndex) => (
-            <div key={round.round_number} className="bracket-round">
+            <div key={`${round.bracket || 'main'}-${round.round_number}`} className="bracket-round">
               <div className="round-header">
                 <h3>
-                  {round.round_number === bracket.rounds.length ? '🏆 Finale' : 
+                  {round.bracket === 'grand_final' ? '🏆 Grande Finale' :
+                   round.bracket === 'losers' ? `Losers Round ${round.round_number}` :
+                   round.bracket === 'winners' ? `Winners Round ${round.round_number}` :
+                   ['round_robin', 'swiss'].includes(bracket.tournament_type) ? `Round ${round.round_number}` :
+                   round.round_number === bracket.rounds.length ? '🏆 Finale' :
                    round.round_number === bracket.rounds.length - 1 ? '🥈 Demi-finale' :
                    `Round ${round.round_number}`}
                 </h3>
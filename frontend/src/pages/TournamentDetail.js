@@ -23,20 +23,47 @@ const TournamentDetail = () => {
 
   useEffect(() => {
     fetchTournamentDetails();
-    fetchParticipantsInfo();
     if (user) {
       fetchUserTeamsForTournament();
     }
   }, [id, user]);
 
-  const fetchTournamentDetails = async () => {
+  // Live updates: registrations, status changes and bracket generation make us refetch
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+
+    const source = new EventSource(`${API_BASE_URL}/matches/tournament/${id}/events`);
+    source.onmessage = (message) => {
+      let event;
+      try {
+        event = JSON.parse(message.data);
+      } catch (error) {
+        return;
+      }
+
+      if (event.type === 'tournament' || event.type === 'bracket' || event.type === 'resync') {
+        fetchTournamentDetails(false);
+      }
+    };
+
+    return () => source.close();
+  }, [id]);
+
+  const fetchTournamentDetails = async (showLoading = true) => {
     try {
-      setLoading(true);
+      if (showLoading) setLoading(true);
       const response = await fetch(`${API_BASE_URL}/tournaments/${id}`);
       
       if (response.ok) {
         const data = await response.json();
         setTournament(data);
+        // Participant summaries are embedded in the tournament; older tournaments may lack some
+        const summaries = data.participant_summaries || [];
+        if (summaries.length === (data.participants || []).length) {
+          setParticipantsInfo(summaries);
+        } else {
+          fetchParticipantsInfo();
+        }
       } else if (response.status === 404) {
         setError('Tournoi non trouvé');
         setTimeout(() => navigate('/tournois'), 3000);
@@ -170,8 +197,7 @@ const TournamentDetail = () => {
         const data = await response.json();
         alert(data.message || 'Inscription réussie !');
         handleCloseRegistrationModal();
-        fetchTournamentDetails(); // Refresh tournament data
-        fetchParticipantsInfo(); // Refresh participants
+        fetchTournamentDetails(); // Refresh tournament data and participants
       } else {
         const errorData = await response.json();
         setRegistrationError(errorData.detail || 'Erreur lors de l\'inscription');
@@ -112,6 +112,8 @@ const Tournois = () => {
         return 'Bracket';
       case 'round_robin':
         return 'Round Robin';
+      case 'swiss':
+        return 'Système Suisse';
       default:
         return type;
     }